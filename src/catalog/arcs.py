@@ -0,0 +1,108 @@
+"""Sparse representation of the feasible changeovers of a Product Ordering problem instance
+"""
+from typing import *
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from constants.constants import INF
+from catalog.catalog import ProductCatalog, get_catalog
+
+class ArcList:
+    """This class stores the feasible arcs of a changeover graph in CSR layout (compressed sparse
+    row): the successors of node i are targets[offsets[i]:offsets[i + 1]] with the costs
+    costs[offsets[i]:offsets[i + 1]]. Arcs of cost INF are not stored at all, such that memory
+    and iteration time scale with the number of feasible arcs
+    """
+
+    def __init__(self, nodes : Sequence[str], offsets : np.ndarray, targets : np.ndarray,
+                 costs : np.ndarray) -> None:
+        """Constructor of an arc list
+
+        Args:
+            nodes (Sequence[str]): node names, the arcs refer to their positions
+            offsets (np.ndarray): start of the successors of each node, of length len(nodes) + 1
+            targets (np.ndarray): target node of each arc
+            costs (np.ndarray): cost of each arc
+        """
+        assert len(offsets) == len(nodes) + 1
+        assert len(targets) == len(costs) == offsets[-1]
+        self.nodes = list(nodes)
+        self.offsets = offsets
+        self.targets = targets
+        self.costs = costs
+
+    @classmethod
+    def from_matrix(cls, nodes : Sequence[str], matrix : np.ndarray) -> 'ArcList':
+        """Building the arc list from a dense changeover matrix, whereas all entries smaller than
+        INF are feasible arcs
+
+        Args:
+            nodes (Sequence[str]): node names in the order of rows and columns of the matrix
+            matrix (np.ndarray): changeover matrix
+
+        Returns:
+            ArcList: arc list
+        """
+        feasible = matrix < INF
+        offsets = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum(feasible.sum(axis=1), out=offsets[1:])
+        sources, targets = np.nonzero(feasible)
+        return cls(nodes, offsets, targets.astype(np.int64), matrix[sources, targets])
+
+    @classmethod
+    def from_catalog(cls, products : Sequence[str],
+                     catalog : Union[ProductCatalog, None] = None) -> 'ArcList':
+        """Building the arc list of the unmodified changeover matrix for the given products
+
+        Args:
+            products (Sequence[str]): products in the order, in which the arcs are stored
+            catalog (Union[ProductCatalog, None], optional): product catalog. If None, the \
+                catalog of this process is used. Defaults to None.
+
+        Returns:
+            ArcList: arc list
+        """
+        if catalog is None:
+            catalog = get_catalog()
+        indices = catalog.indices(products)
+        return cls.from_matrix(products, catalog.matrix[np.ix_(indices, indices)])
+
+    def __len__(self) -> int:
+        """Number of feasible arcs
+
+        Returns:
+            int: number of arcs
+        """
+        return len(self.targets)
+
+    def successors(self, node : int) -> Tuple[np.ndarray, np.ndarray]:
+        """Getting the feasible successors of a node
+
+        Args:
+            node (int): position of node
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: positions of successor nodes, costs of the arcs
+        """
+        start, end = self.offsets[node], self.offsets[node + 1]
+        return self.targets[start:end], self.costs[start:end]
+
+    def sources(self) -> np.ndarray:
+        """Getting the source node of each arc
+
+        Returns:
+            np.ndarray: positions of source nodes
+        """
+        return np.repeat(np.arange(len(self.nodes), dtype=np.int64), np.diff(self.offsets))
+
+    def items(self) -> Iterator[Tuple[str, str, int]]:
+        """Iterating over all arcs ordered by source node and target position
+
+        Yields:
+            Iterator[Tuple[str, str, int]]: source node, target node, cost
+        """
+        nodes = self.nodes
+        for source, target, cost in zip(self.sources().tolist(), self.targets.tolist(),
+                                        self.costs.tolist()):
+            yield nodes[source], nodes[target], cost
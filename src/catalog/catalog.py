@@ -0,0 +1,258 @@
+"""In-memory representation of the product information of the Product Ordering problem, i.e. the
+changeover matrix, the product properties, the product quantities and the campaigns order.
+Additionally, the product information can be compiled into a binary snapshot, which is opened
+read-only with memory mapping and thus shared between processes
+"""
+from typing import *
+import hashlib
+import json
+import logging
+import shutil
+import time
+import os
+import sys
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from constants.constants import CHANGEOVER_MATRIX, CAMPAIGNS_ORDER, PRODUCT_PROPERTIES, \
+    PRODUCT_QUANTITY, CATALOG_SNAPSHOT_FOLDER
+
+# Property columns of the catalog in the order of the product properties and quantity files
+COLUMNS = ['Name', 'Campaign', 'Volume', 'BottleCrate', 'NumShrink', 'NumTray', 'Packaging',
+           'PlannedPerformance', 'Quantity']
+
+# Version of the binary snapshot format
+SNAPSHOT_VERSION = 1
+
+class ProductCatalog:
+    """This class holds all product information needed for modelling a Product Ordering problem
+    instance. The changeover matrix is stored as an integer NumPy array together with a
+    product-to-index map, the product properties are stored as typed column arrays, which are
+    aligned to the rows of the changeover matrix
+    """
+
+    def __init__(self, products : List[str], matrix : np.ndarray, columns : Dict[str, np.ndarray],
+                 campaigns_order : Dict[str, int]) -> None:
+        """Constructor of a product catalog
+
+        Args:
+            products (List[str]): products in the order of the rows of the changeover matrix
+            matrix (np.ndarray): changeover matrix
+            columns (Dict[str, np.ndarray]): property columns, each aligned to the products
+            campaigns_order (Dict[str, int]): order step per campaign
+        """
+        assert matrix.shape == (len(products), len(products))
+        self.products = list(products)
+        self.index = {product: index for index, product in enumerate(self.products)}
+        self.matrix = matrix
+        self.columns = {column: columns[column] for column in COLUMNS}
+        self.name : np.ndarray = columns['Name']
+        self.campaign : np.ndarray = columns['Campaign']
+        self.volume : np.ndarray = columns['Volume']
+        self.bottle_crate : np.ndarray = columns['BottleCrate']
+        self.num_shrink : np.ndarray = columns['NumShrink']
+        self.num_tray : np.ndarray = columns['NumTray']
+        self.packaging : np.ndarray = columns['Packaging']
+        self.planned_performance : np.ndarray = columns['PlannedPerformance']
+        self.quantity : np.ndarray = columns['Quantity']
+        self.campaigns_order = campaigns_order
+
+    @classmethod
+    def from_csv(cls, changeover_matrix : str = CHANGEOVER_MATRIX,
+                 product_properties : str = PRODUCT_PROPERTIES,
+                 product_quantity : str = PRODUCT_QUANTITY,
+                 campaigns_order : str = CAMPAIGNS_ORDER) -> 'ProductCatalog':
+        """Reading the product information from the given CSV files
+
+        Args:
+            changeover_matrix (str, optional): path to changeover matrix. Defaults to \
+                CHANGEOVER_MATRIX.
+            product_properties (str, optional): path to product properties. Defaults to \
+                PRODUCT_PROPERTIES.
+            product_quantity (str, optional): path to product quantities. Defaults to \
+                PRODUCT_QUANTITY.
+            campaigns_order (str, optional): path to campaigns order. Defaults to CAMPAIGNS_ORDER.
+
+        Returns:
+            ProductCatalog: product catalog
+        """
+        df_matrix = pd.read_csv(changeover_matrix, dtype={'Product': str}).set_index('Product')
+        df_properties = pd.read_csv(product_properties, dtype={'Product': str}).set_index('Product')
+        df_quantity = pd.read_csv(product_quantity, dtype={'Product': str}).set_index('Product')
+        df_order = pd.read_csv(campaigns_order, index_col='Campaign')
+
+        products = [str(product) for product in df_matrix.index]
+        assert products == [str(product) for product in df_matrix.columns]
+        matrix = df_matrix.to_numpy(dtype=np.int64)
+
+        df_properties = df_properties.loc[products]
+        columns = {
+            'Name': df_properties['Name'].to_numpy(dtype=str),
+            'Campaign': df_properties['Campaign'].to_numpy(dtype=str),
+            'Volume': df_properties['Volume'].to_numpy(dtype=np.int64),
+            'BottleCrate': df_properties['BottleCrate'].astype(str).to_numpy(dtype=str),
+            'NumShrink': df_properties['NumShrink'].to_numpy(dtype=np.int64),
+            'NumTray': df_properties['NumTray'].to_numpy(dtype=np.int64),
+            'Packaging': df_properties['Packaging'].to_numpy(dtype=str),
+            'PlannedPerformance': df_properties['PlannedPerformance'].to_numpy(dtype=np.int64),
+            'Quantity': df_quantity.loc[products, 'Quantity'].to_numpy(dtype=np.int64)
+        }
+
+        return cls(products, matrix, columns, {str(campaign): int(order) \
+            for campaign, order in df_order['Order'].items()})
+
+    @classmethod
+    def from_snapshot(cls, folder : str) -> 'ProductCatalog':
+        """Opening a compiled binary snapshot; the changeover matrix and the property columns are
+        memory mapped read-only, such that all processes opening the same snapshot share the
+        underlying pages
+
+        Args:
+            folder (str): folder of the snapshot
+
+        Returns:
+            ProductCatalog: product catalog
+        """
+        with open(os.path.join(folder, 'meta.json'), 'r', encoding='utf-8') as filehandle:
+            meta = json.load(filehandle)
+        assert meta['version'] == SNAPSHOT_VERSION
+        num_products = len(meta['products'])
+
+        def open_array(name : str, dtype : str, shape : Tuple[int, ...]) -> np.ndarray:
+            if num_products == 0:
+                return np.zeros(shape, dtype=dtype)
+            return np.memmap(os.path.join(folder, f'{name}.bin'), dtype=np.dtype(dtype), mode='r',
+                             shape=shape)
+
+        matrix = open_array('matrix', meta['matrix'], (num_products, num_products))
+        columns = {column: open_array(column, dtype, (num_products,)) \
+            for column, dtype in meta['columns'].items()}
+        return cls(meta['products'], matrix, columns, meta['campaigns_order'])
+
+    def indices(self, products : Iterable[str]) -> np.ndarray:
+        """Mapping products to their row indices in the changeover matrix
+
+        Args:
+            products (Iterable[str]): products
+
+        Returns:
+            np.ndarray: row indices in the iteration order of the given products
+        """
+        return np.fromiter((self.index[product] for product in products), dtype=np.int64)
+
+def _hash_sources(sources : Sequence[str]) -> str:
+    """Auxiliary function for hashing the content of the source files of a snapshot
+
+    Args:
+        sources (Sequence[str]): paths to source files
+
+    Returns:
+        str: SHA-256 hex digest over all source files
+    """
+    digest = hashlib.sha256(f'version {SNAPSHOT_VERSION}'.encode('utf-8'))
+    for source in sources:
+        with open(source, 'rb') as filehandle:
+            content = filehandle.read()
+        digest.update(len(content).to_bytes(8, 'little'))
+        digest.update(content)
+    return digest.hexdigest()
+
+def compile_snapshot(folder : str = CATALOG_SNAPSHOT_FOLDER,
+                     sources : Sequence[str] = (CHANGEOVER_MATRIX, PRODUCT_PROPERTIES,
+                                                PRODUCT_QUANTITY, CAMPAIGNS_ORDER),
+                     force : bool = False) -> str:
+    """Compiling the product information given as CSV files into a binary snapshot, which consists
+    of the changeover matrix as raw int32 array, the property columns as raw arrays and a JSON
+    file with the meta data. The snapshot is stored in a subfolder named after the hash of the
+    source files, hence a snapshot is rebuilt automatically as soon as a source file changes. The
+    subfolder is written under a temporary name and renamed at the end, such that concurrent
+    processes never see an incomplete snapshot
+
+    Args:
+        folder (str, optional): folder of all snapshots. Defaults to CATALOG_SNAPSHOT_FOLDER.
+        sources (Sequence[str], optional): paths to the changeover matrix, product properties, \
+            product quantity and campaigns order files. Defaults to the files of the experiment.
+        force (bool, optional): rebuild the snapshot, even if it is up to date. Defaults to False.
+
+    Returns:
+        str: folder of the compiled snapshot
+    """
+    digest = _hash_sources(sources)
+    snapshot_folder = os.path.join(folder, digest)
+    if os.path.exists(os.path.join(snapshot_folder, 'meta.json')) and not force:
+        return snapshot_folder
+
+    logging.info('Compiling catalog snapshot %s', snapshot_folder)
+    catalog = ProductCatalog.from_csv(*sources)
+    temp_folder = f'{snapshot_folder}.{os.getpid()}.tmp'
+    os.makedirs(temp_folder, exist_ok=True)
+
+    meta : Dict[str, Any] = {
+        'version': SNAPSHOT_VERSION,
+        'sources': {os.path.basename(source): _hash_sources([source]) for source in sources},
+        'products': catalog.products,
+        'matrix': np.dtype(np.int32).str,
+        'columns': {},
+        'campaigns_order': catalog.campaigns_order
+    }
+    assert catalog.matrix.max(initial=0) <= np.iinfo(np.int32).max
+    catalog.matrix.astype(np.int32).tofile(os.path.join(temp_folder, 'matrix.bin'))
+    for column in COLUMNS:
+        array = np.ascontiguousarray(catalog.columns[column])
+        array.tofile(os.path.join(temp_folder, f'{column}.bin'))
+        meta['columns'][column] = array.dtype.str
+    with open(os.path.join(temp_folder, 'meta.json'), 'w', encoding='utf-8') as filehandle:
+        json.dump(meta, filehandle, indent=2)
+
+    if force and os.path.isdir(snapshot_folder):
+        shutil.rmtree(snapshot_folder, ignore_errors=True)
+    try:
+        os.rename(temp_folder, snapshot_folder)
+    except OSError:
+        # Another process has compiled the same snapshot in the meantime
+        shutil.rmtree(temp_folder, ignore_errors=True)
+
+    for stale in os.listdir(folder):
+        if stale != digest and '.' not in stale:
+            shutil.rmtree(os.path.join(folder, stale), ignore_errors=True)
+    return snapshot_folder
+
+def load_catalog(folder : str = CATALOG_SNAPSHOT_FOLDER) -> ProductCatalog:
+    """Loading the product catalog from the binary snapshot of the current CSV files, which is
+    compiled first if necessary. If the snapshot can't be written, the CSV files are read directly
+
+    Args:
+        folder (str, optional): folder of all snapshots. Defaults to CATALOG_SNAPSHOT_FOLDER.
+
+    Returns:
+        ProductCatalog: product catalog
+    """
+    try:
+        return ProductCatalog.from_snapshot(compile_snapshot(folder))
+    except OSError as error:
+        logging.warning('Catalog snapshot not available (%s), reading CSV files', error)
+        return ProductCatalog.from_csv()
+
+_CATALOG : Union[ProductCatalog, None] = None
+
+def get_catalog() -> ProductCatalog:
+    """Getting the product catalog of this process; the product information is only loaded on the
+    first call, whereas the catalog is mapped from the binary snapshot
+
+    Returns:
+        ProductCatalog: product catalog
+    """
+    global _CATALOG
+    if _CATALOG is None:
+        _CATALOG = load_catalog()
+    return _CATALOG
+
+#-----------------------------------------------
+# Main
+#-----------------------------------------------
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    logging.info('Snapshot compiler started')
+    start_time = time.time()
+    snapshot = compile_snapshot(force='--force' in sys.argv[1:])
+    logging.info('Snapshot %s compiled after %ss', snapshot, str(time.time() - start_time))
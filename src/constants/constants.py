@@ -12,6 +12,9 @@ CAMPAIGNS_ORDER = os.path.join(EXPERIMENTS_FOLDER, 'campaigns_order.csv')
 PRODUCT_PROPERTIES = os.path.join(EXPERIMENTS_FOLDER, 'product_properties.csv')
 PRODUCT_QUANTITY = os.path.join(EXPERIMENTS_FOLDER, 'product_quantity.csv')
 
+# Binary snapshots of the product information
+CATALOG_SNAPSHOT_FOLDER = os.path.join(EXPERIMENTS_FOLDER, 'snapshots')
+
 # LP encodings
 PO_ENCODING = os.path.join(EXPERIMENTS_FOLDER, 'encodings', 'po.lp')
 NORMAL_OPT_ENCODING = os.path.join(EXPERIMENTS_FOLDER, 'encodings', 'optimization', 'normal_opt.lp')
@@ -21,6 +24,9 @@ CONSTRAINT_2_ENCODING = os.path.join(EXPERIMENTS_FOLDER, 'encodings', 'constrain
 CONSTRAINT_3_ENCODING = os.path.join(EXPERIMENTS_FOLDER, 'encodings', 'constraints', 'c3.lp')
 CONSTRAINT_4_ENCODING = os.path.join(EXPERIMENTS_FOLDER, 'encodings', 'constraints', 'c4.lp')
 
+# Table of the tuned clingo configurations per approach, constraints option and sample size
+TUNED_CONFIGURATIONS_FILE = os.path.join(EXPERIMENTS_FOLDER, 'tuned_configurations.json')
+
 # Results file of computational experiment
 RESULTS_FILE = os.path.join(EXPERIMENTS_FOLDER, 'results.csv')
 RESULTS_BACKUP_FILE = os.path.join(EXPERIMENTS_FOLDER, 'results_backup.csv')
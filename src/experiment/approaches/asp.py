@@ -9,9 +9,11 @@ import os
 import sys
 import clingo
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
-from constants.constants import DOMAIN_PDDL, PROJECT_FOLDER, INSTANCES_FOLDER, TIMEOUT
+from constants.constants import DOMAIN_PDDL, PROJECT_FOLDER, INSTANCES_FOLDER
 sys.path.append(os.path.abspath(PROJECT_FOLDER))
-from src.experiment.utils import ModelHelper
+from src.experiment.utils import clingo_arguments, get_tuned_options, Deadline, ModelHelper, \
+    solve_with_deadline
+from src.experiment.approaches.logic_program import get_statistics
 from src.pddl.modeler.modeler import Modeler
 from src.pddl.translator.translator import Translator
 
@@ -76,7 +78,25 @@ def interpret_clingo(symbols : Sequence[clingo.Symbol], timesteps : int) -> List
 
     return order
 
-def run_asp(products : Set[str], run : int) -> Tuple[int, List[str], Dict[str, Any], bool]:
+def ground_horizon(ctl : clingo.Control, horizon : int) -> None:
+    """Extending the incrementally translated logic program by the timestep of the given horizon;
+    the goal of the previous horizon is released and the goal of the given one is queried, the
+    program parts of the previous timesteps are kept grounded
+
+    Args:
+        ctl (clingo.Control): clingo control object with the grounded program part base
+        horizon (int): new horizon, the timesteps are increased one by one starting with 1
+    """
+    if horizon > 1:
+        ctl.release_external(clingo.Function('query', [clingo.Number(horizon - 1)]))
+    ctl.ground([('step', [clingo.Number(horizon)]), ('check', [clingo.Number(horizon)])])
+    ctl.assign_external(clingo.Function('query', [clingo.Number(horizon)]), True)
+
+def run_asp(products : Set[str], run : int, dump : bool = False, threads : int = 1,
+            parallel_mode : str = 'compete', configuration : str = 'auto',
+            opt_strategy : str = 'bb', incremental : bool = False,
+            options : Union[Dict[str, str], None] = None,
+            deadline : Union[Deadline, None] = None) -> Tuple[int, List[str], Dict[str, Any], bool]:
     """Computing the Product Ordering problem as a logic program using the Answer Set Planning
     approach; first, the problem is understood as a classical planning problem with preferences
     and this is encoded in the planning problem description language PDDL; the PDDL instance is
@@ -86,11 +106,38 @@ def run_asp(products : Set[str], run : int) -> Tuple[int, List[str], Dict[str, A
     Args:
         products (Set[str]): set of products
         run (int): id of run
+        dump (bool, optional): additionally write the translated logic program into the \
+            instances folder. Defaults to False.
+        threads (int, optional): number of solver threads. Defaults to 1.
+        parallel_mode (str, optional): mode of the parallel solving, see clingo_arguments. \
+            Defaults to 'compete'.
+        configuration (str, optional): configuration or portfolio of clasp, see \
+            clingo_arguments. Defaults to 'auto'.
+        opt_strategy (str, optional): optimization strategy, see clingo_arguments. Defaults to \
+            'bb'.
+        incremental (bool, optional): instead of translating with the fixed number of \
+            timesteps, ground and solve the incrementally translated logic program one horizon \
+            after the other with the multi-shot solving of clingo, until the first horizon with \
+            a plan is reached; the timesteps grounded before are reused. Defaults to False.
+        options (Union[Dict[str, str], None], optional): further options of clasp, see \
+            clingo_arguments. If None and the configuration and optimization strategy are left \
+            at their defaults, the tuned options for the sample size are taken from the table of \
+            tuned configurations, if there are any. Defaults to None.
+        deadline (Union[Deadline, None], optional): deadline of the computation, which may \
+            have been started before. If None, the time limit starts now. Defaults to None.
 
     Returns:
         Tuple[int, List[str], Dict[str, Any], bool]: minimal overall changeover time, optimal \
-            product order, dictionary of clingo statistics, flag for timeout occurred
+            product order, dictionary of clingo statistics, flag for timeout occurred; as for \
+            run_clingo, the best order found so far is returned at the time limit
     """
+    if deadline is None:
+        deadline = Deadline()
+    if options is None and configuration == 'auto' and opt_strategy == 'bb':
+        options = get_tuned_options('asp_incremental' if incremental else 'asp', None,
+                                    len(products))
+        LOGGER.debug('Tuned options of clasp: %s', str(options))
+
     pddl_filename = os.path.join(INSTANCES_FOLDER, 'pddl', f'instance_{len(products)}_{run}.pddl')
     LOGGER.debug('pddl_filename: %s', pddl_filename)
     lp_filename = f'{pddl_filename}.lp'
@@ -103,64 +150,51 @@ def run_asp(products : Set[str], run : int) -> Tuple[int, List[str], Dict[str, A
     timesteps = len(products) + 3
 
     translator = Translator()
-    logic_program = translator.translate(domain=DOMAIN_PDDL, problem=pddl_filename,
-                                         timesteps=timesteps)
-    assert logic_program is not None
-
-    with open(lp_filename, 'w') as filehandle:
-        filehandle.write(logic_program)
-
-    ctl = clingo.Control()
-    ctl.add('base', [], logic_program)
+    if dump:
+        logic_program = translator.translate(domain=DOMAIN_PDDL, problem=pddl_filename,
+                                             timesteps=timesteps, incremental=incremental)
+        with open(lp_filename, 'w') as filehandle:
+            filehandle.write(logic_program)
+
+    # The initial state is only defined in the backend and thus unknown to the parser
+    ctl = clingo.Control(['--warn=no-atom-undefined'] + clingo_arguments(threads, parallel_mode,
+        configuration, opt_strategy, options))
+    translator.translate_into(ctl, domain=DOMAIN_PDDL, problem=pddl_filename, timesteps=timesteps,
+                              incremental=incremental)
     ctl.ground([('base', [])])
 
-    modelHelper = ModelHelper()
+    # Without the incremental mode, there is only the single horizon of the fixed timesteps
+    horizons = range(1, timesteps + 1) if incremental else [timesteps]
     start_time = time.time()
-    solve_handle : clingo.SolveHandle
-    with ctl.solve(on_model=modelHelper.on_model, on_finish=modelHelper.on_finish,
-        async_=True) as solve_handle: # type: ignore
-        while not solve_handle.wait(timeout=10.0):
-            if time.time() - start_time > TIMEOUT:
-                break
+    for horizon in horizons:
+        if incremental:
+            ground_horizon(ctl, horizon)
 
-    if not modelHelper.exhausted:
-        LOGGER.info('The time limit is exceeded.')
-        return -1, [], {}, True
+        modelHelper = ModelHelper(start_time)
+        solve_with_deadline(ctl, modelHelper, deadline)
 
-    if not modelHelper.optimal:
+        if not modelHelper.exhausted or modelHelper.optimal:
+            break
+        LOGGER.debug('There is no plan with horizon %d.', horizon)
+
+    if modelHelper.symbols is None:
+        if not modelHelper.exhausted:
+            LOGGER.info('The time limit is exceeded.')
+            return -1, [], {}, True
         LOGGER.info('The problem does not have an optimal solution.')
         return -1, [], {}, False
 
-    order = interpret_clingo(modelHelper.symbols, timesteps)
-    assert len(order) == len(products)
-
-    opt_value = int(ctl.statistics['summary']['costs'][0])
-
-    constraints = int(ctl.statistics['problem']['generator']['constraints'])
-    complexity = int(ctl.statistics['problem']['generator']['complexity'])
-    vars = int(ctl.statistics['problem']['generator']['vars'])
-
-    atoms = int(ctl.statistics['problem']['lp']['atoms'])
-    bodies = int(ctl.statistics['problem']['lp']['bodies'])
-    rules = int(ctl.statistics['problem']['lp']['rules'])
+    if not modelHelper.exhausted:
+        LOGGER.info('The time limit is exceeded, the best order found so far is returned.')
 
-    choices = int(ctl.statistics['solving']['solvers']['choices'])
-    conflicts = int(ctl.statistics['solving']['solvers']['conflicts'])
-    restarts = int(ctl.statistics['solving']['solvers']['restarts'])
+    order = interpret_clingo(modelHelper.symbols, horizon)
+    assert len(order) == len(products)
 
-    models = int(ctl.statistics['summary']['models']['enumerated'])
+    assert modelHelper.costs is not None
+    opt_value = modelHelper.costs[0]
 
-    stats = {
-        'Constraints': constraints,
-        'Complexity': complexity,
-        'Vars': vars,
-        'Atoms': atoms,
-        'Bodies': bodies,
-        'Rules': rules,
-        'Choices': choices,
-        'Conflicts': conflicts,
-        'Restarts': restarts,
-        'Models': models
-    }
+    stats = get_statistics(ctl)
+    stats['ProvenOptimal'] = modelHelper.optimal
+    stats['Trajectory'] = modelHelper.get_trajectory()
 
-    return opt_value, order, stats, False
+    return opt_value, order, stats, not modelHelper.exhausted
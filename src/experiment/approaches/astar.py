@@ -0,0 +1,293 @@
+"""Approach for solving the Product Ordering approach:
+A* search over the states (last product, set of scheduled products) with admissible lower bounds on
+the changeover time of the products not scheduled yet
+"""
+from typing import *
+import heapq
+import logging
+import math
+import time
+import os
+import sys
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from constants.constants import PROJECT_FOLDER, TIMEOUT, INF
+from catalog.catalog import ProductCatalog, get_catalog
+sys.path.append(PROJECT_FOLDER)
+from src.experiment.utils import build_changeover_matrices, Deadline
+
+LOGGER = logging.getLogger('experiment')
+
+# Maximal number of states stored during the search
+MAX_STATES = 4000000
+
+# Available lower bounds
+HEURISTICS = ['min_out', 'assignment', 'campaign']
+
+class Heuristic:
+    """This class computes admissible lower bounds on the costs of completing a partial product
+    order, i.e. of a path starting at the last scheduled product and visiting all remaining
+    products. All bounds are derived from the modified changeover matrix, whereas arcs of cost INF
+    are infeasible
+    """
+
+    def __init__(self, weights : np.ndarray, campaigns : Sequence[str], name : str = 'campaign') \
+        -> None:
+        """Constructor of a heuristic
+
+        Args:
+            weights (np.ndarray): arc weights, INF for infeasible arcs
+            campaigns (Sequence[str]): campaign per node
+            name (str, optional): name of the lower bound, one of HEURISTICS. Defaults to \
+                'campaign'.
+        """
+        assert name in HEURISTICS
+        self.name = name
+        self.num_nodes = weights.shape[0]
+        self.weights = weights
+        offdiagonal = np.where(np.eye(self.num_nodes, dtype=bool), INF, weights)
+        self.min_out : List[int] = offdiagonal.min(axis=1, initial=INF).tolist()
+        self.min_in : List[int] = offdiagonal.min(axis=0, initial=INF).tolist()
+
+        # Cheapest arc entering a node from another campaign
+        codes = np.unique(np.asarray(campaigns), return_inverse=True)[1].reshape(-1)
+        foreign = np.where(codes[:, np.newaxis] != codes[np.newaxis, :], weights, INF)
+        self.campaign : List[int] = codes.tolist()
+        entry = foreign.min(axis=0, initial=INF)
+        self.entry_surcharge : List[int] = \
+            np.where(entry < INF, entry - np.asarray(self.min_in), INF).tolist()
+
+    def __call__(self, mask : int, last : int) -> float:
+        """Computing the lower bound for a state
+
+        Args:
+            mask (int): bitset of the scheduled products
+            last (int): last scheduled product
+
+        Returns:
+            float: lower bound, infinity if the state can't be completed
+        """
+        remaining = [node for node in range(self.num_nodes) if not mask >> node & 1]
+        if len(remaining) == 0:
+            return 0
+        if self.name == 'min_out':
+            return self._min_out(remaining, last)
+        if self.name == 'assignment':
+            return self._assignment(remaining, last)
+        return self._campaign(remaining, last)
+
+    def _min_out(self, remaining : List[int], last : int) -> float:
+        """Every node of the remaining path except the final one is left by exactly one arc
+
+        Args:
+            remaining (List[int]): products not scheduled yet
+            last (int): last scheduled product
+
+        Returns:
+            float: lower bound
+        """
+        min_out = self.min_out
+        costs = [min_out[node] for node in remaining]
+        final = max(costs)
+        if min_out[last] >= INF or sum(cost >= INF for cost in costs) > 1:
+            return math.inf
+        return min_out[last] + sum(costs) - final
+
+    def _assignment(self, remaining : List[int], last : int) -> float:
+        """Closing the remaining path with an arc of cost 0 back to the last product yields an
+        assignment of the nodes to successors, hence the optimal assignment is a lower bound
+
+        Args:
+            remaining (List[int]): products not scheduled yet
+            last (int): last scheduled product
+
+        Returns:
+            float: lower bound
+        """
+        nodes = [last] + remaining
+        matrix = self.weights[np.ix_(nodes, nodes)].astype(np.float64)
+        np.fill_diagonal(matrix, INF)
+        matrix[1:, 0] = 0
+        rows, columns = linear_sum_assignment(matrix)
+        costs = matrix[rows, columns]
+        if (costs >= INF).any():
+            return math.inf
+        return int(costs.sum())
+
+    def _campaign(self, remaining : List[int], last : int) -> float:
+        """Every remaining product is entered by exactly one arc; additionally, the first product
+        of every remaining campaign besides the campaign of the last product is entered from
+        another campaign
+
+        Args:
+            remaining (List[int]): products not scheduled yet
+            last (int): last scheduled product
+
+        Returns:
+            float: lower bound
+        """
+        min_in, campaign, entry_surcharge = self.min_in, self.campaign, self.entry_surcharge
+        surcharges : Dict[int, int] = {}
+        for node in remaining:
+            if min_in[node] >= INF:
+                return math.inf
+            if campaign[node] != campaign[last]:
+                code = campaign[node]
+                surcharges[code] = min(surcharges.get(code, INF), entry_surcharge[node])
+        if any(surcharge >= INF for surcharge in surcharges.values()):
+            return math.inf
+        return sum(min_in[node] for node in remaining) + sum(surcharges.values())
+
+def search(weights : np.ndarray, heuristic : Heuristic, starts : Sequence[int],
+           timeout : float = TIMEOUT, max_states : int = MAX_STATES) \
+    -> Tuple[int, List[int], Dict[str, Any], bool]:
+    """A* search for a cheapest open path visiting every node exactly once. A state is encoded as
+    a single integer holding the bitset of the visited nodes and the last node, which is the key
+    of the costs and predecessors stored for the state
+
+    Args:
+        weights (np.ndarray): arc weights, INF for infeasible arcs
+        heuristic (Heuristic): admissible lower bound on the costs of completing a state
+        starts (Sequence[int]): nodes allowed as first node
+        timeout (float, optional): time limit in seconds. Defaults to TIMEOUT.
+        max_states (int, optional): maximal number of stored states; exceeding it is treated \
+            like exceeding the time limit. Defaults to MAX_STATES.
+
+    Returns:
+        Tuple[int, List[int], Dict[str, Any], bool]: minimal cost, optimal path, search \
+            statistics, flag for timeout occurred; the cost is -1 and the path is empty, if there \
+            is no path or a limit is exceeded
+    """
+    start_time = time.time()
+    num_nodes = weights.shape[0]
+    shift = max(num_nodes - 1, 1).bit_length()
+    full = (1 << num_nodes) - 1
+    successors = [[(node, int(weights[last, node])) for node in range(num_nodes) \
+        if node != last and weights[last, node] < INF] for last in range(num_nodes)]
+
+    costs : Dict[int, int] = {}
+    parents : Dict[int, int] = {}
+    frontier : List[Tuple[float, int, int, int]] = []
+    for start in starts:
+        key = (1 << start) << shift | start
+        costs[key] = 0
+        parents[key] = -1
+        estimate = heuristic(1 << start, start)
+        if estimate < math.inf:
+            heapq.heappush(frontier, (estimate, -1, key, 0))
+
+    expanded = 0
+    goal = -1
+    exceeded = False
+    while frontier:
+        _, depth, key, cost = heapq.heappop(frontier)
+        if cost > costs[key]:
+            # Outdated entry of a state reached more cheaply in the meantime
+            continue
+        mask, last = key >> shift, key & ((1 << shift) - 1)
+        if mask == full:
+            goal = key
+            break
+
+        expanded += 1
+        if expanded % 1024 == 0 and time.time() - start_time > timeout:
+            exceeded = True
+            break
+        if len(costs) > max_states:
+            LOGGER.info('The memory limit of %d states is exceeded.', max_states)
+            exceeded = True
+            break
+
+        for node, weight in successors[last]:
+            if mask >> node & 1:
+                continue
+            new_mask = mask | 1 << node
+            new_key = new_mask << shift | node
+            new_cost = cost + weight
+            if new_cost >= costs.get(new_key, math.inf):
+                continue
+            new_estimate = heuristic(new_mask, node)
+            if new_estimate == math.inf:
+                continue
+            costs[new_key] = new_cost
+            parents[new_key] = key
+            heapq.heappush(frontier, (new_cost + new_estimate, depth - 1, new_key, new_cost))
+
+    duration = max(time.time() - start_time, 1e-9)
+    stats = {
+        'Expanded': expanded,
+        'ExpandedPerSecond': expanded / duration,
+        'Frontier': len(frontier)
+    }
+
+    if goal == -1:
+        return -1, [], stats, exceeded
+
+    path = []
+    key = goal
+    while key != -1:
+        path.append(key & ((1 << shift) - 1))
+        key = parents[key]
+    path.reverse()
+
+    return costs[goal], path, stats, False
+
+def run_astar(products : Set[str], consider_constraints : Union[None, int] = None,
+              heuristic : str = 'campaign', max_states : int = MAX_STATES,
+              catalog : Union[ProductCatalog, None] = None,
+              deadline : Union[Deadline, None] = None) \
+    -> Tuple[int, List[str], Dict[str, Any], bool]:
+    """Computing the Product Ordering problem with A* search over the states (last product, set of
+    scheduled products). The costs are taken from the changeover matrix modified regarding the
+    constraints, such that the campaigns order is respected by the infeasible arcs
+
+    Args:
+        products (Set[str]): set of products
+        consider_constraints (Union[None, int], optional): Indicating which constraints are taken \
+            into account. For 0 no additional constraints are considered, for None all are \
+            considered. Defaults to None.
+        heuristic (str, optional): lower bound, one of HEURISTICS. Defaults to 'campaign'.
+        max_states (int, optional): maximal number of stored states. Defaults to MAX_STATES.
+        catalog (Union[ProductCatalog, None], optional): product catalog. If None, the catalog \
+            of this process is used. Defaults to None.
+        deadline (Union[Deadline, None], optional): deadline of the computation, which may \
+            have been started before. If None, the time limit starts now. Defaults to None.
+
+    Returns:
+        Tuple[int, List[str], Dict[str, Any], bool]: objective value, optimal product order, \
+            search statistics, flag for timeout occurred
+    """
+    if deadline is None:
+        deadline = Deadline()
+    if catalog is None:
+        catalog = get_catalog()
+    products_list = sorted(products)
+    matrix, campaigns_order = build_changeover_matrices(products_list, [consider_constraints],
+                                                        catalog)[consider_constraints]
+
+    if consider_constraints is not None and consider_constraints >= 4:
+        LOGGER.error('These constraints haven\'t been implemented yet!')
+
+    campaigns = catalog.campaign[catalog.indices(products_list)]
+    starts = list(range(len(products_list)))
+    if consider_constraints is None or consider_constraints >= 1:
+        steps = [campaigns_order[campaign] for campaign in campaigns]
+        starts = [node for node in starts if steps[node] == min(steps)]
+
+    opt_value, path, stats, timeout = search(matrix, Heuristic(matrix, campaigns, heuristic),
+                                             starts, deadline.remaining(), max_states)
+    LOGGER.debug('A* statistics: %s', str(stats))
+
+    if timeout:
+        LOGGER.info('The time limit is exceeded.')
+        return -1, [], stats, True
+
+    if len(path) == 0:
+        LOGGER.info('The problem does not have an optimal solution.')
+        return -1, [], stats, False
+
+    order = [products_list[node] for node in path]
+    assert len(order) == len(products)
+
+    return opt_value, order, stats, False
@@ -0,0 +1,203 @@
+"""Approach for solving the Product Ordering approach:
+Interpretation of problem instance as asymmetric TSP and solving it with a branch and bound
+algorithm, whereas the lower bounds are given by the assignment problem relaxation
+"""
+from typing import *
+import logging
+import time
+import os
+import sys
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from constants.constants import PROJECT_FOLDER, TIMEOUT, INF
+from catalog.catalog import ProductCatalog
+sys.path.append(PROJECT_FOLDER)
+from src.experiment.utils import Deadline
+from src.experiment.approaches.tsp_solver import build_graph
+
+LOGGER = logging.getLogger('experiment')
+
+def create_cost_matrix(edge_weights : Dict[str, Dict[str, int]]) -> Tuple[np.ndarray, List[str]]:
+    """Auxiliary function for converting a graph instance into a dense cost matrix, whereas
+    missing arcs and loops get the cost INF
+
+    Args:
+        edge_weights (Dict[str, Dict[str, int]]): graph instance
+
+    Returns:
+        Tuple[np.ndarray, List[str]]: cost matrix, node names in the order of rows and columns
+    """
+    nodes = list(edge_weights.keys())
+    index = {node: position for position, node in enumerate(nodes)}
+    matrix = np.full((len(nodes), len(nodes)), INF, dtype=np.int64)
+    for node1, neighbours in edge_weights.items():
+        for node2, distance in neighbours.items():
+            if node1 != node2:
+                matrix[index[node1], index[node2]] = distance
+    return matrix, nodes
+
+def get_subtours(successors : np.ndarray) -> List[List[int]]:
+    """Auxiliary function for decomposing an assignment into its cycles
+
+    Args:
+        successors (np.ndarray): successor of each node
+
+    Returns:
+        List[List[int]]: cycles, each beginning at its smallest node
+    """
+    visited = np.zeros(len(successors), dtype=bool)
+    subtours = []
+    for node in range(len(successors)):
+        if visited[node]:
+            continue
+        subtour = []
+        while not visited[node]:
+            visited[node] = True
+            subtour.append(node)
+            node = int(successors[node])
+        subtours.append(subtour)
+    return subtours
+
+def solve_atsp(matrix : np.ndarray, timeout : float = TIMEOUT) \
+    -> Tuple[int, List[int], Dict[str, Any], bool]:
+    """Solving the asymmetric TSP exactly with branch and bound. Each subproblem is given by sets
+    of included and excluded arcs, its lower bound is the optimal assignment respecting these
+    sets. If the assignment consists of several subtours, the subtour with the fewest free arcs
+    a_1, ..., a_k is broken up: the k-th child excludes a_k and includes a_1, ..., a_{k-1}, such
+    that the children partition the tours of the subproblem (Carpaneto and Toth). The subproblems
+    are explored depth-first, cheapest bound first, which leads to a good incumbent early on
+
+    Args:
+        matrix (np.ndarray): cost matrix, INF for infeasible arcs
+        timeout (float, optional): time limit in seconds. Defaults to TIMEOUT.
+
+    Returns:
+        Tuple[int, List[int], Dict[str, Any], bool]: minimal cost, optimal tour starting at node \
+            0, search statistics together with the trajectory of the elapsed time and costs of \
+            the incumbents, flag for timeout occurred; the cost is -1 and the tour is empty, if \
+            there is no tour; if the time limit is exceeded, the incumbent is returned
+    """
+    start_time = time.time()
+    num_nodes = matrix.shape[0]
+    # Any assignment using a forbidden arc is more expensive than every assignment without one
+    forbidden = float(INF) * (num_nodes + 1)
+    base = np.where(matrix < INF, matrix, forbidden).astype(np.float64)
+    np.fill_diagonal(base, forbidden)
+
+    def bound(included : Dict[int, int], excluded : List[Tuple[int, int]]) \
+        -> Union[Tuple[float, np.ndarray], None]:
+        costs = base.copy()
+        for source, target in included.items():
+            value = costs[source, target]
+            costs[source, :] = forbidden
+            costs[:, target] = forbidden
+            costs[source, target] = value
+        for source, target in excluded:
+            costs[source, target] = forbidden
+        rows, columns = linear_sum_assignment(costs)
+        if (costs[rows, columns] >= forbidden).any():
+            return None
+        successors = np.empty(num_nodes, dtype=np.int64)
+        successors[rows] = columns
+        return float(costs[rows, columns].sum()), successors
+
+    stats : Dict[str, Any] = {'Nodes': 0, 'Pruned': 0, 'ProvenOptimal': False, 'Trajectory': []}
+    incumbent_value = np.inf
+    incumbent : List[int] = []
+
+    root = bound({}, [])
+    stack : List[Tuple[float, np.ndarray, Dict[int, int], List[Tuple[int, int]]]] = \
+        [] if root is None else [(root[0], root[1], {}, [])]
+    while stack:
+        if time.time() - start_time > timeout:
+            if len(incumbent) == 0:
+                return -1, [], stats, True
+            return int(incumbent_value), incumbent, stats, True
+        lower_bound, successors, included, excluded = stack.pop()
+        stats['Nodes'] += 1
+        if lower_bound >= incumbent_value:
+            stats['Pruned'] += 1
+            continue
+
+        subtours = get_subtours(successors)
+        if len(subtours) == 1:
+            # The tour is an optimal assignment, hence optimal for the subproblem
+            incumbent_value = lower_bound
+            incumbent = subtours[0]
+            stats['Trajectory'].append((time.time() - start_time, int(lower_bound)))
+            LOGGER.debug('New incumbent with cost %d after %d nodes', int(lower_bound),
+                         stats['Nodes'])
+            continue
+
+        free_arcs = [[(node, int(successors[node])) for node in subtour \
+            if included.get(node) != successors[node]] for subtour in subtours]
+        branching_arcs = min(free_arcs, key=len)
+
+        children = []
+        for position, arc in enumerate(branching_arcs):
+            child_included = dict(included)
+            child_included.update(branching_arcs[:position])
+            child_excluded = excluded + [arc]
+            child = bound(child_included, child_excluded)
+            if child is not None and child[0] < incumbent_value:
+                children.append((child[0], child[1], child_included, child_excluded))
+            else:
+                stats['Pruned'] += 1
+        children.sort(key=lambda child: -child[0])
+        stack.extend(children)
+
+    if len(incumbent) == 0:
+        return -1, [], stats, False
+    stats['ProvenOptimal'] = True
+    return int(incumbent_value), incumbent, stats, False
+
+def run_branch_and_bound(products : Set[str], consider_constraints : Union[None, int] = None,
+                         catalog : Union[ProductCatalog, None] = None,
+                         deadline : Union[Deadline, None] = None) \
+    -> Tuple[int, List[str], Dict[str, Any], bool]:
+    """Computing the Product Ordering problem as asymmetric TSP with branch and bound. The
+    graph instance is the cyclic one also given to Concorde, but without the transformation into a
+    symmetric instance; the additional node V closes the product order to a tour
+
+    Args:
+        products (Set[str]): set of products
+        consider_constraints (Union[None, int], optional): Indicating which constraints are taken \
+            into account. For 0 no additional constraints are considered, for None all are \
+            considered. Defaults to None.
+        catalog (Union[ProductCatalog, None], optional): product catalog. If None, the catalog \
+            of this process is used. Defaults to None.
+        deadline (Union[Deadline, None], optional): deadline of the computation, which may \
+            have been started before. If None, the time limit starts now. Defaults to None.
+
+    Returns:
+        Tuple[int, List[str], Dict[str, Any], bool]: objective value, optimal product order, \
+            search statistics, flag for timeout occurred; if the time limit is exceeded, the best \
+            order found so far is returned, whereas the statistics tell whether the order is \
+            proven optimal, together with the trajectory of the elapsed time and costs
+    """
+    if deadline is None:
+        deadline = Deadline()
+    edge_weights = build_graph(products, cyclic=True, consider_constraints=consider_constraints,
+                               catalog=catalog)
+    assert isinstance(edge_weights, dict)
+    matrix, nodes = create_cost_matrix(edge_weights)
+
+    opt_value, tour, stats, timeout = solve_atsp(matrix, deadline.remaining())
+    LOGGER.debug('Branch and bound statistics: %s', str(stats))
+
+    if len(tour) == 0:
+        if timeout:
+            LOGGER.info('The time limit is exceeded.')
+            return -1, [], stats, True
+        LOGGER.info('The problem does not have an optimal solution.')
+        return -1, [], stats, False
+
+    if timeout:
+        LOGGER.info('The time limit is exceeded, the best order found so far is returned.')
+
+    position = tour.index(nodes.index('v'))
+    order = [nodes[node] for node in tour[position + 1:] + tour[:position]]
+    assert len(order) == len(products)
+
+    return opt_value, order, stats, timeout
@@ -0,0 +1,221 @@
+"""Approach for solving the Product Ordering approach:
+Constraint programming with the circuit constraint of the CP-SAT solver of OR-Tools over the
+feasible changeovers, solved by a portfolio of parallel search workers
+"""
+from typing import *
+import logging
+import time
+import os
+import sys
+from ortools.sat.python import cp_model
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from constants.constants import PROJECT_FOLDER
+from catalog.catalog import ProductCatalog, get_catalog
+sys.path.append(PROJECT_FOLDER)
+from src.experiment.utils import calculate_oct, get_position_bounds, Deadline
+from src.experiment.approaches.tsp_solver import build_graph
+from src.experiment.approaches.heuristics import construct_order
+
+LOGGER = logging.getLogger('experiment')
+
+# Number of parallel search workers of CP-SAT
+NUM_WORKERS = 8
+
+def create_model(products : Set[str], consider_constraints : Union[None, int] = None,
+                 catalog : Union[ProductCatalog, None] = None) \
+    -> Tuple[cp_model.CpModel, Dict[str, Dict[str, cp_model.IntVar]], \
+        Dict[str, cp_model.IntVar]]:
+    """Creating a CP-SAT model of the Product Ordering problem: every feasible changeover of the
+    cyclic graph instance gets a literal, and the literals form a Hamiltonian circuit through all
+    products and V. The changeovers violating the constraints of level 1 and 2 are missing in the
+    graph instance already, the costs are the ones modified regarding the constraints. Additionally
+    each product gets its position within its bounds, which is increased by one along every used
+    changeover; thereby the campaigns order is propagated on the positions directly
+
+    Args:
+        products (Set[str]): set of products
+        consider_constraints (Union[None, int], optional): Indicating which constraints are taken \
+            into account. For 0 no additional constraints are considered, for None all are \
+            considered. Defaults to None.
+        catalog (Union[ProductCatalog, None], optional): product catalog. If None, the catalog \
+            of this process is used. Defaults to None.
+
+    Returns:
+        Tuple[cp_model.CpModel, Dict[str, Dict[str, cp_model.IntVar]], \
+            Dict[str, cp_model.IntVar]]: CP-SAT model, literal per changeover, position per product
+    """
+    if catalog is None:
+        catalog = get_catalog()
+    edge_weights = build_graph(products, cyclic=True, consider_constraints=consider_constraints,
+                               catalog=catalog)
+    assert isinstance(edge_weights, dict)
+    index = {node: position for position, node in enumerate(edge_weights)}
+
+    model = cp_model.CpModel()
+    literals : Dict[str, Dict[str, cp_model.IntVar]] = {}
+    circuit = []
+    costs = []
+    for product1, values in edge_weights.items():
+        literals[product1] = {}
+        for product2, weight in values.items():
+            literal = model.NewBoolVar(f'x_{product1}_{product2}')
+            literals[product1][product2] = literal
+            circuit.append((index[product1], index[product2], literal))
+            costs.append((literal, weight))
+    model.AddCircuit(circuit)
+
+    bounds = get_position_bounds(products, consider_constraints, catalog)
+    positions = {product: model.NewIntVar(lower, upper, f'u_{product}') \
+        for product, (lower, upper) in bounds.items()}
+    for product1, values in literals.items():
+        for product2, literal in values.items():
+            if product1 == 'v':
+                model.Add(positions[product2] == 1).OnlyEnforceIf(literal)
+            elif product2 == 'v':
+                model.Add(positions[product1] == len(products)).OnlyEnforceIf(literal)
+            else:
+                model.Add(positions[product2] == positions[product1] + 1).OnlyEnforceIf(literal)
+
+    model.Minimize(sum(weight * literal for literal, weight in costs))
+
+    return model, literals, positions
+
+def add_hint(model : cp_model.CpModel, literals : Dict[str, Dict[str, cp_model.IntVar]],
+             positions : Dict[str, cp_model.IntVar], order : List[str]) -> bool:
+    """Passing a product order as solution hint to CP-SAT; all literals and positions get a value
+
+    Args:
+        model (cp_model.CpModel): CP-SAT model
+        literals (Dict[str, Dict[str, cp_model.IntVar]]): literal per changeover
+        positions (Dict[str, cp_model.IntVar]): position per product
+        order (List[str]): product order
+
+    Returns:
+        bool: flag whether the hint was added; False, if the order uses a missing changeover
+    """
+    switches = set(zip(['v'] + order, order + ['v']))
+    if any(product2 not in literals[product1] for product1, product2 in switches):
+        LOGGER.debug('The hint uses a changeover missing in the model.')
+        return False
+    for product1, values in literals.items():
+        for product2, literal in values.items():
+            model.AddHint(literal, 1 if (product1, product2) in switches else 0)
+    for position, product in enumerate(order):
+        model.AddHint(positions[product], position + 1)
+    return True
+
+def extract_order(solver : cp_model.CpSolver,
+                  literals : Dict[str, Dict[str, cp_model.IntVar]]) -> List[str]:
+    """Following the used changeovers of the solution from V for extracting the order of products
+
+    Args:
+        solver (cp_model.CpSolver): CP-SAT solver after solving
+        literals (Dict[str, Dict[str, cp_model.IntVar]]): literal per changeover
+
+    Returns:
+        List[str]: extracted order of products
+    """
+    successors = {product1: product2 for product1, values in literals.items() \
+        for product2, literal in values.items() if solver.BooleanValue(literal)}
+    order = []
+    cur_product = successors['v']
+    while cur_product != 'v':
+        order.append(cur_product)
+        cur_product = successors[cur_product]
+    return order
+
+class TrajectoryCallback(cp_model.CpSolverSolutionCallback):
+    """Solution callback recording the improving solutions of CP-SAT as trajectory of the elapsed
+    time and costs
+    """
+    def __init__(self, start_time : float):
+        super().__init__()
+        self.start_time = start_time
+        self.trajectory : List[Tuple[float, int]] = []
+
+    def on_solution_callback(self) -> None:
+        cost = round(self.ObjectiveValue())
+        if len(self.trajectory) == 0 or cost < self.trajectory[-1][1]:
+            self.trajectory.append((time.time() - self.start_time, cost))
+
+def run_cpsat(products : Set[str], consider_constraints : Union[None, int] = None,
+              num_workers : int = NUM_WORKERS, hint : bool = True,
+              catalog : Union[ProductCatalog, None] = None,
+              deadline : Union[Deadline, None] = None) \
+    -> Tuple[int, List[str], Dict[str, Any], bool]:
+    """Computing the Product Ordering problem with the circuit constraint of CP-SAT, whose parallel
+    search workers share the bounds and solutions found
+
+    Args:
+        products (Set[str]): set of products
+        consider_constraints (Union[None, int], optional): Indicating which constraints are taken \
+            into account. For 0 no additional constraints are considered, for None all are \
+            considered. Defaults to None.
+        num_workers (int, optional): number of parallel search workers. Defaults to NUM_WORKERS.
+        hint (bool, optional): start the search with the heuristically constructed order as \
+            solution hint. Defaults to True.
+        catalog (Union[ProductCatalog, None], optional): product catalog. If None, the catalog \
+            of this process is used. Defaults to None.
+        deadline (Union[Deadline, None], optional): deadline of the computation, which may \
+            have been started before. If None, the time limit starts now. Defaults to None.
+
+    Returns:
+        Tuple[int, List[str], Dict[str, Any], bool]: objective value, optimal product order, \
+            dictionary of the number of variables and constraints and the times for building and \
+            solving the model, flag for timeout occurred; if the time limit is exceeded, the best \
+            order found so far is returned, whereas the statistics tell whether the order is \
+            proven optimal, together with the trajectory of the elapsed time and costs
+    """
+    if catalog is None:
+        catalog = get_catalog()
+    if deadline is None:
+        deadline = Deadline()
+
+    if consider_constraints is not None and consider_constraints >= 4:
+        LOGGER.error('These constraints haven\'t been implemented yet!')
+
+    build_time = time.time()
+    model, literals, positions = create_model(products, consider_constraints, catalog)
+    build_time = time.time() - build_time
+
+    if hint:
+        _, order = construct_order(products, consider_constraints, catalog)
+        if len(order) > 0:
+            add_hint(model, literals, positions, order)
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = deadline.remaining()
+    solver.parameters.num_search_workers = num_workers
+    solve_time = time.time()
+    callback = TrajectoryCallback(solve_time)
+    status = solver.Solve(model, callback)
+    solve_time = time.time() - solve_time
+
+    proto = model.Proto()
+    stats : Dict[str, Any] = {'BuildTime': build_time, 'SolveTime': solve_time,
+                              'Variables': len(proto.variables),
+                              'Constraints': len(proto.constraints),
+                              'ProvenOptimal': status == cp_model.OPTIMAL,
+                              'Trajectory': callback.trajectory}
+    LOGGER.debug('Model statistics: %s', str(stats))
+    LOGGER.debug('CP-SAT statistics: %s', solver.ResponseStats())
+
+    if status == cp_model.UNKNOWN:
+        LOGGER.info('The time limit is exceeded.')
+        return -1, [], stats, True
+
+    if status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+        LOGGER.info('The problem does not have an optimal solution.')
+        return -1, [], stats, False
+
+    timeout = status == cp_model.FEASIBLE
+    if timeout:
+        LOGGER.info('The time limit is exceeded, the best order found so far is returned.')
+
+    order = extract_order(solver, literals)
+    assert sorted(order) == sorted(products)
+    opt_value = round(solver.ObjectiveValue())
+    LOGGER.debug('Objective value = %s, changeover time = %d', str(opt_value),
+                 calculate_oct(order, catalog=catalog))
+
+    return opt_value, order, stats, timeout
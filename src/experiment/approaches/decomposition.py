@@ -0,0 +1,318 @@
+"""Approach for solving the Product Ordering approach:
+Decomposition of the problem instance into campaign blocks. Regarding the campaigns order, the
+products are sequenced campaign block by campaign block, hence each block is solved independently
+as open path problem for every pair of entry and exit product, before the blocks are stitched
+together with a dynamic program over the campaigns of each step of the campaigns order
+"""
+from typing import *
+import logging
+import os
+import sys
+import numpy as np
+from joblib import Parallel, delayed
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from constants.constants import PROJECT_FOLDER, INF
+from catalog.catalog import ProductCatalog, get_catalog
+from catalog.arcs import ArcList
+sys.path.append(PROJECT_FOLDER)
+from src.experiment.utils import build_changeover_matrices, Deadline
+from src.experiment.approaches.held_karp import UNREACHABLE, solve_open_paths, solve_open_path
+
+LOGGER = logging.getLogger('experiment')
+
+class Block(NamedTuple):
+    """Solved campaign block; costs[i, j] and paths[i][j] belong to the cheapest path through all
+    nodes of the block entering in nodes[i] and leaving in nodes[j]
+    """
+    campaign : str
+    nodes : np.ndarray
+    costs : np.ndarray
+    paths : List[List[List[int]]]
+
+def _solve_entry(weights : np.ndarray, entry : int, deadline : Deadline) \
+    -> Tuple[List[int], List[List[int]], bool]:
+    """Auxiliary function for solving a campaign block for one entry product and all exit
+    products at once
+
+    Args:
+        weights (np.ndarray): arc weights within the block
+        entry (int): position of the entry product in the block
+        deadline (Deadline): deadline of the computation; the time limit of the subproblem is \
+            the time remaining when it starts
+
+    Returns:
+        Tuple[List[int], List[List[int]], bool]: minimal cost and cheapest path per exit product, \
+            flag for timeout occurred
+    """
+    if deadline.expired():
+        return [], [], True
+    return solve_open_paths(weights, [entry], timeout=deadline.remaining())
+
+def solve_blocks(matrix : np.ndarray, campaigns : Sequence[str], n_jobs : int = 1,
+                 deadline : Union[Deadline, None] = None) -> Tuple[List[Block], bool]:
+    """Solving all campaign blocks for every pair of entry and exit product; the subproblems are
+    distributed over the given number of processes
+
+    Args:
+        matrix (np.ndarray): modified changeover matrix
+        campaigns (Sequence[str]): campaign per product
+        n_jobs (int, optional): number of processes. Defaults to 1.
+        deadline (Union[Deadline, None], optional): deadline shared by all subproblems; no \
+            further subproblems are started, once it has passed. If None, the time limit starts \
+            now. Defaults to None.
+
+    Returns:
+        Tuple[List[Block], bool]: solved blocks, flag for timeout occurred
+    """
+    if deadline is None:
+        deadline = Deadline()
+    groups : Dict[str, List[int]] = {}
+    for node, campaign in enumerate(campaigns):
+        groups.setdefault(str(campaign), []).append(node)
+
+    tasks = [(campaign, entry) for campaign, nodes in groups.items() \
+        for entry in range(len(nodes))]
+    weights = {campaign: matrix[np.ix_(nodes, nodes)] for campaign, nodes in groups.items()}
+    results = Parallel(n_jobs=n_jobs)(delayed(_solve_entry)(weights[campaign], entry, deadline) \
+        for campaign, entry in tasks if not deadline.expired())
+    if len(results) < len(tasks) or any(timeout for _, _, timeout in results):
+        return [], True
+
+    blocks = []
+    for campaign, nodes in groups.items():
+        costs = np.full((len(nodes), len(nodes)), UNREACHABLE, dtype=np.int64)
+        paths : List[List[List[int]]] = [[[] for _ in nodes] for _ in nodes]
+        for (task_campaign, entry), (opt_values, local_paths, _) in zip(tasks, results):
+            if task_campaign != campaign:
+                continue
+            for exit_node, opt_value in enumerate(opt_values):
+                if opt_value != -1:
+                    costs[entry, exit_node] = opt_value
+                    paths[entry][exit_node] = [nodes[node] for node in local_paths[exit_node]]
+        blocks.append(Block(campaign, np.array(nodes, dtype=np.int64), costs, paths))
+    return blocks, False
+
+def stitch_blocks(matrix : np.ndarray, blocks : List[Block], steps : Dict[str, int]) \
+    -> Tuple[int, List[int]]:
+    """Stitching the solved campaign blocks together to a cheapest product order. The blocks are
+    visited step by step of the campaigns order; within a step, the order of the blocks is chosen
+    by a dynamic program over the subsets of blocks of the step, whose states hold the minimal
+    costs per exit product. Entering a block b after leaving the previous block in x is the
+    min-plus product of the costs per x with the arcs into b and the entry-exit costs of b
+
+    Args:
+        matrix (np.ndarray): modified changeover matrix
+        blocks (List[Block]): solved campaign blocks
+        steps (Dict[str, int]): step of the campaigns order per campaign
+
+    Returns:
+        Tuple[int, List[int]]: minimal cost, optimal product order; the cost is -1 and the order \
+            is empty, if there is no product order
+    """
+    num_nodes = matrix.shape[0]
+    weights = np.where(matrix < INF, matrix, UNREACHABLE).astype(np.int64)
+    block_of = np.zeros(num_nodes, dtype=np.int64)
+    for position, block in enumerate(blocks):
+        block_of[block.nodes] = position
+
+    # Per step: positions of the blocks, and per subset of blocks the entry product and the exit
+    # product of the previous block per exit product
+    layers : List[Tuple[List[int], List[np.ndarray], List[np.ndarray]]] = []
+    current : Union[np.ndarray, None] = None
+    for step in sorted(set(steps[block.campaign] for block in blocks)):
+        positions = [position for position, block in enumerate(blocks) \
+            if steps[block.campaign] == step]
+        num_subsets = 1 << len(positions)
+        table : List[Union[np.ndarray, None]] = [None] * num_subsets
+        entries = [np.full(num_nodes, -1, dtype=np.int64) for _ in range(num_subsets)]
+        previous = [np.full(num_nodes, -1, dtype=np.int64) for _ in range(num_subsets)]
+        table[0] = current
+
+        for subset in range(num_subsets - 1):
+            previous_costs = table[subset]
+            if previous_costs is None and (subset != 0 or current is not None):
+                continue
+            for bit, position in enumerate(positions):
+                if subset >> bit & 1:
+                    continue
+                block = blocks[position]
+                if previous_costs is None:
+                    # First block of the product order
+                    entry_costs = np.zeros(len(block.nodes), dtype=np.int64)
+                    exits = np.full(len(block.nodes), -1, dtype=np.int64)
+                else:
+                    candidates = previous_costs[:, np.newaxis] + weights[:, block.nodes]
+                    exits = candidates.argmin(axis=0)
+                    entry_costs = np.minimum(candidates.min(axis=0), UNREACHABLE)
+                candidates = entry_costs[:, np.newaxis] + block.costs
+                best_entries = candidates.argmin(axis=0)
+                costs = np.minimum(candidates.min(axis=0), UNREACHABLE)
+
+                new_subset = subset | 1 << bit
+                new_costs = table[new_subset]
+                if new_costs is None:
+                    new_costs = np.full(num_nodes, UNREACHABLE, dtype=np.int64)
+                    table[new_subset] = new_costs
+                improved = costs < new_costs[block.nodes]
+                nodes = block.nodes[improved]
+                new_costs[nodes] = costs[improved]
+                entries[new_subset][nodes] = block.nodes[best_entries[improved]]
+                previous[new_subset][nodes] = exits[best_entries[improved]]
+
+        current = table[num_subsets - 1]
+        if current is None:
+            return -1, []
+        layers.append((positions, entries, previous))
+
+    assert current is not None
+    last = int(current.argmin())
+    if current[last] >= UNREACHABLE:
+        return -1, []
+    opt_value = int(current[last])
+
+    order : List[int] = []
+    for positions, entries, previous in reversed(layers):
+        subset = (1 << len(positions)) - 1
+        while subset != 0:
+            position = int(block_of[last])
+            block = blocks[position]
+            local_entry = int(np.flatnonzero(block.nodes == entries[subset][last])[0])
+            local_exit = int(np.flatnonzero(block.nodes == last)[0])
+            order = block.paths[local_entry][local_exit] + order
+            last = int(previous[subset][last])
+            subset ^= 1 << positions.index(position)
+
+    return opt_value, order
+
+def decompose(products : Set[str], consider_constraints : Union[None, int] = None,
+              n_jobs : int = 1, catalog : Union[ProductCatalog, None] = None,
+              deadline : Union[Deadline, None] = None) \
+    -> Tuple[int, List[str], List[Block], bool]:
+    """Computing the Product Ordering problem with the campaign decomposition; this requires the
+    campaigns order to be considered
+
+    Args:
+        products (Set[str]): set of products
+        consider_constraints (Union[None, int], optional): Indicating which constraints are taken \
+            into account. For None all are considered, at least 1 is required. Defaults to None.
+        n_jobs (int, optional): number of processes for solving the blocks. Defaults to 1.
+        catalog (Union[ProductCatalog, None], optional): product catalog. If None, the catalog \
+            of this process is used. Defaults to None.
+        deadline (Union[Deadline, None], optional): deadline of the computation, which may \
+            have been started before. If None, the time limit starts now. Defaults to None.
+
+    Returns:
+        Tuple[int, List[str], List[Block], bool]: objective value, optimal product order, solved \
+            blocks, flag for timeout occurred
+    """
+    if deadline is None:
+        deadline = Deadline()
+    assert consider_constraints is None or consider_constraints >= 1
+    if catalog is None:
+        catalog = get_catalog()
+    products_list = sorted(products)
+    matrix, campaigns_order = build_changeover_matrices(products_list, [consider_constraints],
+                                                        catalog)[consider_constraints]
+    campaigns = [str(campaign) for campaign in catalog.campaign[catalog.indices(products_list)]]
+
+    blocks, timeout = solve_blocks(matrix, campaigns, n_jobs, deadline)
+    if timeout:
+        return -1, [], [], True
+
+    opt_value, path = stitch_blocks(matrix, blocks, campaigns_order)
+    return opt_value, [products_list[node] for node in path], blocks, False
+
+def reduce_arcs(products : Set[str], n_jobs : int = 1,
+                catalog : Union[ProductCatalog, None] = None,
+                deadline : Union[Deadline, None] = None) -> ArcList:
+    """Preprocessing a problem instance for the other approaches, whereas the campaigns order is
+    considered (option 1): within a campaign block only the arcs of the cheapest paths between
+    entry and exit products are kept, the arcs between the blocks are kept completely. Hence at
+    least one optimal product order remains feasible. The arc list has the unmodified changeover
+    times as costs and can be passed to create_lp_instance, add_lp_instance, create_model and
+    Modeler.create_instance
+
+    Args:
+        products (Set[str]): set of products
+        n_jobs (int, optional): number of processes for solving the blocks. Defaults to 1.
+        catalog (Union[ProductCatalog, None], optional): product catalog. If None, the catalog \
+            of this process is used. Defaults to None.
+        deadline (Union[Deadline, None], optional): deadline of the computation, which may \
+            have been started before. If None, the time limit starts now. Defaults to None.
+
+    Returns:
+        ArcList: reduced arc list
+    """
+    if deadline is None:
+        deadline = Deadline()
+    if catalog is None:
+        catalog = get_catalog()
+    products_list = sorted(products)
+    indices = catalog.indices(products_list)
+    matrix = catalog.matrix[np.ix_(indices, indices)].astype(np.int64)
+
+    _, _, blocks, timeout = decompose(products, 1, n_jobs, catalog, deadline)
+    if timeout:
+        return ArcList.from_matrix(products_list, matrix)
+
+    keep = np.ones(matrix.shape, dtype=bool)
+    for block in blocks:
+        keep[np.ix_(block.nodes, block.nodes)] = False
+        for row in block.paths:
+            for path in row:
+                keep[path[:-1], path[1:]] = True
+    return ArcList.from_matrix(products_list, np.where(keep, matrix, INF))
+
+def run_decomposition(products : Set[str], consider_constraints : Union[None, int] = None,
+                      n_jobs : int = 1, catalog : Union[ProductCatalog, None] = None,
+                      deadline : Union[Deadline, None] = None) -> Tuple[int, List[str], bool]:
+    """Computing the Product Ordering problem with the campaign decomposition. Without the
+    campaigns order, there are no campaign blocks, hence the whole instance is computed with the
+    Held-Karp algorithm instead
+
+    Args:
+        products (Set[str]): set of products
+        consider_constraints (Union[None, int], optional): Indicating which constraints are taken \
+            into account. For 0 no additional constraints are considered, for None all are \
+            considered. Defaults to None.
+        n_jobs (int, optional): number of processes for solving the blocks. Defaults to 1.
+        catalog (Union[ProductCatalog, None], optional): product catalog. If None, the catalog \
+            of this process is used. Defaults to None.
+        deadline (Union[Deadline, None], optional): deadline of the computation, which may \
+            have been started before. If None, the time limit starts now. Defaults to None.
+
+    Returns:
+        Tuple[int, List[str], bool]: objective value, optimal product order, flag for timeout \
+            occurred
+    """
+    if deadline is None:
+        deadline = Deadline()
+    if consider_constraints is not None and consider_constraints >= 4:
+        LOGGER.error('These constraints haven\'t been implemented yet!')
+
+    if consider_constraints is not None and consider_constraints < 1:
+        LOGGER.info('The campaign decomposition requires the campaigns order; computing the ' + \
+            'whole instance instead.')
+        if catalog is None:
+            catalog = get_catalog()
+        products_list = sorted(products)
+        matrix, _ = build_changeover_matrices(products_list, [consider_constraints],
+                                              catalog)[consider_constraints]
+        nodes = list(range(len(products_list)))
+        opt_value, path, timeout = solve_open_path(matrix, nodes, nodes, n_jobs=n_jobs,
+                                                   timeout=deadline.remaining())
+        order = [products_list[node] for node in path]
+    else:
+        opt_value, order, _, timeout = decompose(products, consider_constraints, n_jobs, catalog,
+                                                 deadline)
+
+    if timeout:
+        LOGGER.info('The time limit is exceeded.')
+        return -1, [], True
+
+    if len(order) == 0:
+        LOGGER.info('The problem does not have an optimal solution.')
+        return -1, [], False
+
+    assert len(order) == len(products)
+    return opt_value, order, False
@@ -0,0 +1,257 @@
+"""Approach for solving the Product Ordering approach:
+Exact dynamic programming over subsets of products (Held-Karp algorithm) for the open path through
+all products, whereas the transitions of each layer of the subset lattice are vectorized
+"""
+from typing import *
+import logging
+import time
+import os
+import sys
+import numpy as np
+from joblib import Parallel, delayed
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from constants.constants import PROJECT_FOLDER, TIMEOUT, INF
+from catalog.catalog import ProductCatalog, get_catalog
+sys.path.append(PROJECT_FOLDER)
+from src.experiment.utils import build_changeover_matrices, Deadline
+
+LOGGER = logging.getLogger('experiment')
+
+# Cost of unreachable states; small enough that two of them can be added without overflow
+UNREACHABLE = np.iinfo(np.int64).max // 4
+
+# Maximal number of states per layer of the dynamic program
+MAX_STATES = 2000000
+
+# Maximal number of nodes, whose subsets fit into the bit masks of type int64
+MAX_NODES = 62
+
+def _expand_layer(masks : np.ndarray, costs : np.ndarray, weights : np.ndarray,
+                  required : np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Auxiliary function for expanding the states of one layer of the subset lattice by one
+    product; for every product j, all states not containing j are extended by the cheapest arc
+    into j at once
+
+    Args:
+        masks (np.ndarray): bitmasks of the scheduled products of the states
+        costs (np.ndarray): minimal costs per state and last product, of shape (states, products)
+        weights (np.ndarray): arc weights with UNREACHABLE for infeasible arcs
+        required (np.ndarray): bitmask per product, which has to be scheduled before the product
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: bitmasks, last products, costs and \
+            previous products of the expanded states
+    """
+    new_masks, new_lasts, new_costs, new_parents = [], [], [], []
+    for product in range(weights.shape[0]):
+        bit = np.int64(1) << np.int64(product)
+        selection = ((masks & bit) == 0) & ((masks & required[product]) == required[product])
+        if not selection.any():
+            continue
+        candidates = costs[selection] + weights[:, product][np.newaxis, :]
+        parents = candidates.argmin(axis=1)
+        best = candidates[np.arange(len(parents)), parents]
+        valid = best < UNREACHABLE
+        new_masks.append(masks[selection][valid] | bit)
+        new_lasts.append(np.full(int(valid.sum()), product, dtype=np.int64))
+        new_costs.append(best[valid])
+        new_parents.append(parents[valid])
+    if len(new_masks) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty, empty
+    return np.concatenate(new_masks), np.concatenate(new_lasts), np.concatenate(new_costs), \
+        np.concatenate(new_parents)
+
+def solve_open_paths(weights : np.ndarray, starts : Sequence[int],
+                     steps : Union[np.ndarray, None] = None, n_jobs : int = 1,
+                     timeout : float = TIMEOUT, max_states : int = MAX_STATES) \
+    -> Tuple[List[int], List[List[int]], bool]:
+    """Computing a cheapest open path visiting every node exactly once for every possible last
+    node with the Held-Karp algorithm. The subset lattice is processed layer by layer, whereas a
+    layer holds all states (set of visited nodes, last node) with the same number of visited
+    nodes. If steps are given, a node may only be added to a state, if all nodes of earlier steps
+    are visited already; this prunes all states violating the campaigns order
+
+    Args:
+        weights (np.ndarray): arc weights, INF for infeasible arcs
+        starts (Sequence[int]): nodes allowed as first node
+        steps (Union[np.ndarray, None], optional): step of the campaigns order per node. \
+            Defaults to None.
+        n_jobs (int, optional): number of processes, between which the states of each layer are \
+            split. Defaults to 1.
+        timeout (float, optional): time limit in seconds. Defaults to TIMEOUT.
+        max_states (int, optional): maximal number of states per layer; exceeding it or more \
+            than MAX_NODES nodes are treated like exceeding the time limit. Defaults to \
+            MAX_STATES.
+
+    Returns:
+        Tuple[List[int], List[List[int]], bool]: minimal cost and cheapest path per last node, \
+            flag for timeout occurred; the cost is -1 and the path is empty, if there is no path \
+            ending in the node or a limit is exceeded
+    """
+    start_time = time.time()
+    num_nodes = weights.shape[0]
+    assert num_nodes > 0
+    no_paths : List[List[int]] = [[] for _ in range(num_nodes)]
+    if num_nodes > MAX_NODES:
+        LOGGER.info('The subsets of %d nodes exceed the bit masks of %d nodes.', num_nodes,
+                    MAX_NODES)
+        return [-1] * num_nodes, no_paths, True
+    weights = np.where(weights < INF, weights, UNREACHABLE).astype(np.int64)
+
+    required = np.zeros(num_nodes, dtype=np.int64)
+    if steps is not None:
+        for node in range(num_nodes):
+            for other in np.flatnonzero(steps < steps[node]):
+                required[node] |= np.int64(1) << np.int64(other)
+
+    starts = [start for start in starts if required[start] == 0]
+    masks = np.array([1 << start for start in starts], dtype=np.int64)
+    costs = np.full((len(starts), num_nodes), UNREACHABLE, dtype=np.int64)
+    costs[np.arange(len(starts)), starts] = 0
+    layers : List[Tuple[np.ndarray, np.ndarray]] = []
+
+    for _ in range(1, num_nodes):
+        if time.time() - start_time > timeout:
+            return [-1] * num_nodes, no_paths, True
+        if len(masks) == 0:
+            return [-1] * num_nodes, no_paths, False
+
+        if n_jobs == 1 or len(masks) < 1024:
+            new_masks, new_lasts, new_costs, new_parents = \
+                _expand_layer(masks, costs, weights, required)
+        else:
+            chunks = np.array_split(np.arange(len(masks)), n_jobs)
+            results = Parallel(n_jobs=n_jobs)(delayed(_expand_layer)(masks[chunk], costs[chunk],
+                weights, required) for chunk in chunks if len(chunk) > 0)
+            new_masks, new_lasts, new_costs, new_parents = \
+                [np.concatenate(arrays) for arrays in zip(*results)]
+
+        if len(new_masks) > max_states:
+            LOGGER.info('The memory limit of %d states per layer is exceeded.', max_states)
+            return [-1] * num_nodes, no_paths, True
+
+        # A state (mask, last) is generated at most once, since the previous mask is mask - last
+        masks, rows = np.unique(new_masks, return_inverse=True)
+        rows = rows.reshape(-1)
+        costs = np.full((len(masks), num_nodes), UNREACHABLE, dtype=np.int64)
+        costs[rows, new_lasts] = new_costs
+        parents = np.full((len(masks), num_nodes), -1, dtype=np.int16)
+        parents[rows, new_lasts] = new_parents
+        layers.append((masks, parents))
+
+    if len(masks) == 0:
+        return [-1] * num_nodes, no_paths, False
+    assert len(masks) == 1
+
+    opt_values = [-1] * num_nodes
+    paths : List[List[int]] = [[] for _ in range(num_nodes)]
+    for end in np.flatnonzero(costs[0] < UNREACHABLE).tolist():
+        opt_values[end] = int(costs[0, end])
+        last = end
+        path = [last]
+        mask = int(masks[0])
+        for layer_masks, parents in reversed(layers):
+            row = int(np.searchsorted(layer_masks, mask))
+            previous = int(parents[row, last])
+            mask ^= 1 << last
+            last = previous
+            path.append(last)
+        path.reverse()
+        paths[end] = path
+
+    return opt_values, paths, False
+
+def solve_open_path(weights : np.ndarray, starts : Sequence[int], ends : Sequence[int],
+                    steps : Union[np.ndarray, None] = None, n_jobs : int = 1,
+                    timeout : float = TIMEOUT, max_states : int = MAX_STATES) \
+    -> Tuple[int, List[int], bool]:
+    """Computing a cheapest open path visiting every node exactly once with the Held-Karp
+    algorithm, whereas the path has to start and end in one of the given nodes
+
+    Args:
+        weights (np.ndarray): arc weights, INF for infeasible arcs
+        starts (Sequence[int]): nodes allowed as first node
+        ends (Sequence[int]): nodes allowed as last node
+        steps (Union[np.ndarray, None], optional): step of the campaigns order per node. \
+            Defaults to None.
+        n_jobs (int, optional): number of processes, between which the states of each layer are \
+            split. Defaults to 1.
+        timeout (float, optional): time limit in seconds. Defaults to TIMEOUT.
+        max_states (int, optional): maximal number of states per layer; exceeding it is treated \
+            like exceeding the time limit. Defaults to MAX_STATES.
+
+    Returns:
+        Tuple[int, List[int], bool]: minimal cost, optimal path, flag for timeout occurred; the \
+            cost is -1 and the path is empty, if there is no path or a limit is exceeded
+    """
+    opt_values, paths, timeout = solve_open_paths(weights, starts, steps, n_jobs, timeout,
+                                                  max_states)
+    candidates = [end for end in ends if opt_values[end] != -1]
+    if timeout or len(candidates) == 0:
+        return -1, [], timeout
+    last = min(candidates, key=lambda end: opt_values[end])
+    return opt_values[last], paths[last], False
+
+def run_held_karp(products : Set[str], consider_constraints : Union[None, int] = None,
+                  n_jobs : int = 1, catalog : Union[ProductCatalog, None] = None,
+                  deadline : Union[Deadline, None] = None) -> Tuple[int, List[str], bool]:
+    """Computing the Product Ordering problem exactly with the Held-Karp algorithm, a dynamic
+    program over all subsets of products. The costs are taken from the changeover matrix modified
+    regarding the constraints; if the campaigns order is considered, the products are added
+    campaign step by campaign step only, which prunes most of the subsets
+
+    Args:
+        products (Set[str]): set of products
+        consider_constraints (Union[None, int], optional): Indicating which constraints are taken \
+            into account. For 0 no additional constraints are considered, for None all are \
+            considered. Defaults to None.
+        n_jobs (int, optional): number of processes per layer of the dynamic program. Defaults \
+            to 1.
+        catalog (Union[ProductCatalog, None], optional): product catalog. If None, the catalog \
+            of this process is used. Defaults to None.
+        deadline (Union[Deadline, None], optional): deadline of the computation, which may \
+            have been started before. If None, the time limit starts now. Defaults to None.
+
+    Returns:
+        Tuple[int, List[str], bool]: objective value, optimal product order, flag for timeout \
+            occurred; more than MAX_NODES products are treated like exceeding the time limit
+    """
+    if deadline is None:
+        deadline = Deadline()
+    if len(products) > MAX_NODES:
+        LOGGER.info('The Held-Karp algorithm is limited to %d products.', MAX_NODES)
+        return -1, [], True
+    if catalog is None:
+        catalog = get_catalog()
+    products_list = sorted(products)
+    matrix, campaigns_order = build_changeover_matrices(products_list, [consider_constraints],
+                                                        catalog)[consider_constraints]
+
+    if consider_constraints is not None and consider_constraints >= 4:
+        LOGGER.error('These constraints haven\'t been implemented yet!')
+
+    nodes = list(range(len(products_list)))
+    steps = None
+    starts = ends = nodes
+    if consider_constraints is None or consider_constraints >= 1:
+        steps = np.array([campaigns_order[catalog.campaign[catalog.index[product]]] \
+            for product in products_list], dtype=np.int64)
+        starts = [node for node in nodes if steps[node] == steps.min()]
+        ends = [node for node in nodes if steps[node] == steps.max()]
+
+    opt_value, path, timeout = solve_open_path(matrix, starts, ends, steps, n_jobs,
+                                               deadline.remaining())
+
+    if timeout:
+        LOGGER.info('The time limit is exceeded.')
+        return -1, [], True
+
+    if len(path) == 0:
+        LOGGER.info('The problem does not have an optimal solution.')
+        return -1, [], False
+
+    order = [products_list[node] for node in path]
+    assert len(order) == len(products)
+
+    return opt_value, order, False
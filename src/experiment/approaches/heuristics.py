@@ -0,0 +1,254 @@
+"""Heuristics for the Product Ordering problem:
+Construction of a good product order respecting the campaigns order with nearest neighbour and
+cheapest insertion, polished by 2-opt and Or-opt moves; the order serves as warm start for the
+exact approaches
+"""
+from typing import *
+from itertools import chain
+import logging
+import time
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from constants.constants import PROJECT_FOLDER, INF
+from catalog.catalog import ProductCatalog, get_catalog
+sys.path.append(PROJECT_FOLDER)
+from src.experiment.utils import build_changeover_matrices
+
+LOGGER = logging.getLogger('experiment')
+
+# Time limit in seconds for polishing a constructed order
+POLISH_TIMEOUT = 10.0
+
+def path_cost(weights : np.ndarray, path : Union[Sequence[int], np.ndarray]) -> int:
+    """Auxiliary function for summing up the weights along a path
+
+    Args:
+        weights (np.ndarray): changeover matrix
+        path (Union[Sequence[int], np.ndarray]): nodes of the path
+
+    Returns:
+        int: cost of the path
+    """
+    nodes = np.asarray(path, dtype=np.int64)
+    return int(weights[nodes[:-1], nodes[1:]].sum())
+
+def is_feasible(weights : np.ndarray, path : Union[Sequence[int], np.ndarray]) -> bool:
+    """Auxiliary function for checking whether a path doesn't use any infeasible changeover
+
+    Args:
+        weights (np.ndarray): changeover matrix, INF for infeasible changeovers
+        path (Union[Sequence[int], np.ndarray]): nodes of the path
+
+    Returns:
+        bool: flag whether all changeovers of the path are feasible
+    """
+    nodes = np.asarray(path, dtype=np.int64)
+    return bool((weights[nodes[:-1], nodes[1:]] < INF).all())
+
+def _extend(weights : np.ndarray) -> np.ndarray:
+    """Auxiliary function for adding a sentinel node with free arcs from and to all nodes as last
+    row and column, such that an open path becomes a tour through the sentinel
+
+    Args:
+        weights (np.ndarray): changeover matrix
+
+    Returns:
+        np.ndarray: extended changeover matrix
+    """
+    extended = np.zeros((weights.shape[0] + 1, weights.shape[1] + 1), dtype=np.int64)
+    extended[:-1, :-1] = weights
+    return extended
+
+def _layers(steps : Union[np.ndarray, None], num_nodes : int) -> List[List[int]]:
+    """Auxiliary function for grouping the nodes by their campaign step
+
+    Args:
+        steps (Union[np.ndarray, None]): campaign step of each node; None for no campaigns order
+        num_nodes (int): number of nodes
+
+    Returns:
+        List[List[int]]: nodes per step in ascending order of the steps
+    """
+    if steps is None:
+        return [list(range(num_nodes))]
+    return [[int(node) for node in np.flatnonzero(steps == step)] for step in np.unique(steps)]
+
+def nearest_neighbour(weights : np.ndarray, steps : Union[np.ndarray, None] = None) -> List[int]:
+    """Constructing a path by repeatedly moving to the cheapest unvisited node; if a campaigns
+    order is given, only the nodes of the earliest unfinished step are candidates. Every node of
+    the first step is tried as start
+
+    Args:
+        weights (np.ndarray): changeover matrix
+        steps (Union[np.ndarray, None], optional): campaign step of each node; None for no \
+            campaigns order. Defaults to None.
+
+    Returns:
+        List[int]: cheapest of the constructed paths
+    """
+    layers = _layers(steps, weights.shape[0])
+    best_cost = np.inf
+    best_path : List[int] = []
+    for start in layers[0]:
+        path = [start]
+        for layer in layers:
+            candidates = [node for node in layer if node != start]
+            while candidates:
+                position = int(np.argmin(weights[path[-1], candidates]))
+                path.append(candidates.pop(position))
+        cost = path_cost(weights, path)
+        if cost < best_cost:
+            best_cost = cost
+            best_path = path
+    return best_path
+
+def cheapest_insertion(weights : np.ndarray, steps : Union[np.ndarray, None] = None) -> List[int]:
+    """Constructing a path by repeatedly inserting the node with the cheapest insertion costs at
+    its best position; if a campaigns order is given, the steps are inserted one after another
+    and only behind the nodes of the previous steps
+
+    Args:
+        weights (np.ndarray): changeover matrix
+        steps (Union[np.ndarray, None], optional): campaign step of each node; None for no \
+            campaigns order. Defaults to None.
+
+    Returns:
+        List[int]: constructed path
+    """
+    extended = _extend(weights)
+    sentinel = weights.shape[0]
+    tour = [sentinel, sentinel]
+    for layer in _layers(steps, weights.shape[0]):
+        # Insertion positions behind the last node of the previous steps
+        offset = len(tour) - 2
+        candidates = list(layer)
+        while candidates:
+            previous = np.array(tour[offset:-1], dtype=np.int64)
+            following = np.array(tour[offset + 1:], dtype=np.int64)
+            remaining = np.array(candidates, dtype=np.int64)
+            costs = extended[np.ix_(previous, remaining)] \
+                + extended[np.ix_(remaining, following)].T \
+                - extended[previous, following][:, np.newaxis]
+            position, candidate = np.unravel_index(int(np.argmin(costs)), costs.shape)
+            tour.insert(offset + int(position) + 1, candidates.pop(int(candidate)))
+    return tour[1:-1]
+
+def two_opt(weights : np.ndarray, path : List[int]) -> Tuple[List[int], bool]:
+    """Applying the first improving 2-opt move, i.e. the reversal of a segment of the path. As the
+    changeovers are asymmetric, the costs of the reversed segment are taken from prefix sums of
+    the forward and backward arcs, such that each move is evaluated in constant time
+
+    Args:
+        weights (np.ndarray): changeover matrix
+        path (List[int]): nodes of the path
+
+    Returns:
+        Tuple[List[int], bool]: resulting path, flag whether the path was improved
+    """
+    extended = _extend(weights)
+    tour = [weights.shape[0]] + path + [weights.shape[0]]
+    forward = np.concatenate(([0], np.cumsum(extended[tour[:-1], tour[1:]])))
+    backward = np.concatenate(([0], np.cumsum(extended[tour[1:], tour[:-1]])))
+    for i in range(1, len(tour) - 2):
+        for j in range(i + 1, len(tour) - 1):
+            delta = extended[tour[i - 1], tour[j]] + extended[tour[i], tour[j + 1]] \
+                - extended[tour[i - 1], tour[i]] - extended[tour[j], tour[j + 1]] \
+                + (backward[j] - backward[i]) - (forward[j] - forward[i])
+            if delta < 0:
+                tour[i:j + 1] = tour[i:j + 1][::-1]
+                return tour[1:-1], True
+    return path, False
+
+def or_opt(weights : np.ndarray, path : List[int], max_length : int = 3) \
+    -> Tuple[List[int], bool]:
+    """Applying the first improving Or-opt move, i.e. moving a segment of up to max_length
+    consecutive nodes to another position of the path without reversing it
+
+    Args:
+        weights (np.ndarray): changeover matrix
+        path (List[int]): nodes of the path
+        max_length (int, optional): maximal length of the moved segment. Defaults to 3.
+
+    Returns:
+        Tuple[List[int], bool]: resulting path, flag whether the path was improved
+    """
+    extended = _extend(weights)
+    tour = [weights.shape[0]] + path + [weights.shape[0]]
+    for length in range(1, max_length + 1):
+        for i in range(1, len(tour) - length):
+            first = tour[i]
+            last = tour[i + length - 1]
+            removal = extended[tour[i - 1], tour[i + length]] - extended[tour[i - 1], first] \
+                - extended[last, tour[i + length]]
+            for k in chain(range(i - 1), range(i + length, len(tour) - 1)):
+                delta = removal + extended[tour[k], first] + extended[last, tour[k + 1]] \
+                    - extended[tour[k], tour[k + 1]]
+                if delta < 0:
+                    segment = tour[i:i + length]
+                    rest = tour[:i] + tour[i + length:]
+                    position = k + 1 if k < i else k + 1 - length
+                    tour = rest[:position] + segment + rest[position:]
+                    return tour[1:-1], True
+    return path, False
+
+def polish(weights : np.ndarray, path : List[int], timeout : float = POLISH_TIMEOUT) -> List[int]:
+    """Improving a path with 2-opt and Or-opt moves until it is a local optimum for both
+    neighbourhoods or the time limit is exceeded
+
+    Args:
+        weights (np.ndarray): changeover matrix
+        path (List[int]): nodes of the path
+        timeout (float, optional): time limit in seconds. Defaults to POLISH_TIMEOUT.
+
+    Returns:
+        List[int]: improved path
+    """
+    start_time = time.time()
+    improved = True
+    while improved and time.time() - start_time < timeout:
+        path, improved = two_opt(weights, path)
+        if not improved:
+            path, improved = or_opt(weights, path)
+    return path
+
+def construct_order(products : Set[str], consider_constraints : Union[None, int] = None,
+                    catalog : Union[ProductCatalog, None] = None) -> Tuple[int, List[str]]:
+    """Constructing a good product order with nearest neighbour and cheapest insertion on the
+    changeover matrix modified regarding the constraints; the cheaper order is polished by 2-opt
+    and Or-opt moves
+
+    Args:
+        products (Set[str]): set of products
+        consider_constraints (Union[None, int], optional): Indicating which constraints are taken \
+            into account. For 0 no additional constraints are considered, for None all are \
+            considered. Defaults to None.
+        catalog (Union[ProductCatalog, None], optional): product catalog. If None, the catalog \
+            of this process is used. Defaults to None.
+
+    Returns:
+        Tuple[int, List[str]]: costs of the order regarding the modified changeover matrix, \
+            product order; -1 and an empty order, if no feasible order was found
+    """
+    if catalog is None:
+        catalog = get_catalog()
+    products_list = sorted(products)
+    weights, campaigns_order = build_changeover_matrices(products_list, [consider_constraints],
+                                                         catalog)[consider_constraints]
+
+    steps = None
+    if consider_constraints is None or consider_constraints >= 1:
+        steps = np.array([campaigns_order[catalog.campaign[catalog.index[product]]] \
+            for product in products_list], dtype=np.int64)
+
+    paths = [nearest_neighbour(weights, steps), cheapest_insertion(weights, steps)]
+    path = polish(weights, min(paths, key=lambda path: path_cost(weights, path)))
+
+    if not is_feasible(weights, path):
+        LOGGER.debug('No feasible order was constructed.')
+        return -1, []
+
+    cost = path_cost(weights, path)
+    LOGGER.debug('Constructed order with costs %d', cost)
+    return cost, [products_list[node] for node in path]
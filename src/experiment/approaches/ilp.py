@@ -4,21 +4,187 @@ Formulation of the problem instance as an Integer Linear Program
 from typing import *
 from itertools import chain, combinations, permutations
 import logging
+import time
 import os
 import sys
-import pandas as pd
+import numpy as np
+from scipy.optimize import Bounds, LinearConstraint, milp
+from scipy.sparse import coo_array
 from docplex.mp.model import Model
 from docplex.mp.dvar import Var
+from docplex.mp.progress import ProgressClock, SolutionListener
+from docplex.mp.solution import SolveSolution
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
-from constants.constants import CHANGEOVER_MATRIX, CAMPAIGNS_ORDER, PRODUCT_PROPERTIES, \
-    PRODUCT_QUANTITY, PROJECT_FOLDER, TIMEOUT, INF
+from constants.constants import PROJECT_FOLDER
+from catalog.catalog import ProductCatalog, get_catalog
+from catalog.arcs import ArcList
 sys.path.append(PROJECT_FOLDER)
-from src.experiment.utils import calculate_oct
+from src.experiment.utils import calculate_oct, get_position_bounds, Deadline
+from src.experiment.approaches.heuristics import construct_order
 
 LOGGER = logging.getLogger('experiment')
 
-def create_model(products : Set[str], consider_constraints : Union[None, int] = None) \
-    -> Tuple[Model, Dict[str, Dict[str, Var]]]:
+# Formulations of the subtour elimination; 'lazy' adds violated subtour constraints only
+FORMULATIONS = ['subsets', 'mtz', 'scf', 'time_staged', 'lazy']
+
+# MIP solvers; 'cplex' via the modelling layer DOcplex, 'highs' via SciPy on sparse matrices
+BACKENDS = ['cplex', 'highs']
+
+def _add_subsets(model : Model, variables : Dict[str, Dict[str, Var]], products : Set[str]) \
+    -> None:
+    """Auxiliary function for adding the subtour elimination constraints for all subsets of
+    products; exponential in the number of products
+
+    Args:
+        model (Model): DOcplex model
+        variables (Dict[str, Dict[str, Var]]): dictionary of all variables
+        products (Set[str]): set of products
+    """
+    for subset in chain.from_iterable(combinations(list(products) + ['v'], r) \
+        for r in range(2, len(products) + 1)):
+        linear_expr = model.linear_expr()
+        for combination in combinations(list(subset), 2):
+            for permutation in permutations(combination):
+                product1, product2 = permutation
+                if product2 in variables[product1]:
+                    linear_expr.add_term(variables[product1][product2], 1)
+        model.add_constraint(0 <= linear_expr, f'subtour_elimination_ge_{subset}')
+        model.add_constraint(linear_expr <= len(subset) - 1, f'subtour_elimination_le_{subset}')
+
+def _add_mtz(model : Model, variables : Dict[str, Dict[str, Var]], products : Set[str],
+             bounds : Dict[str, Tuple[int, int]]) -> None:
+    """Auxiliary function for adding the Miller-Tucker-Zemlin constraints: each product gets a
+    position within its bounds, which increases along the used changeovers. The big-M of each
+    changeover is derived from the position bounds, and a changeover into a later campaign step
+    doesn't need a constraint at all
+
+    Args:
+        model (Model): DOcplex model
+        variables (Dict[str, Dict[str, Var]]): dictionary of all variables
+        products (Set[str]): set of products
+        bounds (Dict[str, Tuple[int, int]]): smallest and largest position per product
+    """
+    num_products = len(products)
+    positions = dict(zip(products, model.continuous_var_list(list(products),
+        lb=[bounds[product][0] for product in products],
+        ub=[bounds[product][1] for product in products],
+        name=[f'u_{product}' for product in products])))
+    constraints = []
+    names = []
+    for product in products:
+        lower, upper = bounds[product]
+        # The first product has position 1, the last product position n
+        constraints.append(positions[product] <= upper - (upper - 1) * variables['v'][product])
+        names.append(f'position_first_{product}')
+        constraints.append(positions[product] >= lower \
+            + (num_products - lower) * variables[product]['v'])
+        names.append(f'position_last_{product}')
+    for product1 in products:
+        for product2, var in variables[product1].items():
+            if product2 == 'v':
+                continue
+            big_m = bounds[product1][1] - bounds[product2][0] + 1
+            if big_m > 0:
+                constraints.append(positions[product1] - positions[product2] + big_m * var \
+                    <= big_m - 1)
+                names.append(f'mtz_{product1}_{product2}')
+    model.add_constraints(constraints, names=names)
+
+def _add_scf(model : Model, variables : Dict[str, Dict[str, Var]], products : Set[str],
+             bounds : Dict[str, Tuple[int, int]]) -> None:
+    """Auxiliary function for adding the single-commodity flow constraints: V sends one unit of
+    flow to every product along the used changeovers. The flow into a product equals the number of
+    products from it to the end of the order, hence it is bounded by its position bounds
+
+    Args:
+        model (Model): DOcplex model
+        variables (Dict[str, Dict[str, Var]]): dictionary of all variables
+        products (Set[str]): set of products
+        bounds (Dict[str, Tuple[int, int]]): smallest and largest position per product
+    """
+    num_products = len(products)
+    arcs = [(product1, product2, var) for product1, values in variables.items() \
+        for product2, var in values.items() if product2 != 'v']
+    flows = model.continuous_var_list(len(arcs), lb=0, ub=num_products,
+        name=[f'f_{product1}_{product2}' for product1, product2, _ in arcs])
+    inflow : Dict[str, List[Var]] = {product: [] for product in products}
+    outflow : Dict[str, List[Var]] = {product: [] for product in list(products) + ['v']}
+    constraints = []
+    names = []
+    for (product1, product2, var), flow in zip(arcs, flows):
+        inflow[product2].append(flow)
+        outflow[product1].append(flow)
+        lower, upper = bounds[product2]
+        constraints.append(flow <= (num_products - lower + 1) * var)
+        names.append(f'flow_ub_{product1}_{product2}')
+        constraints.append(flow >= (num_products - upper + 1) * var)
+        names.append(f'flow_lb_{product1}_{product2}')
+    constraints.append(model.sum_vars(outflow['v']) == num_products)
+    names.append('flow_source')
+    for product in products:
+        constraints.append(model.sum_vars(inflow[product]) - model.sum_vars(outflow[product]) == 1)
+        names.append(f'flow_conservation_{product}')
+    model.add_constraints(constraints, names=names)
+
+def _add_time_staged(model : Model, variables : Dict[str, Dict[str, Var]], products : Set[str],
+                     bounds : Dict[str, Tuple[int, int]]) -> None:
+    """Auxiliary function for adding the time-staged constraints: each changeover between products
+    is split into one variable per position t of its first product, whereas a product entered at
+    position t has to be left at position t. Only positions within the bounds of both products
+    get a variable
+
+    Args:
+        model (Model): DOcplex model
+        variables (Dict[str, Dict[str, Var]]): dictionary of all variables
+        products (Set[str]): set of products
+        bounds (Dict[str, Tuple[int, int]]): smallest and largest position per product
+    """
+    num_products = len(products)
+    entering : Dict[str, Dict[int, List[Var]]] = {product: {} for product in products}
+    leaving : Dict[str, Dict[int, List[Var]]] = {product: {} for product in products}
+    constraints = []
+    names = []
+    for product in products:
+        lower, upper = bounds[product]
+        if lower == 1:
+            entering[product][1] = [variables['v'][product]]
+        else:
+            constraints.append(variables['v'][product] == 0)
+            names.append(f'stage_first_{product}')
+        if upper == num_products:
+            leaving[product][num_products] = [variables[product]['v']]
+        else:
+            constraints.append(variables[product]['v'] == 0)
+            names.append(f'stage_last_{product}')
+
+    staged_arcs = [(product1, product2, var, stage) for product1 in products \
+        for product2, var in variables[product1].items() if product2 != 'v' \
+        for stage in range(max(bounds[product1][0], bounds[product2][0] - 1),
+                           min(bounds[product1][1], bounds[product2][1] - 1) + 1)]
+    stage_vars = model.binary_var_list(len(staged_arcs), name=[f'x_{product1}_{product2}_{stage}' \
+        for product1, product2, _, stage in staged_arcs])
+    stages : Dict[Tuple[str, str], List[Var]] = {}
+    for (product1, product2, _, stage), stage_var in zip(staged_arcs, stage_vars):
+        leaving[product1].setdefault(stage, []).append(stage_var)
+        entering[product2].setdefault(stage + 1, []).append(stage_var)
+        stages.setdefault((product1, product2), []).append(stage_var)
+    for product1 in products:
+        for product2, var in variables[product1].items():
+            if product2 != 'v':
+                constraints.append(var == model.sum_vars(stages.get((product1, product2), [])))
+                names.append(f'stages_{product1}_{product2}')
+
+    for product in products:
+        lower, upper = bounds[product]
+        for stage in range(lower, upper + 1):
+            constraints.append(model.sum_vars(entering[product].get(stage, [])) \
+                == model.sum_vars(leaving[product].get(stage, [])))
+            names.append(f'stage_{product}_{stage}')
+    model.add_constraints(constraints, names=names)
+
+def create_model(products : Set[str], consider_constraints : Union[None, int] = None,
+                 catalog : Union[ProductCatalog, None] = None, arcs : Union[ArcList, None] = None,
+                 formulation : str = 'subsets') -> Tuple[Model, Dict[str, Dict[str, Var]]]:
     """Creating an ILP model of the Product Ordering problem for the Python API DOCplex for the \
     MIP solver CPLEX
 
@@ -27,145 +193,123 @@ def create_model(products : Set[str], consider_constraints : Union[None, int] =
         consider_constraints (Union[None, int], optional): Indicating which constraints are taken \
             into account. For 0 no additional constraints are considered, for None all are \
             considered. Defaults to None.
+        catalog (Union[ProductCatalog, None], optional): product catalog. If None, the catalog \
+            of this process is used. Defaults to None.
+        arcs (Union[ArcList, None], optional): feasible changeovers of the instance. If None, \
+            they are built from the catalog. Defaults to None.
+        formulation (str, optional): formulation of the subtour elimination; 'subsets' for the \
+            constraints of all subsets, 'mtz' for Miller-Tucker-Zemlin, 'scf' for single-commodity \
+            flow, 'time_staged' or 'lazy' for none, such that the violated constraints are added \
+            while solving. Defaults to 'subsets'.
 
     Returns:
         Tuple[Model, Dict[str, Dict[str, Var]]]: DOcplex model and dictionary of all variables
     """
-    df_matrix = pd.read_csv(CHANGEOVER_MATRIX, dtype={'Product': str}).set_index('Product')
-    df_properties = pd.read_csv(PRODUCT_PROPERTIES, dtype={'Product': str}).set_index('Product')
-    df_quantity = pd.read_csv(PRODUCT_QUANTITY, dtype={'Product': str}).set_index('Product')
-    campaigns = set([df_properties.at[product, 'Campaign'] for product in products])
-    campaigns.add('v')
-    numCampaigns = len(campaigns)
-    df_order = pd.read_csv(CAMPAIGNS_ORDER, index_col='Campaign')
-    campaigns_order = df_order['Order'].to_dict()
+    assert formulation in FORMULATIONS
+
+    if catalog is None:
+        catalog = get_catalog()
+    if arcs is None:
+        arcs = ArcList.from_catalog(list(products), catalog)
+    nodes = arcs.nodes
+    indices = catalog.indices(nodes)
+    sources = arcs.sources()
+    targets = arcs.targets
+    campaign = catalog.campaign[indices]
+    normal = catalog.packaging[indices] == 'Normal'
+    quantity = catalog.quantity[indices]
+    steps = np.array([catalog.campaigns_order[str(name)] for name in campaign], dtype=np.int64)
+    numCampaigns = len(set(campaign.tolist())) + 1
 
     if consider_constraints is not None and consider_constraints >= 4:
         LOGGER.error('These constraints haven\'t been implemented yet!')
 
-    model = Model('product-ordering')
+    model = Model('product-ordering', checker='off')
+
+    first_vars = model.binary_var_list(len(nodes), name=[f'x_v_{node}' for node in nodes])
+    last_vars = model.binary_var_list(len(nodes), name=[f'x_{node}_v' for node in nodes])
+    arc_vars = model.binary_var_list(len(arcs), name=[f'x_{nodes[source]}_{nodes[target]}' \
+        for source, target in zip(sources.tolist(), targets.tolist())])
+
+    variables : Dict[str, Dict[str, Var]] = {'v': dict(zip(nodes, first_vars))}
+    for position, node in enumerate(nodes):
+        start, end = arcs.offsets[position], arcs.offsets[position + 1]
+        variables[node] = {'v': last_vars[position]}
+        variables[node].update(zip([nodes[target] for target in targets[start:end].tolist()],
+                                   arc_vars[start:end]))
+
+    # The ingoing arcs of each node are consecutive after sorting the arcs by their targets
+    by_target = np.argsort(targets, kind='stable')
+    in_offsets = np.zeros(len(nodes) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(targets, minlength=len(nodes)), out=in_offsets[1:])
+    model.add_constraints([model.sum_vars(list(variables[node].values())) == 1 \
+        for node in nodes] + [model.sum_vars(first_vars) == 1],
+        names=[f'sum_outgoing_{node}' for node in nodes] + ['sum_outgoing_v'])
+    model.add_constraints([model.sum_vars([first_vars[position]] + [arc_vars[arc] \
+        for arc in by_target[in_offsets[position]:in_offsets[position + 1]].tolist()]) == 1 \
+        for position in range(len(nodes))] + [model.sum_vars(last_vars) == 1],
+        names=[f'sum_ingoing_{node}' for node in nodes] + ['sum_ingoing_v'])
+
+    bounds = get_position_bounds(products, consider_constraints, catalog)
+    if formulation == 'subsets':
+        _add_subsets(model, variables, products)
+    elif formulation == 'mtz':
+        _add_mtz(model, variables, products, bounds)
+    elif formulation == 'scf':
+        _add_scf(model, variables, products, bounds)
+    elif formulation == 'time_staged':
+        _add_time_staged(model, variables, products, bounds)
 
-    delta_plus : Dict[str, List[Var]] = {'v': []}
-    delta_minus : Dict[str, List[Var]] = {'v': []}
-    for product in products:
-        delta_plus[product] = []
-        delta_minus[product] = []
+    if consider_constraints is None or consider_constraints >= 1:
+        backward = np.flatnonzero(steps[targets] < steps[sources]).tolist()
+        model.add_constraints([arc_vars[arc] == 0 for arc in backward],
+            names=[f'campaigns_order_{nodes[sources[arc]]}_{nodes[targets[arc]]}' \
+                for arc in backward])
 
-    variables : Dict[str, Dict[str, Var]] = {'v': {}}
-    campaign_switch : Dict[str, List[str]] = {'v': []}
-    campaign_switch.update([(product, []) for product in products])
-    for product1 in products:
-        var_v_product1 = model.binary_var(f'x_v_{product1}')
-        variables['v'][product1] = var_v_product1
-        delta_plus['v'].append(var_v_product1)
-        delta_minus[product1].append(var_v_product1)
-        campaign_switch['v'].append(product1)
-        
-        var_product1_v = model.binary_var(f'x_{product1}_v')
-        variables[product1] = {'v': var_product1_v}
-        delta_minus['v'].append(var_product1_v)
-        delta_plus[product1].append(var_product1_v)
-        campaign_switch[product1].append('v')
-        
-        campaign1 = df_properties.at[product1, 'Campaign']
-        for product2 in products:
-            distance = df_matrix.at[product1, product2]
-            if distance < INF:
-                var = model.binary_var(f'x_{product1}_{product2}')
-                variables[product1][product2] = var
-                delta_plus[product1].append(var)
-                delta_minus[product2].append(var)
-                campaign2 = df_properties.at[product2, 'Campaign']
-                if campaign1 != campaign2:
-                    campaign_switch[product1].append(product2)
-
-    for product in list(products) + ['v']:
-        linear_expr = model.linear_expr()
-        for var in delta_plus[product]:
-            linear_expr.add_term(var, 1)
-        model.add_constraint(linear_expr == 1, f'sum_outgoing_{product}')
+        # Each campaign and V is entered exactly once
+        switches = np.flatnonzero(campaign[sources] != campaign[targets]).tolist()
+        model.add_constraint(model.sum_vars(first_vars + last_vars \
+            + [arc_vars[arc] for arc in switches]) == numCampaigns, 'campaign_switch')
 
-    for product in list(products) + ['v']:
-        linear_expr = model.linear_expr()
-        for var in delta_minus[product]:
-            linear_expr.add_term(var, 1)
-        model.add_constraint(linear_expr == 1, f'sum_ingoing_{product}')
+    if consider_constraints is None or consider_constraints >= 2:
+        codes = np.unique(campaign, return_inverse=True)[1].reshape(-1)
+        max_quantity = np.full(codes.max(initial=-1) + 1, np.iinfo(np.int64).min, dtype=np.int64)
+        np.maximum.at(max_quantity, codes[normal], quantity[normal])
+        max_quantity_node = normal & (quantity == max_quantity[codes])
+        blocked = max_quantity_node[sources] & (codes[sources] == codes[targets])
+        model.add_constraints([model.sum_vars([arc_vars[arc] for arc \
+            in np.flatnonzero(blocked & (codes[sources] == code)).tolist()]) == 0 \
+            for code in np.unique(codes[sources[blocked]]).tolist()])
 
-    for subset in chain.from_iterable(combinations(list(products) + ['v'], r) \
-        for r in range(2, len(products) + 1)):
-        linear_expr = model.linear_expr()
-        for combination in combinations(list(subset), 2):
-            for permutation in permutations(combination):
-                product1, product2 = permutation
-                if product2 in variables[product1]:
-                    linear_expr.add_term(variables[product1][product2], 1)
-        model.add_constraint(0 <= linear_expr, f'subtour_elimination_ge_{subset}')
-        model.add_constraint(linear_expr <= len(subset) - 1, f'subtour_elimination_le_{subset}')
+    # Constraint 3 only rewards changeovers between special packagings of the same volume, it
+    # doesn't restrict the feasible orders and hence adds no constraints
 
-    if consider_constraints is None or consider_constraints >= 1:
-        for product1 in variables:
-            if product1 != 'v':
-                campaigns_order1 = campaigns_order[df_properties.at[product1, 'Campaign']]
-                for product2 in variables[product1]:
-                    if product2 != 'v':
-                        linear_expr = model.linear_expr()
-                        campaigns_order2 = campaigns_order[df_properties.at[product2, 'Campaign']]
-                        coeff = campaigns_order2 - campaigns_order1
-                        linear_expr.add_term(variables[product1][product2], coeff)
-                        model.add_constraint(0 <= linear_expr, f'campaigns_order_{product1}_{product2}')
+    model.minimize(model.scal_prod(arc_vars, arcs.costs.astype(np.float64).tolist()))
 
-        linear_expr = model.linear_expr()
-        for product1 in variables:
-            for product2 in variables[product1]:
-                if product2 in campaign_switch[product1]:
-                    linear_expr.add_term(variables[product1][product2], 1)
-        model.add_constraint(linear_expr == numCampaigns, f'campaign_switch')
+    return model, variables
 
-    if consider_constraints is None or consider_constraints >= 2:
-        for campaign in campaigns:
-            temp_products = [product for product in products
-                if campaign == df_properties.at[product, 'Campaign']
-                    and df_properties.at[product, 'Packaging'] == 'Normal']
-            if len(temp_products) > 0:
-                max_quantity = max([df_quantity.at[product, 'Quantity'] \
-                    for product in temp_products])
-                linear_expr = model.linear_expr()
-                for product1 in temp_products:
-                    if df_quantity.at[product1, 'Quantity'] == max_quantity:
-                        for product2 in variables[product1]:
-                            if product2 != 'v':
-                                if df_properties.at[product2, 'Campaign'] == campaign:
-                                    linear_expr.add_term(variables[product1][product2], 1)
-                model.add_constraint(linear_expr == 0, 'max_quantity')
-
-    if consider_constraints is None or consider_constraints >= 3:
-        for campaign in campaigns:
-            temp_products1 = [product for product in products
-                if campaign == df_properties.at[product, 'Campaign']
-                    and df_properties.at[product1, 'Packaging'] != 'Normal']
-            for product1 in temp_products1:
-                volume1 = df_properties.at[product1, 'Volume']
-                temp_products2 = [product for product in products
-                    if campaign == df_properties.at[product, 'Campaign']
-                        and volume1 == df_properties.at[product, 'Volume']]
-                if len(temp_products2) > 0:
-                    linear_expr = model.linear_expr()
-                    for product2 in temp_products2:
-                        for product2 in variables[product1]:
-                            linear_expr.add_term(variables[product1][product2], 1)
-                    model.add_constraint(linear_expr == 1, 'same_volume')
+def add_warm_start(model : Model, variables : Dict[str, Dict[str, Var]], order : List[str]) -> bool:
+    """Passing a product order as MIP start to CPLEX, such that the branch and bound begins with
+    an incumbent; all variables get a value, hence CPLEX only has to check the start
 
-    linear_expr = model.linear_expr()
-    for product1 in variables:
-        for product2 in variables[product1]:
-            if product1 == 'v' or product2 == 'v':
-                distance = 0
-            else:
-                distance = df_matrix.at[product1, product2]
-            linear_expr.add_term(variables[product1][product2], float(distance))
-    model.minimize(linear_expr)
+    Args:
+        model (Model): DOcplex model
+        variables (Dict[str, Dict[str, Var]]): dictionary of all variables
+        order (List[str]): product order
 
-    return model, variables
+    Returns:
+        bool: flag whether the MIP start was added; False, if the order uses a missing changeover
+    """
+    switches = set(zip(['v'] + order, order + ['v']))
+    if any(product2 not in variables[product1] for product1, product2 in switches):
+        LOGGER.debug('The warm start uses a changeover missing in the model.')
+        return False
+    mip_start = model.new_solution()
+    for product1, values in variables.items():
+        for product2, var in values.items():
+            mip_start.add_var_value(var, 1 if (product1, product2) in switches else 0)
+    model.add_mip_start(mip_start)
+    return True
 
 def _print_variables(variables : Dict[str, Dict[str, Var]]) -> None:
     """Auxiliary function for logging all variables of the ILP model
@@ -177,6 +321,73 @@ def _print_variables(variables : Dict[str, Dict[str, Var]]) -> None:
         for product2, var in values.items():
             LOGGER.debug('x[%s][%s] = %s', product1, product2, var.solution_value)
 
+def get_successors(variables : Dict[str, Dict[str, Var]]) -> Dict[str, str]:
+    """Analyzing the solution values of the ILP model's variables for extracting the successor of
+    each product and V
+
+    Args:
+        variables (Dict[str, Dict[str, Var]]): dictionary of all variables
+
+    Returns:
+        Dict[str, str]: successor per product
+    """
+    successors = {}
+    for product1, values in variables.items():
+        for product2, var in values.items():
+            value = round(var.solution_value)
+            assert value in [0, 1]
+            if value == 1:
+                successors[product1] = product2
+    return successors
+
+def get_subtours(successors : Dict[str, str]) -> List[List[str]]:
+    """Decomposing the solution given by the successors into its cycles, whereas all cycles
+    without V are subtours
+
+    Args:
+        successors (Dict[str, str]): successor per product
+
+    Returns:
+        List[List[str]]: cycles without V
+    """
+    visited : Set[str] = set(['v'])
+    cur_product = successors['v']
+    while cur_product not in visited:
+        visited.add(cur_product)
+        cur_product = successors[cur_product]
+
+    subtours = []
+    for product in successors:
+        if product in visited:
+            continue
+        subtour = []
+        cur_product = product
+        while cur_product not in visited:
+            visited.add(cur_product)
+            subtour.append(cur_product)
+            cur_product = successors[cur_product]
+        subtours.append(subtour)
+    return subtours
+
+def add_subtour_cut(model : Model, variables : Dict[str, Dict[str, Var]], subtour : List[str]) \
+    -> None:
+    """Adding the subtour elimination constraint of Dantzig, Fulkerson and Johnson for the products
+    of a subtour, i.e. at most |S| - 1 changeovers within the subset S
+
+    Args:
+        model (Model): DOcplex model
+        variables (Dict[str, Dict[str, Var]]): dictionary of all variables
+        subtour (List[str]): products of the subtour
+    """
+    subset = set(subtour)
+    linear_expr = model.linear_expr()
+    for product1 in subtour:
+        for product2, var in variables[product1].items():
+            if product2 in subset:
+                linear_expr.add_term(var, 1)
+    model.add_constraint(linear_expr <= len(subtour) - 1,
+                         f'subtour_elimination_cut_{"_".join(sorted(subtour))}')
+
 def extract_order(variables : Dict[str, Dict[str, Var]]) -> List[str]:
     """Analyzing the solution values of the ILP model's variables for extracting the order of
     products
@@ -188,60 +399,601 @@ def extract_order(variables : Dict[str, Dict[str, Var]]) -> List[str]:
         List[str]: extracted order of products
     """
     _print_variables(variables)
+    return follow_successors(get_successors(variables))
 
-    order = []
-    cur_product = 'v'
-    for product, var in variables[cur_product].items():
-        value = var.solution_value
-        assert value in [0, 1]
-        if value == 1:
-            cur_product = product
-            order.append(product)
-    counter = 0
-    while cur_product != 'v' and counter < 10000:
-        for product, var in variables[cur_product].items():
-            value = var.solution_value
-            assert value in [0, 1]
-            if value == 1:
-                cur_product = product
-                order.append(product)
-        counter += 1
-    if counter == 10000:
+def follow_successors(successors : Dict[str, str]) -> List[str]:
+    """Following the successors from V for extracting the order of products
+
+    Args:
+        successors (Dict[str, str]): successor per product
+
+    Returns:
+        List[str]: extracted order of products
+    """
+    order : List[str] = []
+    cur_product = successors['v']
+    while cur_product != 'v' and len(order) < len(successors):
+        order.append(cur_product)
+        cur_product = successors[cur_product]
+    if cur_product != 'v':
         LOGGER.error('Infinite loop in extracting of order')
 
     assert len(order) > 0
-    order = order[:-1]
 
     return order
 
-def run_ilp(products : Set[str], consider_constraints : Union[None, int] = None) \
-    -> Tuple[List[str], int, int, bool]:
-    """Computing the Product Ordering problem as an ILP using the Python API of CPLEX
+class IncumbentListener(SolutionListener):
+    """Listener recording the improving incumbents of CPLEX as trajectory of the elapsed time and
+    costs
+    """
+    def __init__(self, start_time : float):
+        super().__init__(ProgressClock.Objective)
+        self.start_time = start_time
+        self.trajectory : List[Tuple[float, int]] = []
+
+    def notify_solution(self, sol : SolveSolution) -> None:
+        cost = round(sol.objective_value)
+        if len(self.trajectory) == 0 or cost < self.trajectory[-1][1]:
+            self.trajectory.append((time.time() - self.start_time, cost))
+
+class SparseModel:
+    """This class collects an ILP model for scipy.optimize.milp, which solves it with HiGHS: the
+    variables are given by their bounds, integrality and costs, the constraints by the entries of
+    a sparse matrix in COO layout (coordinate list) and the bounds of its rows. Variables and
+    constraints are added in blocks of NumPy arrays, such that no modelling layer is involved
+    """
+
+    def __init__(self) -> None:
+        """Constructor of an empty model
+        """
+        self.lower : List[np.ndarray] = []
+        self.upper : List[np.ndarray] = []
+        self.integrality : List[np.ndarray] = []
+        self.costs : List[np.ndarray] = []
+        self.rows : List[np.ndarray] = []
+        self.columns : List[np.ndarray] = []
+        self.values : List[np.ndarray] = []
+        self.row_lower : List[np.ndarray] = []
+        self.row_upper : List[np.ndarray] = []
+        self.number_of_variables = 0
+        self.number_of_constraints = 0
+
+    def add_variables(self, num : int, lower : Union[float, np.ndarray],
+                      upper : Union[float, np.ndarray], integral : bool,
+                      costs : Union[float, np.ndarray] = 0.0) -> np.ndarray:
+        """Adding a block of variables
+
+        Args:
+            num (int): number of variables
+            lower (Union[float, np.ndarray]): lower bounds of the variables
+            upper (Union[float, np.ndarray]): upper bounds of the variables
+            integral (bool): flag whether the variables are integral
+            costs (Union[float, np.ndarray], optional): objective coefficients of the variables. \
+                Defaults to 0.0.
+
+        Returns:
+            np.ndarray: column indices of the variables
+        """
+        self.lower.append(np.broadcast_to(np.asarray(lower, dtype=np.float64), (num,)))
+        self.upper.append(np.broadcast_to(np.asarray(upper, dtype=np.float64), (num,)))
+        self.integrality.append(np.full(num, int(integral), dtype=np.int64))
+        self.costs.append(np.broadcast_to(np.asarray(costs, dtype=np.float64), (num,)))
+        self.number_of_variables += num
+        return np.arange(self.number_of_variables - num, self.number_of_variables, dtype=np.int64)
+
+    def add_constraints(self, num : int, rows : np.ndarray, columns : np.ndarray,
+                        values : Union[float, np.ndarray], lower : Union[float, np.ndarray],
+                        upper : Union[float, np.ndarray]) -> None:
+        """Adding a block of constraints lower <= A x <= upper, whereas the matrix A is given by
+        its non-zero entries
+
+        Args:
+            num (int): number of constraints
+            rows (np.ndarray): row of each entry within the block, between 0 and num - 1
+            columns (np.ndarray): column of each entry
+            values (Union[float, np.ndarray]): value of each entry
+            lower (Union[float, np.ndarray]): lower bounds of the constraints
+            upper (Union[float, np.ndarray]): upper bounds of the constraints
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        self.rows.append(rows + self.number_of_constraints)
+        self.columns.append(np.asarray(columns, dtype=np.int64))
+        self.values.append(np.broadcast_to(np.asarray(values, dtype=np.float64), rows.shape))
+        self.row_lower.append(np.broadcast_to(np.asarray(lower, dtype=np.float64), (num,)))
+        self.row_upper.append(np.broadcast_to(np.asarray(upper, dtype=np.float64), (num,)))
+        self.number_of_constraints += num
+
+    def solve(self, time_limit : float) -> Any:
+        """Solving the model with HiGHS
+
+        Args:
+            time_limit (float): time limit in seconds
+
+        Returns:
+            Any: result of scipy.optimize.milp; its attribute x is None, if no solution was found
+        """
+        matrix = coo_array((np.concatenate(self.values),
+                            (np.concatenate(self.rows), np.concatenate(self.columns))),
+                           shape=(self.number_of_constraints, self.number_of_variables)).tocsr()
+        return milp(np.concatenate(self.costs),
+                    integrality=np.concatenate(self.integrality),
+                    bounds=Bounds(np.concatenate(self.lower), np.concatenate(self.upper)),
+                    constraints=LinearConstraint(matrix, np.concatenate(self.row_lower),
+                                                 np.concatenate(self.row_upper)),
+                    options={'time_limit': time_limit, 'disp': False})
+
+def _groups(keys : np.ndarray, num : int) -> Tuple[np.ndarray, np.ndarray]:
+    """Auxiliary function for grouping entries by their keys 0, ..., num - 1
+
+    Args:
+        keys (np.ndarray): key of each entry
+        num (int): number of keys
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: entries sorted by their keys, start of each key's entries \
+            of length num + 1
+    """
+    offsets = np.zeros(num + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=num), out=offsets[1:])
+    return np.argsort(keys, kind='stable'), offsets
+
+def _add_sparse_subsets(model : SparseModel, sources : np.ndarray, targets : np.ndarray,
+                        num_products : int) -> None:
+    """Auxiliary function for adding the subtour elimination constraints for all subsets of
+    products and V to the sparse model; exponential in the number of products. Both bounds of a
+    subset form one row, whereas DOcplex counts them as two constraints
+
+    Args:
+        model (SparseModel): sparse model
+        sources (np.ndarray): source node of each changeover variable, V is node num_products
+        targets (np.ndarray): target node of each changeover variable
+        num_products (int): number of products
+    """
+    subsets = list(chain.from_iterable(combinations(range(num_products + 1), r) \
+        for r in range(2, num_products + 1)))
+    members = np.zeros((len(subsets), num_products + 1), dtype=bool)
+    for row, subset in enumerate(subsets):
+        members[row, list(subset)] = True
+    rows, columns = np.nonzero(members[:, sources] & members[:, targets])
+    model.add_constraints(len(subsets), rows, columns, 1.0, 0.0, members.sum(axis=1) - 1)
+
+def _add_sparse_mtz(model : SparseModel, sources : np.ndarray, targets : np.ndarray,
+                    lower : np.ndarray, upper : np.ndarray) -> None:
+    """Auxiliary function for adding the Miller-Tucker-Zemlin constraints to the sparse model,
+    see _add_mtz
+
+    Args:
+        model (SparseModel): sparse model
+        sources (np.ndarray): source node of each changeover variable, V is node num_products
+        targets (np.ndarray): target node of each changeover variable
+        lower (np.ndarray): smallest position per product
+        upper (np.ndarray): largest position per product
+    """
+    num_products = len(lower)
+    positions = model.add_variables(num_products, lower, upper, False)
+    nodes = np.arange(num_products, dtype=np.int64)
+    first = np.flatnonzero(sources == num_products)[np.argsort(targets[sources == num_products])]
+    last = np.flatnonzero(targets == num_products)[np.argsort(sources[targets == num_products])]
+    # The first product has position 1, the last product position n
+    model.add_constraints(num_products, np.concatenate((nodes, nodes)),
+                          np.concatenate((positions, first)),
+                          np.concatenate((np.ones(num_products), upper - 1)), -np.inf, upper)
+    model.add_constraints(num_products, np.concatenate((nodes, nodes)),
+                          np.concatenate((positions, last)),
+                          np.concatenate((np.ones(num_products), lower - num_products)),
+                          lower, np.inf)
+    arcs = np.flatnonzero((sources < num_products) & (targets < num_products))
+    big_m = upper[sources[arcs]] - lower[targets[arcs]] + 1
+    arcs, big_m = arcs[big_m > 0], big_m[big_m > 0]
+    rows = np.arange(len(arcs), dtype=np.int64)
+    model.add_constraints(len(arcs), np.concatenate((rows, rows, rows)),
+                          np.concatenate((positions[sources[arcs]], positions[targets[arcs]],
+                                          arcs)),
+                          np.concatenate((np.ones(len(arcs)), -np.ones(len(arcs)), big_m)),
+                          -np.inf, big_m - 1)
+
+def _add_sparse_scf(model : SparseModel, sources : np.ndarray, targets : np.ndarray,
+                    lower : np.ndarray, upper : np.ndarray) -> None:
+    """Auxiliary function for adding the single-commodity flow constraints to the sparse model,
+    see _add_scf
+
+    Args:
+        model (SparseModel): sparse model
+        sources (np.ndarray): source node of each changeover variable, V is node num_products
+        targets (np.ndarray): target node of each changeover variable
+        lower (np.ndarray): smallest position per product
+        upper (np.ndarray): largest position per product
+    """
+    num_products = len(lower)
+    arcs = np.flatnonzero(targets < num_products)
+    flows = model.add_variables(len(arcs), 0.0, num_products, False)
+    rows = np.arange(len(arcs), dtype=np.int64)
+    model.add_constraints(len(arcs), np.concatenate((rows, rows)), np.concatenate((flows, arcs)),
+                          np.concatenate((np.ones(len(arcs)),
+                                          lower[targets[arcs]] - num_products - 1)), -np.inf, 0.0)
+    model.add_constraints(len(arcs), np.concatenate((rows, rows)), np.concatenate((flows, arcs)),
+                          np.concatenate((np.ones(len(arcs)),
+                                          upper[targets[arcs]] - num_products - 1)), 0.0, np.inf)
+    # Row num_products is the flow leaving V, the other rows are the flow conservation
+    node_rhs = np.ones(num_products + 1)
+    node_rhs[num_products] = num_products
+    model.add_constraints(num_products + 1, np.concatenate((targets[arcs], sources[arcs])),
+                          np.concatenate((flows, flows)),
+                          np.concatenate((np.ones(len(arcs)),
+                                          np.where(sources[arcs] < num_products, -1.0, 1.0))),
+                          node_rhs, node_rhs)
+
+def _add_sparse_time_staged(model : SparseModel, sources : np.ndarray, targets : np.ndarray,
+                            lower : np.ndarray, upper : np.ndarray) -> None:
+    """Auxiliary function for adding the time-staged constraints to the sparse model, see
+    _add_time_staged
+
+    Args:
+        model (SparseModel): sparse model
+        sources (np.ndarray): source node of each changeover variable, V is node num_products
+        targets (np.ndarray): target node of each changeover variable
+        lower (np.ndarray): smallest position per product
+        upper (np.ndarray): largest position per product
+    """
+    num_products = len(lower)
+    first = np.flatnonzero(sources == num_products)
+    last = np.flatnonzero(targets == num_products)
+    fixed = np.concatenate((first[lower[targets[first]] > 1],
+                            last[upper[sources[last]] < num_products]))
+    model.add_constraints(len(fixed), np.arange(len(fixed)), fixed, 1.0, 0.0, 0.0)
+
+    arcs = np.flatnonzero((sources < num_products) & (targets < num_products))
+    first_stage = np.maximum(lower[sources[arcs]], lower[targets[arcs]] - 1)
+    last_stage = np.minimum(upper[sources[arcs]], upper[targets[arcs]] - 1)
+    counts = np.maximum(last_stage - first_stage + 1, 0)
+    staged = np.repeat(np.arange(len(arcs), dtype=np.int64), counts)
+    stage = first_stage[staged] + np.arange(len(staged)) \
+        - np.repeat(np.cumsum(counts) - counts, counts)
+    stage_vars = model.add_variables(len(staged), 0.0, 1.0, True)
+    model.add_constraints(len(arcs), np.concatenate((np.arange(len(arcs)), staged)),
+                          np.concatenate((arcs, stage_vars)),
+                          np.concatenate((np.ones(len(arcs)), -np.ones(len(staged)))), 0.0, 0.0)
+
+    # One row per product and position within its bounds: entering equals leaving
+    row_offsets = np.zeros(num_products + 1, dtype=np.int64)
+    np.cumsum(upper - lower + 1, out=row_offsets[1:])
+    entering = first[lower[targets[first]] == 1]
+    leaving = last[upper[sources[last]] == num_products]
+    products1, products2 = sources[arcs[staged]], targets[arcs[staged]]
+    model.add_constraints(int(row_offsets[-1]),
+        np.concatenate((row_offsets[targets[entering]],
+                        row_offsets[sources[leaving]] + num_products - lower[sources[leaving]],
+                        row_offsets[products2] + stage + 1 - lower[products2],
+                        row_offsets[products1] + stage - lower[products1])),
+        np.concatenate((entering, leaving, stage_vars, stage_vars)),
+        np.concatenate((np.ones(len(entering)), -np.ones(len(leaving)), np.ones(len(staged)),
+                        -np.ones(len(staged)))), 0.0, 0.0)
+
+def create_sparse_model(products : Set[str], consider_constraints : Union[None, int] = None,
+                        catalog : Union[ProductCatalog, None] = None,
+                        arcs : Union[ArcList, None] = None, formulation : str = 'subsets') \
+    -> Tuple[SparseModel, List[str], np.ndarray, np.ndarray]:
+    """Creating the ILP model of the Product Ordering problem as sparse matrices for
+    scipy.optimize.milp, i.e. the MIP solver HiGHS; the model equals the one of create_model
 
     Args:
         products (Set[str]): set of products
+        consider_constraints (Union[None, int], optional): Indicating which constraints are taken \
+            into account. For 0 no additional constraints are considered, for None all are \
+            considered. Defaults to None.
+        catalog (Union[ProductCatalog, None], optional): product catalog. If None, the catalog \
+            of this process is used. Defaults to None.
+        arcs (Union[ArcList, None], optional): feasible changeovers of the instance. If None, \
+            they are built from the catalog. Defaults to None.
+        formulation (str, optional): formulation of the subtour elimination, see create_model. \
+            Defaults to 'subsets'.
 
     Returns:
-        Tuple[List[str], int, int, bool]: minimal overall changeover time, optimal product order, \
-            number of variables, number of constraints, flag for timeout occurred
+        Tuple[SparseModel, List[str], np.ndarray, np.ndarray]: sparse model, node names with V \
+            as last node, source and target node of each changeover variable, whose columns are \
+            the first ones of the model
     """
-    model, variables = create_model(products, consider_constraints)
+    assert formulation in FORMULATIONS
+
+    if catalog is None:
+        catalog = get_catalog()
+    if arcs is None:
+        arcs = ArcList.from_catalog(list(products), catalog)
+    nodes = arcs.nodes
+    num_products = len(nodes)
+    indices = catalog.indices(nodes)
+    campaign = catalog.campaign[indices]
+    normal = catalog.packaging[indices] == 'Normal'
+    quantity = catalog.quantity[indices]
+    steps = np.array([catalog.campaigns_order[str(name)] for name in campaign], dtype=np.int64)
+    numCampaigns = len(set(campaign.tolist())) + 1
 
-    model.set_time_limit(TIMEOUT)
-    solve_solution = model.solve()
-    LOGGER.debug('Solution status: %s', solve_solution)
+    if consider_constraints is not None and consider_constraints >= 4:
+        LOGGER.error('These constraints haven\'t been implemented yet!')
+
+    # The changeovers of the arc list are followed by the ones from V and the ones to V
+    node_range = np.arange(num_products, dtype=np.int64)
+    vs = np.full(num_products, num_products, dtype=np.int64)
+    num_arcs = len(arcs)
+    sources = np.concatenate((arcs.sources(), vs, node_range))
+    targets = np.concatenate((arcs.targets, node_range, vs))
+    model = SparseModel()
+    columns = model.add_variables(len(sources), 0.0, 1.0, True,
+        np.concatenate((arcs.costs.astype(np.float64), np.zeros(2 * num_products))))
+
+    for keys in [sources, targets]:
+        by_key, offsets = _groups(keys, num_products + 1)
+        model.add_constraints(num_products + 1, np.repeat(np.arange(num_products + 1),
+                              np.diff(offsets)), columns[by_key], 1.0, 1.0, 1.0)
+
+    bounds = get_position_bounds(products, consider_constraints, catalog)
+    lower = np.array([bounds[node][0] for node in nodes], dtype=np.int64)
+    upper = np.array([bounds[node][1] for node in nodes], dtype=np.int64)
+    if formulation == 'subsets':
+        _add_sparse_subsets(model, sources, targets, num_products)
+    elif formulation == 'mtz':
+        _add_sparse_mtz(model, sources, targets, lower, upper)
+    elif formulation == 'scf':
+        _add_sparse_scf(model, sources, targets, lower, upper)
+    elif formulation == 'time_staged':
+        _add_sparse_time_staged(model, sources, targets, lower, upper)
+
+    product_sources, product_targets = sources[:num_arcs], targets[:num_arcs]
+    if consider_constraints is None or consider_constraints >= 1:
+        backward = np.flatnonzero(steps[product_targets] < steps[product_sources])
+        model.add_constraints(len(backward), np.arange(len(backward)), backward, 1.0, 0.0, 0.0)
+
+        # Each campaign and V is entered exactly once
+        switches = np.concatenate((
+            np.flatnonzero(campaign[product_sources] != campaign[product_targets]),
+            columns[num_arcs:]))
+        model.add_constraints(1, np.zeros(len(switches)), switches, 1.0, numCampaigns,
+                              numCampaigns)
+
+    if consider_constraints is None or consider_constraints >= 2:
+        codes = np.unique(campaign, return_inverse=True)[1].reshape(-1)
+        max_quantity = np.full(codes.max(initial=-1) + 1, np.iinfo(np.int64).min, dtype=np.int64)
+        np.maximum.at(max_quantity, codes[normal], quantity[normal])
+        max_quantity_node = normal & (quantity == max_quantity[codes])
+        blocked = np.flatnonzero(max_quantity_node[product_sources] \
+            & (codes[product_sources] == codes[product_targets]))
+        blocked_codes, rows = np.unique(codes[product_sources[blocked]], return_inverse=True)
+        model.add_constraints(len(blocked_codes), rows.reshape(-1), blocked, 1.0, 0.0, 0.0)
+
+    # Constraint 3 adds no constraints, see create_model
+
+    return model, nodes + ['v'], sources, targets
+
+def add_sparse_subtour_cut(model : SparseModel, sources : np.ndarray, targets : np.ndarray,
+                           subtour : List[int]) -> None:
+    """Adding the subtour elimination constraint of Dantzig, Fulkerson and Johnson for the nodes
+    of a subtour to the sparse model, see add_subtour_cut
+
+    Args:
+        model (SparseModel): sparse model
+        sources (np.ndarray): source node of each changeover variable
+        targets (np.ndarray): target node of each changeover variable
+        subtour (List[int]): nodes of the subtour
+    """
+    member = np.zeros(int(sources.max()) + 1, dtype=bool)
+    member[subtour] = True
+    columns = np.flatnonzero(member[sources] & member[targets])
+    model.add_constraints(1, np.zeros(len(columns)), columns, 1.0, -np.inf, len(subtour) - 1)
+
+def get_sparse_successors(solution : np.ndarray, nodes : List[str], sources : np.ndarray,
+                          targets : np.ndarray) -> Dict[str, str]:
+    """Analyzing the solution of the sparse model for extracting the successor of each product
+    and V
+
+    Args:
+        solution (np.ndarray): values of all variables
+        nodes (List[str]): node names with V as last node
+        sources (np.ndarray): source node of each changeover variable
+        targets (np.ndarray): target node of each changeover variable
+
+    Returns:
+        Dict[str, str]: successor per product
+    """
+    values = np.round(solution[:len(sources)])
+    assert np.isin(values, [0, 1]).all()
+    used = np.flatnonzero(values == 1)
+    return {nodes[source]: nodes[target] \
+        for source, target in zip(sources[used].tolist(), targets[used].tolist())}
+
+def run_highs(products : Set[str], consider_constraints : Union[None, int] = None,
+              arcs : Union[ArcList, None] = None, formulation : str = 'subsets',
+              deadline : Union[Deadline, None] = None) \
+    -> Tuple[List[str], Dict[str, Any], bool]:
+    """Computing the Product Ordering problem as an ILP using HiGHS via SciPy, see run_ilp
+
+    Args:
+        products (Set[str]): set of products
+        consider_constraints (Union[None, int], optional): Indicating which constraints are taken \
+            into account. For 0 no additional constraints are considered, for None all are \
+            considered. Defaults to None.
+        arcs (Union[ArcList, None], optional): feasible changeovers of the instance, e.g. \
+            reduced by a preprocessing. If None, they are built from the catalog. Defaults to None.
+        formulation (str, optional): formulation of the subtour elimination, see create_model. \
+            Defaults to 'subsets'.
+        deadline (Union[Deadline, None], optional): deadline of the computation, which may \
+            have been started before. If None, the time limit starts now. Defaults to None.
+
+    Returns:
+        Tuple[List[str], Dict[str, Any], bool]: optimal product order, dictionary of statistics \
+            as for run_ilp, flag for timeout occurred; HiGHS doesn't report its incumbents via \
+            SciPy, hence the trajectory only contains the final solution
+    """
+    if deadline is None:
+        deadline = Deadline()
+
+    build_time = time.time()
+    model, nodes, sources, targets = create_sparse_model(products, consider_constraints,
+                                                         arcs=arcs, formulation=formulation)
+    build_time = time.time() - build_time
+    index = {node: position for position, node in enumerate(nodes)}
+
+    start_time = time.time()
+    stats : Dict[str, Any] = {'BuildTime': build_time, 'SolveTime': 0.0, 'Iterations': 0,
+                              'Cuts': 0}
+    solution = None
+    while True:
+        remaining_time = deadline.remaining()
+        if remaining_time <= 0:
+            solution = None
+            break
+        solve_time = time.time()
+        solution = model.solve(remaining_time)
+        stats['SolveTime'] += time.time() - solve_time
+        stats['Iterations'] += 1
+        LOGGER.debug('Solution status: %s', solution.message)
+        if solution.x is None:
+            solution = None
+        if solution is None or formulation != 'lazy':
+            break
+
+        # The model is re-solved with the violated subtour constraints added
+        subtours = get_subtours(get_sparse_successors(solution.x, nodes, sources, targets))
+        if len(subtours) == 0:
+            break
+        for subtour in subtours:
+            add_sparse_subtour_cut(model, sources, targets,
+                                   [index[product] for product in subtour])
+        stats['Cuts'] += len(subtours)
+        LOGGER.debug('Iteration %d: %d subtours cut off', stats['Iterations'], len(subtours))
+
+    stats['Variables'] = model.number_of_variables
+    stats['Constraints'] = model.number_of_constraints
+    stats['ProvenOptimal'] = False
+    stats['Trajectory'] = []
+    LOGGER.debug('Model statistics: %s', str(stats))
+
+    if solution is None:
+        LOGGER.info('The problem does not have an optimal solution or the time limit is exceeded.')
+        return [], stats, True
+
+    # At the time limit, the incumbent is kept unless it still contains subtours
+    timeout = solution.status != 0
+    successors = get_sparse_successors(solution.x, nodes, sources, targets)
+    if len(get_subtours(successors)) > 0:
+        LOGGER.info('The time limit is exceeded.')
+        return [], stats, True
+    if timeout:
+        LOGGER.info('The time limit is exceeded, the best order found so far is returned.')
+
+    order = follow_successors(successors)
+
+    opt_value = solution.fun
+    assert round(opt_value) == calculate_oct(order)
+    LOGGER.debug('Objective value = %s', str(opt_value))
+    stats['ProvenOptimal'] = not timeout
+    stats['Trajectory'] = [(time.time() - start_time, round(opt_value))]
+
+    return order, stats, timeout
+
+def run_ilp(products : Set[str], consider_constraints : Union[None, int] = None,
+            arcs : Union[ArcList, None] = None, warm_start : bool = False,
+            formulation : str = 'subsets', backend : str = 'cplex',
+            deadline : Union[Deadline, None] = None) -> Tuple[List[str], Dict[str, Any], bool]:
+    """Computing the Product Ordering problem as an ILP using the Python API of CPLEX or HiGHS
+
+    Args:
+        products (Set[str]): set of products
+        consider_constraints (Union[None, int], optional): Indicating which constraints are taken \
+            into account. For 0 no additional constraints are considered, for None all are \
+            considered. Defaults to None.
+        arcs (Union[ArcList, None], optional): feasible changeovers of the instance, e.g. \
+            reduced by a preprocessing. If None, they are built from the catalog. Defaults to None.
+        warm_start (bool, optional): start CPLEX with the heuristically constructed order as \
+            MIP start. Defaults to False.
+        formulation (str, optional): formulation of the subtour elimination, see create_model. \
+            Defaults to 'subsets'.
+        backend (str, optional): MIP solver; 'cplex' or 'highs', which doesn't support a warm \
+            start. Defaults to 'cplex'.
+        deadline (Union[Deadline, None], optional): deadline of the computation, which may \
+            have been started before; the time limit of every solver call is the remaining \
+            time. If None, the time limit starts now. Defaults to None.
+
+    Returns:
+        Tuple[List[str], Dict[str, Any], bool]: optimal product order, dictionary of the number \
+            of variables and constraints, the times for building and solving the model, the number \
+            of solver calls and added subtour constraints, the flag whether the order is proven \
+            optimal and the trajectory of the elapsed time and costs of the incumbents, flag for \
+            timeout occurred; if the time limit is exceeded, the best order found so far is \
+            returned
+    """
+    assert backend in BACKENDS
+    if deadline is None:
+        deadline = Deadline()
+    if backend == 'highs':
+        if warm_start:
+            LOGGER.debug('The warm start is ignored by HiGHS.')
+        return run_highs(products, consider_constraints, arcs, formulation, deadline)
+
+    build_time = time.time()
+    model, variables = create_model(products, consider_constraints, arcs=arcs,
+                                    formulation=formulation)
+    build_time = time.time() - build_time
+
+    if warm_start:
+        _, order = construct_order(products, consider_constraints)
+        if len(order) > 0:
+            add_warm_start(model, variables, order)
+
+    start_time = time.time()
+    stats : Dict[str, Any] = {'BuildTime': build_time, 'SolveTime': 0.0, 'Iterations': 0,
+                              'Cuts': 0}
+    # The incumbents of the lazy formulation may contain subtours, i.e. they aren't orders
+    listener = IncumbentListener(start_time)
+    if formulation != 'lazy':
+        model.add_progress_listener(listener)
+    while True:
+        remaining_time = deadline.remaining()
+        if remaining_time <= 0:
+            solve_solution = None
+            break
+        model.set_time_limit(remaining_time)
+        solve_time = time.time()
+        solve_solution = model.solve()
+        stats['SolveTime'] += time.time() - solve_time
+        stats['Iterations'] += 1
+        LOGGER.debug('Solution status: %s', solve_solution)
+        if solve_solution is None or formulation != 'lazy':
+            break
+
+        # The model is re-solved with the violated subtour constraints added
+        subtours = get_subtours(get_successors(variables))
+        if len(subtours) == 0:
+            break
+        for subtour in subtours:
+            add_subtour_cut(model, variables, subtour)
+        stats['Cuts'] += len(subtours)
+        LOGGER.debug('Iteration %d: %d subtours cut off', stats['Iterations'], len(subtours))
+
+    stats['Variables'] = model.number_of_variables
+    stats['Constraints'] = model.number_of_constraints
+    stats['ProvenOptimal'] = False
+    stats['Trajectory'] = listener.trajectory
+    LOGGER.debug('Model statistics: %s', str(stats))
 
     if solve_solution is None:
         LOGGER.info('The problem does not have an optimal solution or the time limit is exceeded.')
-        return [], -1, -1, True
+        return [], stats, True
+
+    # At the time limit, the incumbent is kept unless it still contains subtours
+    timeout = model.solve_details.has_hit_limit()
+    if len(get_subtours(get_successors(variables))) > 0:
+        LOGGER.info('The time limit is exceeded.')
+        return [], stats, True
+    if timeout:
+        LOGGER.info('The time limit is exceeded, the best order found so far is returned.')
 
     order = extract_order(variables)
 
     opt_value = solve_solution.get_objective_value()
-    assert opt_value == calculate_oct(order)
+    assert round(opt_value) == calculate_oct(order)
     LOGGER.debug('Objective value = %s', str(opt_value))
+    stats['ProvenOptimal'] = not timeout
+    if len(listener.trajectory) == 0 or listener.trajectory[-1][1] > round(opt_value):
+        listener.trajectory.append((time.time() - start_time, round(opt_value)))
 
-    num_variables = model.number_of_variables
-    num_constraints = model.number_of_constraints
-
-    return order, num_variables, num_constraints, False
+    return order, stats, timeout
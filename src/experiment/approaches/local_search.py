@@ -0,0 +1,318 @@
+"""Approach for solving the Product Ordering approach:
+Anytime local search for large catalogs; iterated local search with 2-opt, swap, relocate and
+Or-opt moves, whereas the moves are restricted to the campaign steps and the costs of all moves of
+a neighbourhood are evaluated at once on the changeover matrix
+"""
+from typing import *
+import logging
+import time
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from constants.constants import PROJECT_FOLDER
+from catalog.catalog import ProductCatalog, get_catalog
+sys.path.append(PROJECT_FOLDER)
+from src.experiment.utils import build_changeover_matrices, calculate_oct
+from src.experiment.approaches.heuristics import path_cost, is_feasible, nearest_neighbour, \
+    cheapest_insertion
+
+LOGGER = logging.getLogger('experiment')
+
+# Time budget in seconds of the local search
+BUDGET = 60.0
+
+# Maximal length of the segments moved by Or-opt; length 1 is the relocate move
+MAX_SEGMENT_LENGTH = 3
+
+# Number of random segment moves perturbing the incumbent
+KICKS = 3
+
+# A move is given by its kind and up to three positions of the tour
+Move = Tuple[str, int, int, int]
+
+def _reversal_moves(weights : np.ndarray, tour : np.ndarray, positions : np.ndarray) \
+    -> Tuple[np.ndarray, np.ndarray]:
+    """Auxiliary function for evaluating all 2-opt moves within a block of positions, i.e. the
+    reversals of the segments i, ..., j of the tour. The costs of a reversed segment are the
+    difference of prefix sums of the backward arcs, hence each move is evaluated in constant time
+
+    Args:
+        weights (np.ndarray): extended changeover matrix
+        tour (np.ndarray): nodes of the tour, beginning and ending with the sentinel
+        positions (np.ndarray): consecutive positions of the block
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: change of the costs per pair (i, j), mask of the valid \
+            moves
+    """
+    costs = weights[tour[:-1], tour[1:]]
+    forward = np.concatenate(([0], np.cumsum(costs)))
+    backward = np.concatenate(([0], np.cumsum(weights[tour[1:], tour[:-1]])))
+    i = positions[:, np.newaxis]
+    j = positions[np.newaxis, :]
+    deltas = weights[tour[i - 1], tour[j]] + weights[tour[i], tour[j + 1]] \
+        - costs[i - 1] - costs[j] + (backward[j] - backward[i]) - (forward[j] - forward[i])
+    return deltas, j > i
+
+def _swap_moves(weights : np.ndarray, tour : np.ndarray, positions : np.ndarray) \
+    -> Tuple[np.ndarray, np.ndarray]:
+    """Auxiliary function for evaluating all swap moves within a block of positions, i.e. the
+    exchanges of the nodes at the positions i and j of the tour
+
+    Args:
+        weights (np.ndarray): extended changeover matrix
+        tour (np.ndarray): nodes of the tour, beginning and ending with the sentinel
+        positions (np.ndarray): consecutive positions of the block
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: change of the costs per pair (i, j), mask of the valid \
+            moves
+    """
+    costs = weights[tour[:-1], tour[1:]]
+    i = positions[:, np.newaxis]
+    j = positions[np.newaxis, :]
+    distant = weights[tour[i - 1], tour[j]] + weights[tour[j], tour[i + 1]] \
+        + weights[tour[j - 1], tour[i]] + weights[tour[i], tour[j + 1]] \
+        - costs[i - 1] - costs[i] - costs[j - 1] - costs[j]
+    adjacent = weights[tour[i - 1], tour[j]] + weights[tour[j], tour[i]] \
+        + weights[tour[i], tour[j + 1]] - costs[i - 1] - costs[i] - costs[j]
+    deltas = np.where(j == i + 1, adjacent, distant)
+    return deltas, j > i
+
+def _segment_moves(weights : np.ndarray, tour : np.ndarray, positions : np.ndarray,
+                   length : int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Auxiliary function for evaluating all Or-opt moves of the given segment length within a
+    block of positions, i.e. moving the segment i, ..., i + length - 1 between the positions k and
+    k + 1 of the tour; the segment may also be moved to both ends of the block
+
+    Args:
+        weights (np.ndarray): extended changeover matrix
+        tour (np.ndarray): nodes of the tour, beginning and ending with the sentinel
+        positions (np.ndarray): consecutive positions of the block
+        length (int): length of the moved segments
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: change of the costs per pair (i, k), mask of \
+            the valid moves, positions k
+    """
+    costs = weights[tour[:-1], tour[1:]]
+    gaps = np.arange(positions[0] - 1, positions[-1] + 1)
+    i = positions[:len(positions) - length + 1, np.newaxis]
+    k = gaps[np.newaxis, :]
+    first = tour[i]
+    last = tour[i + length - 1]
+    deltas = weights[tour[i - 1], tour[i + length]] - costs[i - 1] - costs[i + length - 1] \
+        + weights[tour[k], first] + weights[last, tour[k + 1]] - costs[k]
+    return deltas, (k < i - 1) | (k > i + length - 1), gaps
+
+def get_blocks(path : Sequence[int], steps : Union[np.ndarray, None]) -> List[np.ndarray]:
+    """Auxiliary function for determining the blocks of consecutive positions of the tour, which
+    belong to the same campaign step. Moving the nodes only within their block keeps a path
+    respecting the campaigns order
+
+    Args:
+        path (Sequence[int]): nodes of the path sorted by their campaign steps
+        steps (Union[np.ndarray, None]): campaign step of each node; None for no campaigns order
+
+    Returns:
+        List[np.ndarray]: positions of the tour per block
+    """
+    positions = np.arange(1, len(path) + 1)
+    if steps is None:
+        return [positions]
+    levels = steps[np.asarray(path, dtype=np.int64)]
+    assert (np.diff(levels) >= 0).all()
+    return np.split(positions, np.flatnonzero(np.diff(levels)) + 1)
+
+def _neighbourhoods(weights : np.ndarray, tour : np.ndarray, blocks : List[np.ndarray]) \
+    -> Iterator[Tuple[str, int, np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+    """Auxiliary function for evaluating all neighbourhoods of the tour block by block
+
+    Args:
+        weights (np.ndarray): extended changeover matrix
+        tour (np.ndarray): nodes of the tour, beginning and ending with the sentinel
+        blocks (List[np.ndarray]): positions of the tour per block
+
+    Yields:
+        Iterator[Tuple[str, int, np.ndarray, np.ndarray, np.ndarray, np.ndarray]]: kind of \
+            move, segment length, change of the costs, mask of the valid moves, positions of the \
+            rows and columns
+    """
+    for positions in blocks:
+        yield ('reverse', 0, *_reversal_moves(weights, tour, positions), positions, positions)
+        yield ('swap', 0, *_swap_moves(weights, tour, positions), positions, positions)
+        for length in range(1, min(MAX_SEGMENT_LENGTH, len(positions)) + 1):
+            deltas, valid, gaps = _segment_moves(weights, tour, positions, length)
+            yield ('segment', length, deltas, valid, positions, gaps)
+
+def apply_move(tour : np.ndarray, move : Move) -> np.ndarray:
+    """Applying a move to a tour
+
+    Args:
+        tour (np.ndarray): nodes of the tour, beginning and ending with the sentinel
+        move (Move): kind of move and its positions (i, j) or (i, k, length)
+
+    Returns:
+        np.ndarray: resulting tour
+    """
+    kind, i, j, length = move
+    tour = tour.copy()
+    if kind == 'reverse':
+        tour[i:j + 1] = tour[i:j + 1][::-1]
+    elif kind == 'swap':
+        tour[i], tour[j] = tour[j], tour[i]
+    else:
+        segment = tour[i:i + length]
+        rest = np.concatenate((tour[:i], tour[i + length:]))
+        position = j + 1 if j < i else j + 1 - length
+        tour = np.concatenate((rest[:position], segment, rest[position:]))
+    return tour
+
+def descend(weights : np.ndarray, tour : np.ndarray, blocks : List[np.ndarray], deadline : float) \
+    -> Tuple[np.ndarray, int]:
+    """Applying the best move of all neighbourhoods until the tour is a local optimum or the
+    deadline is reached
+
+    Args:
+        weights (np.ndarray): extended changeover matrix
+        tour (np.ndarray): nodes of the tour, beginning and ending with the sentinel
+        blocks (List[np.ndarray]): positions of the tour per block
+        deadline (float): point in time for stopping
+
+    Returns:
+        Tuple[np.ndarray, int]: resulting tour and its costs
+    """
+    cost = path_cost(weights, tour)
+    while time.time() < deadline:
+        best_delta = 0
+        best_move : Union[Move, None] = None
+        for kind, length, deltas, valid, rows, columns in _neighbourhoods(weights, tour, blocks):
+            deltas = np.where(valid, deltas, 0)
+            row, column = np.unravel_index(int(np.argmin(deltas)), deltas.shape)
+            if deltas[row, column] < best_delta:
+                best_delta = int(deltas[row, column])
+                best_move = (kind, int(rows[row]), int(columns[column]), length)
+        if best_move is None:
+            break
+        tour = apply_move(tour, best_move)
+        cost += best_delta
+    return tour, cost
+
+def perturb(weights : np.ndarray, tour : np.ndarray, blocks : List[np.ndarray],
+            rng : np.random.Generator, kicks : int = KICKS) -> np.ndarray:
+    """Perturbing a tour by random segment moves within the blocks
+
+    Args:
+        weights (np.ndarray): extended changeover matrix
+        tour (np.ndarray): nodes of the tour, beginning and ending with the sentinel
+        blocks (List[np.ndarray]): positions of the tour per block
+        rng (np.random.Generator): random number generator
+        kicks (int, optional): number of random moves. Defaults to KICKS.
+
+    Returns:
+        np.ndarray: perturbed tour
+    """
+    candidates = [positions for positions in blocks if len(positions) >= 3]
+    for _ in range(kicks if len(candidates) > 0 else 0):
+        # Larger blocks are perturbed more often
+        sizes = np.array([len(positions) for positions in candidates], dtype=np.float64)
+        positions = candidates[int(rng.choice(len(candidates), p=sizes / sizes.sum()))]
+        length = int(rng.integers(1, min(MAX_SEGMENT_LENGTH, len(positions) - 1) + 1))
+        _, valid, gaps = _segment_moves(weights, tour, positions, length)
+        row, column = np.unravel_index(int(rng.choice(np.flatnonzero(valid))), valid.shape)
+        tour = apply_move(tour, ('segment', int(positions[row]), int(gaps[column]), length))
+    return tour
+
+def search(weights : np.ndarray, path : List[int], steps : Union[np.ndarray, None] = None,
+           budget : float = BUDGET, seed : int = 0) -> Tuple[List[int], int, List[Tuple[float, int]]]:
+    """Improving a path by iterated local search: the incumbent is perturbed by random segment
+    moves and brought back into a local optimum by descent, until the time budget is used up. The
+    perturbed tour replaces the incumbent, if it isn't more expensive. All moves keep the nodes
+    within the positions of their campaign step, hence a path respecting the campaigns order
+    keeps respecting it
+
+    Args:
+        weights (np.ndarray): changeover matrix
+        path (List[int]): initial path; the nodes have to be sorted by their campaign steps
+        steps (Union[np.ndarray, None], optional): campaign step of each node; None for no \
+            campaigns order. Defaults to None.
+        budget (float, optional): time budget in seconds. Defaults to BUDGET.
+        seed (int, optional): seed of the random number generator. Defaults to 0.
+
+    Returns:
+        Tuple[List[int], int, List[Tuple[float, int]]]: best path, its costs, trajectory of the \
+            elapsed time and costs per improvement of the incumbent
+    """
+    start_time = time.time()
+    deadline = start_time + budget
+    rng = np.random.default_rng(seed)
+    extended = np.pad(weights, ((0, 1), (0, 1)))
+    sentinel = weights.shape[0]
+    tour = np.array([sentinel] + list(path) + [sentinel], dtype=np.int64)
+    blocks = get_blocks(path, steps)
+
+    trajectory = [(0.0, path_cost(extended, tour))]
+    incumbent, incumbent_cost = descend(extended, tour, blocks, deadline)
+    if incumbent_cost < trajectory[-1][1]:
+        trajectory.append((time.time() - start_time, incumbent_cost))
+
+    while time.time() < deadline and any(len(positions) >= 3 for positions in blocks):
+        tour = perturb(extended, incumbent, blocks, rng)
+        tour, cost = descend(extended, tour, blocks, deadline)
+        if cost < incumbent_cost:
+            trajectory.append((time.time() - start_time, cost))
+            LOGGER.debug('New incumbent with costs %d after %.2f seconds', cost,
+                         trajectory[-1][0])
+        if cost <= incumbent_cost:
+            incumbent, incumbent_cost = tour, cost
+
+    return [int(node) for node in incumbent[1:-1]], incumbent_cost, trajectory
+
+def run_local_search(products : Set[str], consider_constraints : Union[None, int] = None,
+                     budget : float = BUDGET, seed : int = 0,
+                     catalog : Union[ProductCatalog, None] = None) \
+    -> Tuple[int, List[str], List[Tuple[float, int]]]:
+    """Computing a good solution of the Product Ordering problem with an anytime local search on
+    the changeover matrix modified regarding the constraints. The initial order is the cheaper one
+    of nearest neighbour and cheapest insertion, thus there is always an order as result, even if
+    the time budget is small
+
+    Args:
+        products (Set[str]): set of products
+        consider_constraints (Union[None, int], optional): Indicating which constraints are taken \
+            into account. For 0 no additional constraints are considered, for None all are \
+            considered. Defaults to None.
+        budget (float, optional): time budget in seconds. Defaults to BUDGET.
+        seed (int, optional): seed of the random number generator. Defaults to 0.
+        catalog (Union[ProductCatalog, None], optional): product catalog. If None, the catalog \
+            of this process is used. Defaults to None.
+
+    Returns:
+        Tuple[int, List[str], List[Tuple[float, int]]]: overall changeover time of the best \
+            order, best product order, trajectory of the elapsed time and costs regarding the \
+            modified changeover matrix per improvement
+    """
+    if catalog is None:
+        catalog = get_catalog()
+    products_list = sorted(products)
+    weights, campaigns_order = build_changeover_matrices(products_list, [consider_constraints],
+                                                         catalog)[consider_constraints]
+
+    steps = None
+    if consider_constraints is None or consider_constraints >= 1:
+        steps = np.array([campaigns_order[catalog.campaign[catalog.index[product]]] \
+            for product in products_list], dtype=np.int64)
+
+    paths = [nearest_neighbour(weights, steps), cheapest_insertion(weights, steps)]
+    path = min(paths, key=lambda path: path_cost(weights, path))
+    path, _, trajectory = search(weights, path, steps, budget, seed)
+    LOGGER.debug('Local search trajectory: %s', str(trajectory))
+
+    if not is_feasible(weights, path):
+        LOGGER.info('The best order found violates the constraints.')
+
+    order = [products_list[node] for node in path]
+    assert len(order) == len(products)
+
+    return calculate_oct(order, catalog=catalog), order, trajectory
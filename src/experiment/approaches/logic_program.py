@@ -1,23 +1,31 @@
 """Approach for solving the Product Ordering approach:
 Interpretation of problem instance as TSP, transformation into a linear program and usage of
-encoding with normal or advanced optimization directive
+encoding with normal or advanced optimization directive; several options of considered
+constraints can be solved in one multi-shot session, which grounds the instance only once
 """
 from typing import *
 import logging
-import time
 import re
 import os
 import sys
 import clingo
+import clingo.ast
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 from constants.constants import PO_ENCODING, NORMAL_OPT_ENCODING, ADVANCED_OPT_ENCODING, \
     CONSTRAINT_1_ENCODING, CONSTRAINT_2_ENCODING, CONSTRAINT_3_ENCODING, CONSTRAINT_4_ENCODING, \
-    INSTANCES_FOLDER, PROJECT_FOLDER, TIMEOUT
+    INSTANCES_FOLDER, PROJECT_FOLDER
+from catalog.arcs import ArcList
 sys.path.append(PROJECT_FOLDER)
-from src.experiment.utils import create_lp_instance, ModelHelper
+from src.experiment.utils import create_lp_instance, add_lp_instance, clingo_arguments, \
+    get_tuned_options, Deadline, ModelHelper, solve_with_deadline
+from src.experiment.approaches.heuristics import construct_order
 
 LOGGER = logging.getLogger('experiment')
 
+# Encodings of the constraints 1 to 4, whereas constraint level k includes the first k of them
+CONSTRAINT_ENCODINGS = [CONSTRAINT_1_ENCODING, CONSTRAINT_2_ENCODING, CONSTRAINT_3_ENCODING,
+                        CONSTRAINT_4_ENCODING]
+
 def interpret_clingo(symbols : Sequence[clingo.Symbol]) -> List[str]:
     """Parsing the command line output of the answer set solver clingo for extracting the
     resulting order of products for the TSP encoding
@@ -65,8 +73,92 @@ def interpret_clingo(symbols : Sequence[clingo.Symbol]) -> List[str]:
 
     return order
 
+def add_warm_start(ctl : clingo.Control, order : List[str]) -> bool:
+    """Using a product order as warm start for the grounded program: the switches of the order get
+    a positive sign preference for the domain heuristic, and the costs of the order bound the
+    optimization from the beginning. The costs are computed by clingo itself by solving under the
+    assumption of the switches, hence they are given in the units and priorities of the loaded
+    encodings
+
+    Args:
+        ctl (clingo.Control): control object with the grounded program
+        order (List[str]): product order
+
+    Returns:
+        bool: flag whether the warm start was added; False, if the order isn't a model
+    """
+    switches = {}
+    for atom in ctl.symbolic_atoms.by_signature('switch', 2):
+        product1, product2 = atom.symbol.arguments
+        switches[(str(product1), str(product2))] = atom
+    arcs = list(zip(['v'] + order, order + ['v']))
+    if any(arc not in switches for arc in arcs):
+        LOGGER.debug('The warm start uses a changeover missing in the program.')
+        return False
+
+    costs : List[int] = []
+    def on_model(model : clingo.Model) -> None:
+        costs[:] = model.cost
+    solve_result = ctl.solve(assumptions=[(switches[arc].symbol, True) for arc in arcs],
+                             on_model=on_model)
+    if not solve_result.satisfiable:
+        LOGGER.debug('The warm start violates the constraints of the program.')
+        return False
+
+    with ctl.backend() as backend:
+        for arc in arcs:
+            backend.add_heuristic(switches[arc].literal, clingo.backend.HeuristicType.Sign, 1, 1,
+                                  [])
+    ctl.configuration.solver.heuristic = 'Domain' # type: ignore
+    # The bound is inclusive, so the order itself remains a model
+    ctl.configuration.solve.opt_mode = ','.join(['opt'] + [str(cost) for cost in costs]) # type: ignore
+    LOGGER.debug('Warm start with costs %s', str(costs))
+    return True
+
+def get_statistics(ctl : clingo.Control) -> Dict[str, Any]:
+    """Collecting the statistics of the last solve call of clingo
+
+    Args:
+        ctl (clingo.Control): control object after solving
+
+    Returns:
+        Dict[str, Any]: dictionary of clingo statistics
+    """
+    constraints = int(ctl.statistics['problem']['generator']['constraints'])
+    complexity = int(ctl.statistics['problem']['generator']['complexity'])
+    vars = int(ctl.statistics['problem']['generator']['vars'])
+
+    atoms = int(ctl.statistics['problem']['lp']['atoms'])
+    bodies = int(ctl.statistics['problem']['lp']['bodies'])
+    rules = int(ctl.statistics['problem']['lp']['rules'])
+
+    choices = int(ctl.statistics['solving']['solvers']['choices'])
+    conflicts = int(ctl.statistics['solving']['solvers']['conflicts'])
+    restarts = int(ctl.statistics['solving']['solvers']['restarts'])
+
+    models = int(ctl.statistics['summary']['models']['enumerated'])
+
+    stats = {
+        'Constraints': constraints,
+        'Complexity': complexity,
+        'Vars': vars,
+        'Atoms': atoms,
+        'Bodies': bodies,
+        'Rules': rules,
+        'Choices': choices,
+        'Conflicts': conflicts,
+        'Restarts': restarts,
+        'Models': models
+    }
+
+    return stats
+
 def run_clingo(products : Set[str], run : int, encoding : str = 'advanced', \
-    consider_constraints : Union[None, int] = None) -> Tuple[int, List[str], Dict[str, Any], bool]:
+    consider_constraints : Union[None, int] = None, dump : bool = False,
+    arcs : Union[ArcList, None] = None, warm_start : bool = False, threads : int = 1,
+    parallel_mode : str = 'compete', configuration : str = 'auto', opt_strategy : str = 'bb',
+    options : Union[Dict[str, str], None] = None, deadline : Union[Deadline, None] = None) \
+    -> Tuple[int, List[str], Dict[str, Any], bool]:
     """Computing the Product Ordering problem as a logic program using the normal or advanced
     encoding for the optimization directive
 
@@ -78,20 +170,49 @@ def run_clingo(products : Set[str], run : int, encoding : str = 'advanced', \
         consider_constraints (Union[None, int], optional): Indicating which constraints are taken \
             into account. For 0 no additional constraints are considered, for None all are \
             considered. Defaults to None.
+        dump (bool, optional): additionally write the instance as LP source code into the \
+            instances folder. Defaults to False.
+        arcs (Union[ArcList, None], optional): feasible changeovers of the instance, e.g. \
+            reduced by a preprocessing. If None, they are built from the catalog. Defaults to None.
+        warm_start (bool, optional): start clingo with the heuristically constructed order as \
+            initial bound and sign preferences. Defaults to False.
+        threads (int, optional): number of solver threads. Defaults to 1.
+        parallel_mode (str, optional): mode of the parallel solving, see clingo_arguments. \
+            Defaults to 'compete'.
+        configuration (str, optional): configuration or portfolio of clasp, see \
+            clingo_arguments. Defaults to 'auto'.
+        opt_strategy (str, optional): optimization strategy, see clingo_arguments. Defaults to \
+            'bb'.
+        options (Union[Dict[str, str], None], optional): further options of clasp, see \
+            clingo_arguments. If None and the configuration and optimization strategy are left \
+            at their defaults, the tuned options for the sample size are taken from the table of \
+            tuned configurations, if there are any. Defaults to None.
+        deadline (Union[Deadline, None], optional): deadline of the computation, which may \
+            have been started before. If None, the time limit starts now. Defaults to None.
 
     Returns:
         Tuple[int, List[str], Dict[str, Any], bool]: objective value, optimal product order, \
-            dictionary of clingo statistics, flag for timeout occurred
+            dictionary of clingo statistics, flag for timeout occurred; if the time limit is \
+            exceeded, the best order found so far is returned, whereas the statistics tell \
+            whether the order is proven optimal, together with the trajectory of the elapsed \
+            time and costs of the models found
     """
     assert encoding in ['normal', 'advanced']
-    instance = create_lp_instance(products)
+    if deadline is None:
+        deadline = Deadline()
+    if options is None and configuration == 'auto' and opt_strategy == 'bb':
+        options = get_tuned_options(f'lp_{encoding}', consider_constraints, len(products))
+        LOGGER.debug('Tuned options of clasp: %s', str(options))
 
-    filename = os.path.join(INSTANCES_FOLDER, 'lp', f'instance_{len(products)}_{run}.lp')
-    if not os.path.exists(filename):
-        with open(filename, 'w') as filehandle:
-            filehandle.write(instance)
+    if dump:
+        filename = os.path.join(INSTANCES_FOLDER, 'lp', f'instance_{len(products)}_{run}.lp')
+        if not os.path.exists(filename):
+            with open(filename, 'w') as filehandle:
+                filehandle.write(create_lp_instance(products, arcs=arcs))
 
-    ctl = clingo.Control()
+    # The instance atoms are only defined in the backend and thus unknown to the parser
+    ctl = clingo.Control(['--warn=no-atom-undefined'] + clingo_arguments(threads, parallel_mode,
+        configuration, opt_strategy, options))
     ctl.load(PO_ENCODING)
     if encoding == 'normal':
         ctl.load(NORMAL_OPT_ENCODING)
@@ -105,56 +226,230 @@ def run_clingo(products : Set[str], run : int, encoding : str = 'advanced', \
          ctl.load(CONSTRAINT_3_ENCODING)
     if consider_constraints is None or consider_constraints >= 4:
          ctl.load(CONSTRAINT_4_ENCODING)
-    ctl.add('base', [], instance)
+    add_lp_instance(ctl, products, arcs=arcs)
     ctl.ground([('base', [])])
 
-    modelHelper = ModelHelper()
-    start_time = time.time()
-    solve_handle : clingo.SolveHandle
-    with ctl.solve(on_model=modelHelper.on_model, on_finish=modelHelper.on_finish,
-        async_=True) as solve_handle: # type: ignore
-        while not solve_handle.wait(timeout=10.0):
-            if time.time() - start_time > TIMEOUT:
-                break
+    if warm_start:
+        _, order = construct_order(products, consider_constraints)
+        if len(order) > 0:
+            add_warm_start(ctl, order)
 
-    if not modelHelper.exhausted:
-        LOGGER.info('The time limit is exceeded.')
-        return -1, [], {}, True
+    modelHelper = ModelHelper()
+    solve_with_deadline(ctl, modelHelper, deadline)
 
-    if not modelHelper.optimal:
+    if modelHelper.symbols is None:
+        if not modelHelper.exhausted:
+            LOGGER.info('The time limit is exceeded.')
+            return -1, [], {}, True
         LOGGER.info('The problem does not have an optimal solution.')
         return -1, [], {}, False
 
+    if not modelHelper.exhausted:
+        LOGGER.info('The time limit is exceeded, the best order found so far is returned.')
+
     order = interpret_clingo(modelHelper.symbols)
     assert len(order) == len(products)
 
-    opt_value = int(ctl.statistics['summary']['costs'][0])
+    assert modelHelper.costs is not None
+    opt_value = modelHelper.costs[0]
 
-    constraints = int(ctl.statistics['problem']['generator']['constraints'])
-    complexity = int(ctl.statistics['problem']['generator']['complexity'])
-    vars = int(ctl.statistics['problem']['generator']['vars'])
+    stats = get_statistics(ctl)
+    stats['ProvenOptimal'] = modelHelper.optimal
+    stats['Trajectory'] = modelHelper.get_trajectory()
 
-    atoms = int(ctl.statistics['problem']['lp']['atoms'])
-    bodies = int(ctl.statistics['problem']['lp']['bodies'])
-    rules = int(ctl.statistics['problem']['lp']['rules'])
+    return opt_value, order, stats, not modelHelper.exhausted
 
-    choices = int(ctl.statistics['solving']['solvers']['choices'])
-    conflicts = int(ctl.statistics['solving']['solvers']['conflicts'])
-    restarts = int(ctl.statistics['solving']['solvers']['restarts'])
+def _active(level : int) -> clingo.Symbol:
+    """Auxiliary function for the external atom switching the encoding of a constraint on
 
-    models = int(ctl.statistics['summary']['models']['enumerated'])
+    Args:
+        level (int): number of the constraint
 
-    stats = {
-        'Constraints': constraints,
-        'Complexity': complexity,
-        'Vars': vars,
-        'Atoms': atoms,
-        'Bodies': bodies,
-        'Rules': rules,
-        'Choices': choices,
-        'Conflicts': conflicts,
-        'Restarts': restarts,
-        'Models': models
-    }
+    Returns:
+        clingo.Symbol: external atom active(level)
+    """
+    return clingo.Function('active', [clingo.Number(level)])
+
+def add_constraint_part(builder : clingo.ast.ProgramBuilder, level : int) -> None:
+    """Adding the encoding of a constraint as program part c<level>, whose rules and weak
+    constraints are only applicable, if the external atom active(level) is true
+
+    Args:
+        builder (clingo.ast.ProgramBuilder): program builder of the control object
+        level (int): number of the constraint between 1 and 4
+    """
+    location = clingo.ast.Location(clingo.ast.Position('<session>', 1, 1),
+                                   clingo.ast.Position('<session>', 1, 1))
+    active = clingo.ast.Literal(location, clingo.ast.Sign.NoSign, clingo.ast.SymbolicAtom(
+        clingo.ast.SymbolicTerm(location, _active(level))))
+
+    def add(statement : clingo.ast.AST) -> None:
+        if statement.ast_type == clingo.ast.ASTType.Program:
+            statement = clingo.ast.Program(location, f'c{level}', [])
+        elif statement.ast_type in [clingo.ast.ASTType.Rule, clingo.ast.ASTType.Minimize]:
+            statement = statement.update(body=list(statement.body) + [active])
+        builder.add(statement)
+
+    clingo.ast.parse_files([CONSTRAINT_ENCODINGS[level - 1]], add)
+    clingo.ast.parse_string(f'#program c{level}. #external {_active(level)}.', builder.add)
+
+class PriorityObserver(clingo.Observer):
+    """Observer of the ground program collecting the priorities of the grounded weak constraints
+    """
+    def __init__(self):
+        self.priorities : Set[int] = set()
+
+    def minimize(self, priority : int, literals : Sequence[Tuple[int, int]]) -> None:
+        if len(literals) > 0:
+            self.priorities.add(priority)
 
-    return opt_value, order, stats, False
+class ClingoSession():
+    """This class solves a Product Ordering problem instance for several options of considered
+    constraints with one clingo control object (multi-shot solving). The encoding, the
+    optimization directive and the instance are grounded once; the encoding of each constraint is
+    a program part switched on and off by an external atom, such that changing the option only
+    reassigns the external atoms. The parts of the constraints 2 to 4 only add new atoms and are
+    grounded on their first use, whereas the part of constraint 1 restricts the changeovers of the
+    base program and is grounded together with it. The learned nogoods stay valid for every
+    assignment of the external atoms, hence clasp keeps them between the solve calls. As the weak
+    constraints of switched off parts remain in the cost vector, the objective value is taken at
+    the highest priority of the grounded weak constraints of the switched on parts
+    """
+
+    def __init__(self, products : Set[str], encoding : str = 'advanced',
+                 arcs : Union[ArcList, None] = None, threads : int = 1,
+                 parallel_mode : str = 'compete', configuration : str = 'auto',
+                 opt_strategy : str = 'bb') -> None:
+        """Constructor of a session, which grounds the base program
+
+        Args:
+            products (Set[str]): set of products
+            encoding (str): usage of normal or advanced encoding for optimization directive. \
+                Defaults to 'advanced'.
+            arcs (Union[ArcList, None], optional): feasible changeovers of the instance. If \
+                None, they are built from the catalog. Defaults to None.
+            threads (int, optional): number of solver threads. Defaults to 1.
+            parallel_mode (str, optional): mode of the parallel solving, see clingo_arguments. \
+                Defaults to 'compete'.
+            configuration (str, optional): configuration or portfolio of clasp, see \
+                clingo_arguments. Defaults to 'auto'.
+            opt_strategy (str, optional): optimization strategy, see clingo_arguments. Defaults \
+                to 'bb'.
+        """
+        assert encoding in ['normal', 'advanced']
+        self.products = products
+
+        # The instance atoms are only defined in the backend and thus unknown to the parser
+        self.ctl = clingo.Control(['--warn=no-atom-undefined'] + clingo_arguments(threads,
+            parallel_mode, configuration, opt_strategy))
+        self.ctl.load(PO_ENCODING)
+        if encoding == 'normal':
+            self.ctl.load(NORMAL_OPT_ENCODING)
+        else:
+            self.ctl.load(ADVANCED_OPT_ENCODING)
+        with clingo.ast.ProgramBuilder(self.ctl) as builder:
+            for level in range(1, len(CONSTRAINT_ENCODINGS) + 1):
+                add_constraint_part(builder, level)
+        add_lp_instance(self.ctl, products, arcs=arcs)
+
+        self.observer = PriorityObserver()
+        self.ctl.register_observer(self.observer)
+        self.priorities : Dict[int, Set[int]] = {}
+        self._ground(0, [('base', []), ('c1', [])])
+        # The part of constraint 1 is grounded with the base program, but switched on separately
+        self.priorities[1] = set()
+
+    def _ground(self, level : int, parts : Sequence[Tuple[str, Sequence[clingo.Symbol]]]) -> None:
+        """Auxiliary function for grounding program parts and recording the priorities of their
+        weak constraints
+
+        Args:
+            level (int): number of the constraint; 0 for the base program
+            parts (Sequence[Tuple[str, Sequence[clingo.Symbol]]]): program parts
+        """
+        self.observer.priorities = set()
+        self.ctl.ground(parts)
+        self.priorities[level] = self.observer.priorities
+
+    def solve(self, consider_constraints : Union[None, int] = None,
+              deadline : Union[Deadline, None] = None) \
+        -> Tuple[int, List[str], Dict[str, Any], bool]:
+        """Computing the Product Ordering problem for an option of considered constraints
+
+        Args:
+            consider_constraints (Union[None, int], optional): Indicating which constraints are \
+                taken into account. For 0 no additional constraints are considered, for None all \
+                are considered. Defaults to None.
+            deadline (Union[Deadline, None], optional): deadline of this solve call including \
+                the grounding of the constraints. If None, the time limit starts now. Defaults \
+                to None.
+
+        Returns:
+            Tuple[int, List[str], Dict[str, Any], bool]: objective value, optimal product order, \
+                dictionary of clingo statistics of this solve call, flag for timeout occurred; \
+                as for run_clingo, the best order found so far is returned at the time limit
+        """
+        if deadline is None:
+            deadline = Deadline()
+        levels = len(CONSTRAINT_ENCODINGS)
+        if consider_constraints is not None:
+            levels = min(consider_constraints, levels)
+        for level in range(2, levels + 1):
+            if level not in self.priorities:
+                self._ground(level, [(f'c{level}', [])])
+        for level in self.priorities:
+            if level > 0:
+                self.ctl.assign_external(_active(level), level <= levels)
+
+        modelHelper = ModelHelper()
+        solve_with_deadline(self.ctl, modelHelper, deadline)
+
+        if modelHelper.symbols is None:
+            if not modelHelper.exhausted:
+                LOGGER.info('The time limit is exceeded.')
+                return -1, [], {}, True
+            LOGGER.info('The problem does not have an optimal solution.')
+            return -1, [], {}, False
+
+        if not modelHelper.exhausted:
+            LOGGER.info('The time limit is exceeded, the best order found so far is returned.')
+
+        order = interpret_clingo(modelHelper.symbols)
+        assert len(order) == len(self.products)
+
+        priority = max(set().union(*[priorities for level, priorities \
+            in self.priorities.items() if level <= levels]))
+        assert modelHelper.priorities is not None and modelHelper.costs is not None
+        opt_value = dict(zip(modelHelper.priorities, modelHelper.costs))[priority]
+
+        stats = get_statistics(self.ctl)
+        stats['ProvenOptimal'] = modelHelper.optimal
+        stats['Trajectory'] = modelHelper.get_trajectory(priority)
+
+        return opt_value, order, stats, not modelHelper.exhausted
+
+def run_clingo_levels(products : Set[str], levels : Iterable[Union[None, int]] = (0, 1, 2, 3, 4),
+                      encoding : str = 'advanced', arcs : Union[ArcList, None] = None,
+                      **kwargs : Any) \
+    -> Dict[Union[None, int], Tuple[int, List[str], Dict[str, Any], bool]]:
+    """Computing the Product Ordering problem as a logic program for several options of
+    considered constraints in one session, see ClingoSession
+
+    Args:
+        products (Set[str]): set of products
+        levels (Iterable[Union[None, int]], optional): options of considered constraints. For 0 \
+            no additional constraints are considered, for None all are considered. Defaults to \
+            (0, 1, 2, 3, 4).
+        encoding (str): usage of normal or advanced encoding for optimization directive. Defaults \
+            to 'advanced'.
+        arcs (Union[ArcList, None], optional): feasible changeovers of the instance. If None, \
+            they are built from the catalog. Defaults to None.
+        kwargs (Any): solver options passed to ClingoSession
+
+    Returns:
+        Dict[Union[None, int], Tuple[int, List[str], Dict[str, Any], bool]]: result of \
+            run_clingo per option of considered constraints
+    """
+    session = ClingoSession(products, encoding, arcs, **kwargs)
+    return {consider_constraints: session.solve(consider_constraints) \
+        for consider_constraints in levels}
@@ -3,13 +3,13 @@ Modelling as PDDL instance and solving it with an optimizing PDDL solver
 """
 from typing import *
 import logging
-import subprocess
 import re
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
-from constants.constants import DOMAIN_PDDL, FAST_DOWNWARD_EXE, PROJECT_FOLDER, INSTANCES_FOLDER, TIMEOUT
+from constants.constants import DOMAIN_PDDL, FAST_DOWNWARD_EXE, PROJECT_FOLDER, INSTANCES_FOLDER
 sys.path.append(PROJECT_FOLDER)
+from src.experiment.utils import run_process, Deadline
 from src.pddl.modeler.modeler import Modeler
 
 LOGGER = logging.getLogger('experiment')
@@ -56,7 +56,30 @@ def interpret_sas_plan(cmd_output : str) -> Tuple[int, List[str]]:
 
     return opt_value, order
 
-def run_fast_downward(products : Set[str], run : int) -> Tuple[int, List[str], bool]:
+def interpret_sas_plans(lines : List[Tuple[float, str]]) -> List[Tuple[float, int, List[str]]]:
+    """Splitting the output of Fast Downward into the plans found, each ending with its cost, and
+    interpreting them; the anytime configurations print every improving plan
+
+    Args:
+        lines (List[Tuple[float, str]]): lines of the output of Fast Downward with the elapsed time
+
+    Returns:
+        List[Tuple[float, int, List[str]]]: elapsed time, objective value and product order per \
+            plan
+    """
+    plans = []
+    plan_lines : List[str] = []
+    for elapsed, line in lines:
+        plan_lines.append(line)
+        if line.startswith('Plan cost:'):
+            opt_value, order = interpret_sas_plan('\n'.join(plan_lines))
+            plans.append((elapsed, opt_value, order))
+            plan_lines = []
+    return plans
+
+def run_fast_downward(products : Set[str], run : int, alias : str = 'seq-opt-lmcut',
+                      deadline : Union[Deadline, None] = None) \
+    -> Tuple[int, List[str], Dict[str, Any], bool]:
     """Computing the Product Ordering problem with the help of an optimizing PDDL solver. This
     solver is named Delphi1 and is taken from the website of IPC2018. It extends the common Fast
     Downward planner such that it can handle action costs and is thus optimizing.
@@ -64,11 +87,20 @@ def run_fast_downward(products : Set[str], run : int) -> Tuple[int, List[str], b
     Args:
         products (Set[str]): set of products
         run (int): id of run
+        alias (str, optional): configuration of Fast Downward; the optimal ones start with \
+            'seq-opt', whereas anytime ones like 'seq-sat-lama-2011' improve their plans until \
+            the time limit. Defaults to 'seq-opt-lmcut'.
+        deadline (Union[Deadline, None], optional): deadline of the computation, at which Fast \
+            Downward is killed. If None, the time limit starts now. Defaults to None.
 
     Returns:
-        Tuple[int, List[str], bool]: objective value, optimal product order, flag for timeout \
-            occurred
+        Tuple[int, List[str], Dict[str, Any], bool]: objective value, optimal product order, \
+            dictionary with the flag whether the order is proven optimal and the trajectory of \
+            the elapsed time and costs of the plans found, flag for timeout occurred; if the \
+            time limit is exceeded, the best plan found so far is returned
     """
+    if deadline is None:
+        deadline = Deadline()
     pddl_filename = os.path.join(INSTANCES_FOLDER, 'pddl', f'instance_{len(products)}_{run}.pddl')
     plan_filename = os.path.join(INSTANCES_FOLDER, 'pddl', f'instance_{len(products)}_{run}.plan')
 
@@ -81,18 +113,25 @@ def run_fast_downward(products : Set[str], run : int) -> Tuple[int, List[str], b
     if not os.path.isdir(wd):
         os.mkdir(wd)
     
-    try:
-        args = [FAST_DOWNWARD_EXE, '--alias', 'seq-opt-lmcut', '--build', 'release64dynamic',
-            DOMAIN_PDDL, pddl_filename]
-        process = subprocess.run(args, capture_output=True, text=True, cwd=wd, timeout=TIMEOUT)
-        cmd_output = process.stdout
-    except subprocess.TimeoutExpired:
-        LOGGER.info('The time limit is exceeded.')
-        return -1, [], True
-    
+    args = [FAST_DOWNWARD_EXE, '--alias', alias, '--build', 'release64dynamic',
+        DOMAIN_PDDL, pddl_filename]
+    lines, timeout = run_process(args, deadline.remaining(), cwd=wd)
+    cmd_output = '\n'.join(line for _, line in lines)
+
     with open(plan_filename, 'w') as filehandle:
         filehandle.write(cmd_output)
-        
-    opt_value, order = interpret_sas_plan(cmd_output)
-    
-    return opt_value, order, False
+
+    plans = interpret_sas_plans(lines)
+    stats : Dict[str, Any] = {'ProvenOptimal': False,
+                              'Trajectory': [(elapsed, opt_value) for elapsed, opt_value, _ in plans]}
+    if len(plans) == 0:
+        LOGGER.info('The time limit is exceeded or there is no plan.')
+        return -1, [], stats, timeout
+
+    if timeout:
+        LOGGER.info('The time limit is exceeded, the best plan found so far is returned.')
+
+    _, opt_value, order = min(plans, key=lambda plan: plan[1])
+    stats['ProvenOptimal'] = not timeout and alias.startswith('seq-opt')
+
+    return opt_value, order, stats, timeout
@@ -3,23 +3,22 @@ Interpretation of problem instance as TSP and usage of the TSP solver Concorde
 """
 from typing import *
 import logging
-import subprocess
-import time
+import re
 import os
 import sys
-import pandas as pd
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
-from constants.constants import PRODUCT_PROPERTIES, CONCORDE_EXE, PROJECT_FOLDER, \
-    INSTANCES_FOLDER, TIMEOUT, INF
+from constants.constants import CONCORDE_EXE, PROJECT_FOLDER, INSTANCES_FOLDER, INF
+from catalog.catalog import ProductCatalog, get_catalog
 sys.path.append(PROJECT_FOLDER)
-from src.experiment.utils import get_changeover_matrix, create_tsp_instance, \
-    interpret_tsp_solution, transform_symmetric
+from src.experiment.utils import build_changeover_matrices, create_tsp_instance, \
+    interpret_tsp_solution, transform_symmetric, symmetric_summand, run_process, Deadline
+from catalog.arcs import ArcList
 
 LOGGER = logging.getLogger('experiment')
 
 def build_graph(products : Set[str], start : Union[str, None] = None, \
     end : Union[str, None] = None, cyclic : bool = False,
-    consider_constraints : Union[None, int] = None) \
+    consider_constraints : Union[None, int] = None, catalog : Union[ProductCatalog, None] = None) \
     -> Union[List[Dict[str, Dict[str, int]]], Dict[str, Dict[str, int]]]:
     """Building a graph instance for the given changeover matrix, whereas only the products in
     the given set are taken into account, such that the graph instance won't be bigger than
@@ -48,14 +47,20 @@ def build_graph(products : Set[str], start : Union[str, None] = None, \
         consider_constraints (Union[None, int], optional): Indicating which constraints are taken \
             into account. For 0 no additional constraints are considered, for None all are \
             considered. Defaults to None.
+        catalog (Union[ProductCatalog, None], optional): product catalog. If None, the catalog \
+            of this process is used. Defaults to None.
 
     Returns:
         Dict[str, Dict[str, int]]: graph instance
     """
     assert start is None or start in products
     assert end is None or end in products
-    df_matrix, campaigns_order = get_changeover_matrix(products, consider_constraints)
-    df_properties = pd.read_csv(PRODUCT_PROPERTIES, dtype={'Product': str}).set_index('Product')
+    if catalog is None:
+        catalog = get_catalog()
+    products_list = list(products)
+    matrix, campaigns_order = \
+        build_changeover_matrices(products_list, [consider_constraints], catalog)[consider_constraints]
+    arcs = ArcList.from_matrix(products_list, matrix)
 
     if consider_constraints is not None and consider_constraints >= 4:
         LOGGER.error('These constraints haven\'t been implemented yet!')
@@ -63,10 +68,8 @@ def build_graph(products : Set[str], start : Union[str, None] = None, \
     edge_weights : Dict[str, Dict[str, int]] = {}
     for product1 in products:
         edge_weights[product1] = {}
-        for product2 in products:
-            distance = df_matrix.at[product1, product2]
-            if distance < INF:
-                edge_weights[product1][product2] = distance
+    for product1, product2, distance in arcs.items():
+        edge_weights[product1][product2] = distance
 
     if cyclic:
         edge_weights['v'] = {}
@@ -76,7 +79,7 @@ def build_graph(products : Set[str], start : Union[str, None] = None, \
 
     if start is None:
         for product in products:
-            campaign_order = campaigns_order[df_properties.at[product, 'Campaign']]
+            campaign_order = campaigns_order[catalog.campaign[catalog.index[product]]]
             if not (consider_constraints is None or consider_constraints >= 1) \
                 or campaign_order == 0:
                 if cyclic:
@@ -85,7 +88,7 @@ def build_graph(products : Set[str], start : Union[str, None] = None, \
                     edge_weights['start'][product] = 0
     else:
         if consider_constraints is None or consider_constraints >= 1:
-            campaign_order = campaigns_order[df_properties.at[start, 'Campaign']]
+            campaign_order = campaigns_order[catalog.campaign[catalog.index[start]]]
             assert campaign_order == 0
         if cyclic:
             edge_weights['v'][start] = 0
@@ -95,7 +98,7 @@ def build_graph(products : Set[str], start : Union[str, None] = None, \
     max_campaign = max([value for _, value in campaigns_order.items()])
     if end is None:
         for product in products:
-            campaign_order = campaigns_order[df_properties.at[product, 'Campaign']]
+            campaign_order = campaigns_order[catalog.campaign[catalog.index[product]]]
             if not (consider_constraints is None or consider_constraints >= 1) \
                 or campaign_order == max_campaign:
                 if cyclic:
@@ -104,7 +107,7 @@ def build_graph(products : Set[str], start : Union[str, None] = None, \
                     edge_weights[product]['end'] = 0
     else:
         if consider_constraints is None or consider_constraints >= 1:
-            campaign_order = campaigns_order[df_properties.at[end, 'Campaign']]
+            campaign_order = campaigns_order[catalog.campaign[catalog.index[end]]]
             assert campaign_order == max_campaign
         if cyclic:
             edge_weights[end]['v'] = 0
@@ -113,8 +116,35 @@ def build_graph(products : Set[str], start : Union[str, None] = None, \
 
     return edge_weights
 
-def run_concorde(products : Set[str], run : int, consider_constraints : Union[None, int] = None) \
-    -> Tuple[List[str], bool]:
+def interpret_concorde_bounds(lines : List[Tuple[float, str]], offset : int) \
+    -> List[Tuple[float, int]]:
+    """Parsing the upper bounds printed by the concorde tsp solver, i.e. the costs of the best
+    tours found so far
+
+    Args:
+        lines (List[Tuple[float, str]]): lines of the output of concorde with the elapsed time
+        offset (int): difference of the costs of a tour in the symmetric and the asymmetric graph
+
+    Returns:
+        List[Tuple[float, int]]: trajectory of the elapsed time and costs of the improving tours
+    """
+    pattern_bound = re.compile(r'.*(?:upperbound|upper bound)\D*(\d+(?:\.\d+)?)', re.IGNORECASE)
+
+    trajectory : List[Tuple[float, int]] = []
+    for elapsed, line in lines:
+        result_bound = pattern_bound.match(line)
+        if result_bound:
+            cost = round(float(result_bound.group(1))) - offset
+            # Tours using missing changeovers are no orders
+            if cost >= INF:
+                continue
+            if len(trajectory) == 0 or cost < trajectory[-1][1]:
+                trajectory.append((elapsed, cost))
+    return trajectory
+
+def run_concorde(products : Set[str], run : int, consider_constraints : Union[None, int] = None,
+                 deadline : Union[Deadline, None] = None) \
+    -> Tuple[List[str], Dict[str, Any], bool]:
     """Computing the Product Ordering problem using the concorde tsp solver. Therefore it's
     necessary to transform the asymmetric problem instance to a symmetric one, and save the
     instance in the tsplib95 format.
@@ -125,13 +155,20 @@ def run_concorde(products : Set[str], run : int, consider_constraints : Union[No
         consider_constraints (Union[None, int], optional): Indicating which constraints are taken \
             into account. For 0 no additional constraints are considered, for None all are \
             considered. Defaults to None.
+        deadline (Union[Deadline, None], optional): deadline of the computation, at which \
+            concorde is killed. If None, the time limit starts now. Defaults to None.
 
     Returns:
-        Tuple[List[str], bool]: optimal product order, flag for timeout occurred
+        Tuple[List[str], Dict[str, Any], bool]: optimal product order, dictionary with the flag \
+            whether the order is proven optimal and the trajectory of the elapsed time and costs \
+            of the improving tours, flag for timeout occurred; concorde writes the tour only at \
+            its end, hence no order is returned, if the time limit is exceeded
     """
+    if deadline is None:
+        deadline = Deadline()
     edge_weights = build_graph(products, cyclic=True, consider_constraints=consider_constraints)
+    assert isinstance(edge_weights, dict)
 
-    start_time = time.time()
     sym_edge_weights = transform_symmetric(edge_weights)
     instance, products_list = create_tsp_instance(sym_edge_weights)
 
@@ -141,15 +178,16 @@ def run_concorde(products : Set[str], run : int, consider_constraints : Union[No
 
     filename_sol = os.path.join(INSTANCES_FOLDER, 'tsp', f'instance_{len(products)}_{run}.sol')
 
-    try:
-        args = [CONCORDE_EXE, '-f', '-x', '-o', filename_sol, filename_tsp]
-        subprocess.run(args, capture_output=True, text=True, \
-            timeout=TIMEOUT - time.time() + start_time)
-    except subprocess.TimeoutExpired:
+    args = [CONCORDE_EXE, '-f', '-x', '-o', filename_sol, filename_tsp]
+    lines, timeout = run_process(args, deadline.remaining())
+    offset = len(edge_weights) * symmetric_summand(edge_weights)
+    stats : Dict[str, Any] = {'ProvenOptimal': not timeout,
+                              'Trajectory': interpret_concorde_bounds(lines, offset)}
+    if timeout:
         LOGGER.info('The time limit is exceeded.')
-        return [], True
+        return [], stats, True
 
     assert os.path.exists(filename_sol)
     order = interpret_tsp_solution(filename_sol, products_list)
 
-    return order, False
+    return order, stats, False
@@ -2,11 +2,19 @@
 Ordering problem. These approaches are:
 - Using the Answer Set Planning approach
 - Transforming the Product Ordering problem instance into a TSP instance
+    - Using branch and bound directly on the asymmetric instance
     - Using the perfect TSP encoding
     - Using the bad TSP encoding
     - Using the perfect TSP encoding, but computing the problem sequentially for each
     combination of start and end product
-- Using the ILP approach
+- Using the ILP approach with the subtour elimination for all subsets, Miller-Tucker-Zemlin,
+single-commodity flow or time-staged constraints, or with lazily added subtour constraints;
+solved by CPLEX or HiGHS
+- Using the Held-Karp dynamic programming approach
+- Using the A* search approach
+- Using the constraint programming approach with the circuit constraint of CP-SAT
+- Using the campaign decomposition approach
+- Using the anytime local search approach
 """
 from typing import *
 import logging
@@ -16,23 +24,30 @@ import time
 import os
 import sys
 from joblib import Parallel, delayed
-import pandas as pd
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 from approaches.logic_program import run_clingo
 from approaches.tsp_solver import run_concorde
+from approaches.bnb import run_branch_and_bound
 from approaches.asp import run_asp
-from approaches.ilp import run_ilp
+from approaches.ilp import BACKENDS, run_ilp
 from approaches.pddl_solver import run_fast_downward
-from utils import setup_logger, calculate_oct
+from approaches.held_karp import run_held_karp
+from approaches.astar import run_astar
+from approaches.cpsat import run_cpsat
+from approaches.decomposition import run_decomposition, reduce_arcs
+from approaches.local_search import BUDGET, run_local_search
+from utils import Deadline, setup_logger, calculate_oct
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from constants.constants import CHANGEOVER_MATRIX, INSTANCES_FOLDER, RESULTS_FILE
+from constants.constants import INSTANCES_FOLDER, RESULTS_FILE
+from catalog.catalog import ProductCatalog, get_catalog, compile_snapshot
 
 LOGGER = logging.getLogger('experiment')
 
 # Dict of flags for timeouts occurred
 timeouts : Dict[Union[None, int], Dict[str, Dict[int, bool]]] = {}
 
-def select_random_set_of_product(sample_size : int, run : int) -> Set[str]:
+def select_random_set_of_product(sample_size : int, run : int,
+                                 catalog : Union[ProductCatalog, None] = None) -> Set[str]:
     """Auxiliary function for selecting a random set of n products out of all products in the
     changeover matrix; with the help of the run id, the random selection becomes reproducible,
     because with the help of the run id a seed for the selection is generated
@@ -40,12 +55,15 @@ def select_random_set_of_product(sample_size : int, run : int) -> Set[str]:
     Args:
         sample_size (int): number of products in sample
         run (int): id of run
+        catalog (Union[ProductCatalog, None], optional): product catalog. If None, the catalog \
+            of this process is used. Defaults to None.
 
     Returns:
         Set[str]: set of products
     """
-    df_matrix = pd.read_csv(CHANGEOVER_MATRIX, dtype={'Product': str}).set_index('Product')
-    products = list(df_matrix.index)
+    if catalog is None:
+        catalog = get_catalog()
+    products = list(catalog.products)
     random.seed(42)
     seed = random.randint(run * 100 + 1, (run + 1) * 100)
     random.seed(seed)
@@ -53,10 +71,13 @@ def select_random_set_of_product(sample_size : int, run : int) -> Set[str]:
     return samples
 
 def run_experiment(sample_size : int, run : int, approach : str, \
-    consider_constraints : Union[None, int] = None) -> None:
+    consider_constraints : Union[None, int] = None, preprocess : bool = False,
+    warm_start : bool = False, threads : int = 1, parallel_mode : str = 'compete',
+    configuration : str = 'auto', opt_strategy : str = 'bb') -> None:
     """Run an experiment instance for the given input, which is independent from the other
     instances and can be runned in parallel. The result of the experiment is then just appended
-    to the results file
+    to the results file. The time limit covers the preprocessing and the computation of the
+    approach together
 
     Args:
         sample_size (int): number of products
@@ -65,13 +86,34 @@ def run_experiment(sample_size : int, run : int, approach : str, \
         consider_constraints (Union[None, int], optional): Indicating which constraints are taken \
             into account. For 0 no additional constraints are considered, for None all are \
             considered. Defaults to None.
+        preprocess (bool, optional): reduce the changeovers of the instance with the campaign \
+            decomposition before computing it with the logic program or ILP approaches; only \
+            applied, if exactly the campaigns order is considered. Defaults to False.
+        warm_start (bool, optional): start the logic program and ILP approaches with a \
+            heuristically constructed order. Defaults to False.
+        threads (int, optional): number of solver threads of the logic program and ASP \
+            approaches. Defaults to 1.
+        parallel_mode (str, optional): mode of the parallel solving of clingo, 'compete' or \
+            'split'. Defaults to 'compete'.
+        configuration (str, optional): configuration or portfolio of clasp. Defaults to 'auto'.
+        opt_strategy (str, optional): optimization strategy of clasp. Defaults to 'bb'.
     """
     setup_logger()
 
     LOGGER.info('run_experiment(%s, %s, %s, %s) started', sample_size, run, approach, \
         consider_constraints)
-    products = select_random_set_of_product(sample_size, run)
+    catalog = get_catalog()
+    products = select_random_set_of_product(sample_size, run, catalog)
     LOGGER.debug('product samples: %s', str(products))
+    deadline = Deadline()
+
+    arcs = None
+    preprocess_time = 0.0
+    if preprocess and consider_constraints == 1:
+        preprocess_time = time.time()
+        arcs = reduce_arcs(products, catalog=catalog, deadline=deadline)
+        preprocess_time = time.time() - preprocess_time
+        LOGGER.debug('%d changeovers left after preprocessing', len(arcs))
 
     result : Dict[str, Any] = {
         'Time': math.nan,
@@ -91,81 +133,212 @@ def run_experiment(sample_size : int, run : int, approach : str, \
         },
         'Variables': math.nan,
         'Constraints': math.nan,
+        'BuildTime': math.nan,
+        'SolveTime': math.nan,
+        'Iterations': math.nan,
+        'Cuts': math.nan,
+        'Threads': math.nan,
+        'ParallelMode': math.nan,
+        'ProvenOptimal': math.nan,
+        'Trajectory': [],
         'Order': [],
-        'Timeout': False
+        'Timeout': False,
+        'SearchStats': {
+            'Expanded': math.nan,
+            'ExpandedPerSecond': math.nan,
+            'Frontier': math.nan
+        }
     }
 
     if approach == 'lp_normal':
         temp = time.time()
         opt_value, order, stats, timeout = run_clingo(products, run, encoding='normal', \
-            consider_constraints=consider_constraints)
+            consider_constraints=consider_constraints, arcs=arcs, warm_start=warm_start, \
+            threads=threads, parallel_mode=parallel_mode, configuration=configuration, \
+            opt_strategy=opt_strategy, deadline=deadline)
         temp = time.time() - temp
         result['Time'] = temp
         result['OptValue'] = opt_value
-        result['C'] = calculate_oct(order)
-        if not timeout:
+        result['C'] = calculate_oct(order, catalog=catalog)
+        if len(stats) > 0:
             result['ClingoStats'] = stats
+            result['ProvenOptimal'] = stats['ProvenOptimal']
+            result['Trajectory'] = stats['Trajectory']
         result['Order'] = order
         result['Timeout'] = timeout
 
     elif approach == 'lp_advanced':
         temp = time.time()
         opt_value, order, stats, timeout = run_clingo(products, run, encoding='advanced', \
-            consider_constraints=consider_constraints)
+            consider_constraints=consider_constraints, arcs=arcs, warm_start=warm_start, \
+            threads=threads, parallel_mode=parallel_mode, configuration=configuration, \
+            opt_strategy=opt_strategy, deadline=deadline)
         temp = time.time() - temp
         result['Time'] = temp
         result['OptValue'] = opt_value
-        result['C'] = calculate_oct(order)
-        if not timeout:
+        result['C'] = calculate_oct(order, catalog=catalog)
+        if len(stats) > 0:
             result['ClingoStats'] = stats
+            result['ProvenOptimal'] = stats['ProvenOptimal']
+            result['Trajectory'] = stats['Trajectory']
         result['Order'] = order
         result['Timeout'] = timeout
 
     elif approach == 'tsp':
         temp = time.time()
-        order, timeout = run_concorde(products, run, consider_constraints)
+        order, stats, timeout = run_concorde(products, run, consider_constraints, deadline=deadline)
+        temp = time.time() - temp
+        result['Time'] = temp
+        result['C'] = calculate_oct(order, catalog=catalog)
+        result['ProvenOptimal'] = stats['ProvenOptimal']
+        result['Trajectory'] = stats['Trajectory']
+        result['Order'] = order
+        result['Timeout'] = timeout
+
+    elif approach == 'bnb':
+        temp = time.time()
+        opt_value, order, stats, timeout = run_branch_and_bound(products, consider_constraints, \
+            catalog=catalog, deadline=deadline)
         temp = time.time() - temp
         result['Time'] = temp
-        result['C'] = calculate_oct(order)
+        result['OptValue'] = opt_value
+        result['C'] = calculate_oct(order, catalog=catalog)
+        result['ProvenOptimal'] = stats['ProvenOptimal']
+        result['Trajectory'] = stats['Trajectory']
         result['Order'] = order
         result['Timeout'] = timeout
 
     elif approach == 'pddl':
         temp = time.time()
-        opt_value, order, timeout = run_fast_downward(products, run)
+        opt_value, order, stats, timeout = run_fast_downward(products, run, deadline=deadline)
         temp = time.time() - temp
         result['Time'] = temp
         result['OptValue'] = opt_value
-        result['C'] = calculate_oct(order)
+        result['C'] = calculate_oct(order, catalog=catalog)
+        result['ProvenOptimal'] = stats['ProvenOptimal']
+        result['Trajectory'] = stats['Trajectory']
         result['Order'] = order
         result['Timeout'] = timeout
 
-    elif approach == 'ilp':
+    elif approach == 'ilp' or approach.startswith('ilp_'):
+        # The approach is named ilp[_<backend>][_<formulation>]
+        variant = approach[len('ilp_'):]
+        backend = 'cplex'
+        for name in BACKENDS:
+            if variant == name or variant.startswith(name + '_'):
+                backend = name
+                variant = variant[len(name) + 1:]
+        formulation = variant if variant != '' else 'subsets'
         temp = time.time()
-        order, num_variables, num_constraints, timeout = run_ilp(products, consider_constraints)
+        order, stats, timeout = run_ilp(products, consider_constraints, arcs, warm_start, \
+            formulation, backend, deadline=deadline)
         temp = time.time() - temp
         result['Time'] = temp
-        result['C'] = calculate_oct(order)
-        result['Variables'] = num_variables
-        result['Constraints'] = num_constraints
+        result['C'] = calculate_oct(order, catalog=catalog)
+        result['Variables'] = stats['Variables']
+        result['Constraints'] = stats['Constraints']
+        result['BuildTime'] = stats['BuildTime']
+        result['SolveTime'] = stats['SolveTime']
+        result['Iterations'] = stats['Iterations']
+        result['Cuts'] = stats['Cuts']
+        result['ProvenOptimal'] = stats['ProvenOptimal']
+        result['Trajectory'] = stats['Trajectory']
         result['Order'] = order
         result['Timeout'] = timeout
 
-    elif approach == 'asp':
+    elif approach in ['asp', 'asp_incremental']:
         temp = time.time()
-        opt_value, order, stats, timeout = run_asp(products, run)
+        opt_value, order, stats, timeout = run_asp(products, run, threads=threads, \
+            parallel_mode=parallel_mode, configuration=configuration, opt_strategy=opt_strategy, \
+            incremental=approach == 'asp_incremental', deadline=deadline)
         temp = time.time() - temp
         result['Time'] = temp
         result['OptValue'] = opt_value
-        result['C'] = calculate_oct(order)
-        if not timeout:
+        result['C'] = calculate_oct(order, catalog=catalog)
+        if len(stats) > 0:
             result['ClingoStats'] = stats
+            result['ProvenOptimal'] = stats['ProvenOptimal']
+            result['Trajectory'] = stats['Trajectory']
         result['Order'] = order
         result['Timeout'] = timeout
 
+    elif approach == 'held_karp':
+        temp = time.time()
+        opt_value, order, timeout = run_held_karp(products, consider_constraints, catalog=catalog, \
+            deadline=deadline)
+        temp = time.time() - temp
+        result['Time'] = temp
+        result['OptValue'] = opt_value
+        result['C'] = calculate_oct(order, catalog=catalog)
+        result['Order'] = order
+        result['Timeout'] = timeout
+
+    elif approach == 'astar':
+        temp = time.time()
+        opt_value, order, stats, timeout = run_astar(products, consider_constraints, \
+            catalog=catalog, deadline=deadline)
+        temp = time.time() - temp
+        result['Time'] = temp
+        result['OptValue'] = opt_value
+        result['C'] = calculate_oct(order, catalog=catalog)
+        result['SearchStats'] = stats
+        result['Order'] = order
+        result['Timeout'] = timeout
+
+    elif approach == 'cpsat':
+        temp = time.time()
+        opt_value, order, stats, timeout = run_cpsat(products, consider_constraints, \
+            catalog=catalog, deadline=deadline)
+        temp = time.time() - temp
+        result['Time'] = temp
+        result['OptValue'] = opt_value
+        result['C'] = calculate_oct(order, catalog=catalog)
+        result['Variables'] = stats['Variables']
+        result['Constraints'] = stats['Constraints']
+        result['BuildTime'] = stats['BuildTime']
+        result['SolveTime'] = stats['SolveTime']
+        result['ProvenOptimal'] = stats['ProvenOptimal']
+        result['Trajectory'] = stats['Trajectory']
+        result['Order'] = order
+        result['Timeout'] = timeout
+
+    elif approach == 'decomposition':
+        temp = time.time()
+        opt_value, order, timeout = run_decomposition(products, consider_constraints, \
+            catalog=catalog, deadline=deadline)
+        temp = time.time() - temp
+        result['Time'] = temp
+        result['OptValue'] = opt_value
+        result['C'] = calculate_oct(order, catalog=catalog)
+        result['Order'] = order
+        result['Timeout'] = timeout
+
+    elif approach == 'local_search':
+        temp = time.time()
+        changeover_time, order, trajectory = run_local_search(products, consider_constraints, \
+            budget=min(BUDGET, deadline.remaining()), catalog=catalog)
+        temp = time.time() - temp
+        result['Time'] = temp
+        result['OptValue'] = trajectory[-1][1]
+        result['C'] = changeover_time
+        result['ProvenOptimal'] = False
+        result['Trajectory'] = trajectory
+        result['Order'] = order
+
     else:
         LOGGER.info('Approach %s is unknown', approach)
 
+    if approach in ['lp_normal', 'lp_advanced', 'asp', 'asp_incremental']:
+        result['Threads'] = threads
+        result['ParallelMode'] = parallel_mode
+
+    if approach in ['held_karp', 'astar']:
+        # Without incumbents, the exact approaches either prove the optimality or time out
+        result['ProvenOptimal'] = not result['Timeout'] and len(result['Order']) > 0
+
+    if arcs is not None:
+        result['Time'] += preprocess_time
+
     timeouts[consider_constraints][approach][sample_size] = \
         timeouts[consider_constraints][approach][sample_size] and result['Timeout']
 
@@ -192,7 +365,18 @@ def run_experiment(sample_size : int, run : int, approach : str, \
                 str(result['Variables']),
                 str(result['Constraints']),
                 str(' '.join(result['Order'])),
-                str(result['Timeout'])
+                str(result['Timeout']),
+                str(result['SearchStats']['Expanded']),
+                str(result['SearchStats']['ExpandedPerSecond']),
+                str(result['SearchStats']['Frontier']),
+                str(result['BuildTime']),
+                str(result['Iterations']),
+                str(result['Cuts']),
+                str(result['SolveTime']),
+                str(result['Threads']),
+                str(result['ParallelMode']),
+                str(result['ProvenOptimal']),
+                str(' '.join(f'{elapsed:.3f}:{cost}' for elapsed, cost in result['Trajectory']))
             ])
         ))
 
@@ -207,9 +391,23 @@ if __name__ == '__main__':
         # 'lp_normal',
         # 'lp_advanced',
         'tsp',
+        # 'bnb',
         # 'pddl',
         # 'ilp',
+        # 'ilp_mtz',
+        # 'ilp_scf',
+        # 'ilp_time_staged',
+        # 'ilp_lazy',
+        # 'ilp_highs',
+        # 'ilp_highs_mtz',
+        # 'ilp_highs_lazy',
         # 'asp',
+        # 'asp_incremental',
+        # 'held_karp',
+        # 'astar',
+        # 'cpsat',
+        # 'decomposition',
+        # 'local_search',
     ]
 
     # Make and clean instances folders
@@ -229,9 +427,14 @@ if __name__ == '__main__':
                 else:
                     os.remove(os.path.join(folder, file))
 
+    # Compile the catalog snapshot once, such that all workers map the same files read-only
+    compile_snapshot()
+
     numProducts = [6] # list(range(6, 72, 1))
     runs = [0] # list(range(4))
     consider_constraints_options = [3] # [0, 1, 2, 3, 4]
+    # The cores are shared by the parallel runs, whose logic programs are solved multi-threaded
+    threads = max(1, (os.cpu_count() or 1) // len(runs))
 
     for consider_constraints in consider_constraints_options:
         timeouts[consider_constraints] = {}
@@ -240,8 +443,8 @@ if __name__ == '__main__':
             for n in numProducts:
                 timeouts[consider_constraints][approach][n] = True
                 Parallel(n_jobs=-1, require='sharedmem') \
-                    (delayed(run_experiment)(n, run, approach, consider_constraints) \
-                    for run in runs)
+                    (delayed(run_experiment)(n, run, approach, consider_constraints, \
+                    threads=threads) for run in runs)
                 if timeouts[consider_constraints][approach][n]:
                     LOGGER.info('All %d runs for approach %s and the considered constraints ' + \
                         'option %s exceeded the time limit; the sample size %d won\'t be ' + \
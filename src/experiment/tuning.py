@@ -0,0 +1,201 @@
+"""Tuning of the clingo configuration for the logic program and ASP approaches. A set of candidate
+configurations of clasp is raced over a training set of product samples with a short time budget:
+after every sample, the candidates, which are clearly slower than the best one so far, are
+eliminated. The winner per approach, considered constraints option and sample size is written
+into the table of tuned configurations, from which run_clingo and run_asp take their options
+"""
+from typing import *
+import logging
+import json
+import time
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+from approaches.logic_program import run_clingo
+from approaches.asp import run_asp
+from experiment import select_random_set_of_product
+from utils import Deadline, setup_logger, load_tuned_configurations
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from constants.constants import INSTANCES_FOLDER, TUNED_CONFIGURATIONS_FILE
+from catalog.catalog import ProductCatalog, get_catalog
+
+LOGGER = logging.getLogger('experiment')
+
+# Candidate configurations of clasp; the first one are the defaults, which win ties
+CANDIDATES : List[Dict[str, str]] = [
+    {'configuration': 'auto', 'opt_strategy': 'bb'},
+    {'configuration': 'auto', 'opt_strategy': 'usc,oll'},
+    {'configuration': 'trendy', 'opt_strategy': 'usc,oll', 'opt_heuristic': 'sign'},
+    {'configuration': 'crafty', 'opt_strategy': 'bb,hier', 'opt_heuristic': 'sign'},
+    {'configuration': 'handy', 'opt_strategy': 'usc,k,4'},
+    {'configuration': 'tweety', 'opt_strategy': 'bb', 'restarts': 'L,128'},
+    {'configuration': 'jumpy', 'opt_strategy': 'bb', 'opt_heuristic': 'sign,model'},
+    {'configuration': 'frumpy', 'opt_strategy': 'usc,one,stratify', 'restarts': 'D,100,0.7'},
+]
+
+# Approaches, whose clingo configuration can be tuned
+APPROACHES = ['lp_normal', 'lp_advanced', 'asp', 'asp_incremental']
+
+# Runs of the training samples; they differ from the runs of the computational experiment
+TRAINING_RUNS = list(range(10, 15))
+
+# Time budget per candidate and training sample in seconds
+BUDGET = 10.0
+
+# Runtime penalty factor of a candidate exceeding the budget (PAR10)
+PENALTY = 10
+
+# Candidates, whose penalized runtime exceeds the best one by this factor, are eliminated
+ELIMINATION_FACTOR = 2.0
+
+# Tolerance per training sample in seconds, below which runtime differences are regarded as noise
+TOLERANCE = 0.1
+
+def evaluate(approach : str, products : Set[str], run : int,
+             consider_constraints : Union[None, int], options : Dict[str, str],
+             budget : float = BUDGET) -> Tuple[float, bool]:
+    """Computing a training sample with the given options of clasp
+
+    Args:
+        approach (str): solving approach, i.e. 'lp_normal', 'lp_advanced', 'asp' or \
+            'asp_incremental'
+        products (Set[str]): set of products
+        run (int): id of run
+        consider_constraints (Union[None, int]): Indicating which constraints are taken into \
+            account. For 0 no additional constraints are considered, for None all are considered.
+        options (Dict[str, str]): options of clasp, see clingo_arguments
+        budget (float, optional): time budget in seconds. Defaults to BUDGET.
+
+    Returns:
+        Tuple[float, bool]: elapsed time, flag for timeout occurred
+    """
+    assert approach in APPROACHES
+    start_time = time.time()
+    if approach.startswith('lp_'):
+        _, _, _, timeout = run_clingo(products, run, encoding=approach[len('lp_'):],
+                                      consider_constraints=consider_constraints, options=options,
+                                      deadline=Deadline(budget))
+    else:
+        _, _, _, timeout = run_asp(products, run, incremental=approach == 'asp_incremental',
+                                   options=options, deadline=Deadline(budget))
+    return time.time() - start_time, timeout
+
+def race(approach : str, samples : List[Tuple[int, Set[str]]],
+         consider_constraints : Union[None, int] = None,
+         candidates : List[Dict[str, str]] = CANDIDATES, budget : float = BUDGET) \
+    -> Tuple[Dict[str, str], List[float]]:
+    """Racing the candidate configurations over the training samples: every remaining candidate
+    computes the next sample, its runtime is penalized by PENALTY times the budget on timeout, and
+    the candidates, whose penalized runtime so far exceeds ELIMINATION_FACTOR times the one of the
+    best candidate plus TOLERANCE per sample, are eliminated
+
+    Args:
+        approach (str): solving approach, see evaluate
+        samples (List[Tuple[int, Set[str]]]): training samples as pairs of run and set of products
+        consider_constraints (Union[None, int], optional): Indicating which constraints are taken \
+            into account. For 0 no additional constraints are considered, for None all are \
+            considered. Defaults to None.
+        candidates (List[Dict[str, str]], optional): candidate options of clasp. Defaults to \
+            CANDIDATES.
+        budget (float, optional): time budget per candidate and sample in seconds. Defaults to \
+            BUDGET.
+
+    Returns:
+        Tuple[Dict[str, str], List[float]]: winning options, penalized runtime per candidate; \
+            infinity for the eliminated candidates
+    """
+    assert len(candidates) > 0
+    scores = [0.0] * len(candidates)
+    remaining = list(range(len(candidates)))
+    for count, (run, products) in enumerate(samples, start=1):
+        for index in remaining:
+            elapsed, timeout = evaluate(approach, products, run, consider_constraints,
+                                        candidates[index], budget)
+            scores[index] += PENALTY * budget if timeout else elapsed
+        best = min(scores[index] for index in remaining)
+        eliminated = [index for index in remaining \
+            if scores[index] > ELIMINATION_FACTOR * best + TOLERANCE * count]
+        for index in eliminated:
+            LOGGER.debug('Candidate %s eliminated after %d samples', str(candidates[index]), count)
+            scores[index] = float('inf')
+        remaining = [index for index in remaining if index not in eliminated]
+    winner = min(remaining, key=lambda index: (scores[index], index))
+    return candidates[winner], scores
+
+def store_tuned_options(approach : str, consider_constraints : Union[None, int],
+                        sample_size : int, options : Dict[str, str],
+                        filename : str = TUNED_CONFIGURATIONS_FILE) -> None:
+    """Storing the tuned options of clasp in the table of tuned configurations, keeping the other
+    entries
+
+    Args:
+        approach (str): solving approach, see evaluate
+        consider_constraints (Union[None, int]): considered constraints option
+        sample_size (int): number of products
+        options (Dict[str, str]): tuned options of clasp
+        filename (str, optional): file of the table. Defaults to TUNED_CONFIGURATIONS_FILE.
+    """
+    table = load_tuned_configurations(filename)
+    table.setdefault(approach, {}).setdefault(str(consider_constraints), {})[str(sample_size)] = \
+        options
+    with open(filename, 'w', encoding='utf-8') as filehandle:
+        json.dump(table, filehandle, indent=2, sort_keys=True)
+
+def tune(approach : str, sample_sizes : List[int], consider_constraints : Union[None, int] = None,
+         runs : List[int] = TRAINING_RUNS, candidates : List[Dict[str, str]] = CANDIDATES,
+         budget : float = BUDGET, filename : str = TUNED_CONFIGURATIONS_FILE,
+         catalog : Union[ProductCatalog, None] = None) -> Dict[int, Dict[str, str]]:
+    """Tuning the clingo configuration of an approach per sample size by racing the candidates over
+    the training samples of the given runs; the winners are stored in the table of tuned
+    configurations
+
+    Args:
+        approach (str): solving approach, see evaluate
+        sample_sizes (List[int]): numbers of products
+        consider_constraints (Union[None, int], optional): Indicating which constraints are taken \
+            into account. For 0 no additional constraints are considered, for None all are \
+            considered. The ASP approaches always consider all constraints. Defaults to None.
+        runs (List[int], optional): ids of the runs of the training samples. Defaults to \
+            TRAINING_RUNS.
+        candidates (List[Dict[str, str]], optional): candidate options of clasp. Defaults to \
+            CANDIDATES.
+        budget (float, optional): time budget per candidate and sample in seconds. Defaults to \
+            BUDGET.
+        filename (str, optional): file of the table. Defaults to TUNED_CONFIGURATIONS_FILE.
+        catalog (Union[ProductCatalog, None], optional): product catalog. If None, the catalog \
+            of this process is used. Defaults to None.
+
+    Returns:
+        Dict[int, Dict[str, str]]: tuned options of clasp per sample size
+    """
+    if catalog is None:
+        catalog = get_catalog()
+    if approach.startswith('asp'):
+        consider_constraints = None
+
+    tuned = {}
+    for sample_size in sample_sizes:
+        samples = [(run, select_random_set_of_product(sample_size, run, catalog)) for run in runs]
+        options, scores = race(approach, samples, consider_constraints, candidates, budget)
+        LOGGER.info('Tuned options for approach %s, the considered constraints option %s and ' + \
+            'sample size %d: %s (penalized runtimes %s)', approach, consider_constraints,
+            sample_size, str(options), str(scores))
+        store_tuned_options(approach, consider_constraints, sample_size, options, filename)
+        tuned[sample_size] = options
+    return tuned
+
+if __name__ == '__main__':
+    setup_logger()
+
+    # The ASP approaches write their PDDL instances into the instances folder
+    folder = os.path.join(INSTANCES_FOLDER, 'pddl')
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+
+    approaches = ['lp_advanced'] # APPROACHES
+    numProducts = [10, 20, 30] # list(range(6, 72, 6))
+    consider_constraints_options = [1, 2, 3] # [0, 1, 2, 3, 4]
+
+    for approach in approaches:
+        for consider_constraints in consider_constraints_options:
+            tune(approach, numProducts, consider_constraints)
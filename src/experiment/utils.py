@@ -2,6 +2,11 @@
 """
 from typing import *
 import logging
+import json
+import subprocess
+import threading
+import signal
+import time
 import os
 import sys
 import clingo
@@ -10,8 +15,9 @@ import numpy as np
 import tsplib95
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from constants.constants import CHANGEOVER_MATRIX, CAMPAIGNS_ORDER, PRODUCT_PROPERTIES, \
-    PRODUCT_QUANTITY, INF
+from constants.constants import INF, TIMEOUT, TUNED_CONFIGURATIONS_FILE
+from catalog.catalog import ProductCatalog, get_catalog
+from catalog.arcs import ArcList
 
 def setup_logger() -> None:
     """Auxiliary method for getting a logger, which even works in the parallelized joblib
@@ -28,59 +34,89 @@ def setup_logger() -> None:
     logger.addHandler(handler)
     logger.propagate = False
 
-def calculate_oct(order: List[str], occurences : Union[Dict[str, int], None] = None) -> int:
+def _occurences_surcharge(occurences : Union[Dict[str, int], None]) -> int:
+    """Auxiliary function for calculating the additional changeover time caused by products, which
+    appear more than once
+
+    Args:
+        occurences (Union[Dict[str, int], None]): Indicating the number of occurences per \
+            product. If None, every product appears once.
+
+    Returns:
+        int: additional changeover time
+    """
+    surcharge = 0
+    if occurences is not None:
+        for num in occurences.values():
+            assert num >= 1
+            surcharge += (num - 1) * 15
+    return surcharge
+
+def calculate_oct_batch(orders : np.ndarray, occurences : Union[Dict[str, int], None] = None,
+                        catalog : Union[ProductCatalog, None] = None) -> np.ndarray:
+    """Calculate the overall changeover times for many product orders at once, whereas the orders
+    are given as rows of product indices of the catalog
+
+    Args:
+        orders (np.ndarray): product orders as integer array of shape (number of orders, length \
+            of orders) containing catalog indices; a single order may be given as 1D array
+        occurences (Union[Dict[str, int], None], optional): Indicating the number of occurences \
+            per product, which applies to every order. If None, every product appears once. \
+            Defaults to None.
+        catalog (Union[ProductCatalog, None], optional): product catalog. If None, the catalog \
+            of this process is used. Defaults to None.
+
+    Returns:
+        np.ndarray: overall changeover time per order
+    """
+    if catalog is None:
+        catalog = get_catalog()
+    orders = np.atleast_2d(np.asarray(orders, dtype=np.int64))
+    assert orders.shape[1] < 2 or np.all(np.diff(np.sort(orders, axis=1), axis=1) != 0)
+    changeover_times = catalog.matrix[orders[:, :-1], orders[:, 1:]].sum(axis=1, dtype=np.int64)
+    return changeover_times + _occurences_surcharge(occurences)
+
+def calculate_oct(order: List[str], occurences : Union[Dict[str, int], None] = None,
+                  catalog : Union[ProductCatalog, None] = None) -> int:
     """Calculate the overall changeover time for a given product order and the changeover matrix
 
     Args:
         order (List[str]): product order
         occurences (Union[Dict[str, int], None], optional): Indicating the number of occurences \
             per product. If None, every product appears once. Defaults to None.
+        catalog (Union[ProductCatalog, None], optional): product catalog. If None, the catalog \
+            of this process is used. Defaults to None.
 
     Returns:
         int: overall changeover time
     """
     assert len(order) == len(set(order))
-    df_matrix = pd.read_csv(CHANGEOVER_MATRIX, dtype={'Product': str}).set_index('Product')
-    changeover_time = 0
-    for i in range(1, len(order)):
-        product1 = order[i - 1]
-        product2 = order[i]
-        changeover_time += df_matrix.at[product1, product2]
-    if occurences is not None:
-        for num in occurences.values():
-            assert num >= 1
-            changeover_time += (num - 1) * 15
-    return changeover_time
+    if catalog is None:
+        catalog = get_catalog()
+    indices = catalog.indices(order)
+    changeover_time = int(catalog.matrix[indices[:-1], indices[1:]].sum(dtype=np.int64))
+    return changeover_time + _occurences_surcharge(occurences)
 
-def get_changeover_matrix(products : Set[str], consider_constraints : Union[None, int] = None) \
-    -> Tuple[pd.DataFrame, Dict[str, int]]:
-    """Fetching the changeover matrix from the CSV file and apply modification regarding the
-    constraints on it
+def _get_campaigns_order(campaigns : Set[str], consider_constraints : Union[None, int],
+                         catalog : ProductCatalog) -> Dict[str, int]:
+    """Auxiliary function for numbering the order steps of the given campaigns consecutively
 
     Args:
-        products (Set[str]): set of products
-        consider_constraints (Union[None, int], optional): Indicating which constraints are taken \
-            into account. For 0 no additional constraints are considered, for None all are \
-            considered. Defaults to None.
+        campaigns (Set[str]): set of campaigns
+        consider_constraints (Union[None, int]): Indicating which constraints are taken into \
+            account. For 0 no additional constraints are considered, for None all are considered.
+        catalog (ProductCatalog): product catalog
 
     Returns:
-        Tuple[pd.DataFrame, Dict[str, int]]: modified changeover matrix as DataFrame, campaigns \
-            order
+        Dict[str, int]: campaigns order; -1 for all campaigns, if the campaigns order isn't \
+            considered
     """
-    df_matrix = pd.read_csv(CHANGEOVER_MATRIX, dtype={'Product': str}).set_index('Product')
-    df_matrix = df_matrix.loc[sorted(list(products)), sorted(list(products))]
-    # gcd = np.gcd.reduce(df_matrix.values.flatten())
-    # df_matrix[df_matrix != INF] = df_matrix[df_matrix != INF] / gcd
-    df_properties = pd.read_csv(PRODUCT_PROPERTIES, dtype={'Product': str}).set_index('Product')
-    df_quantity = pd.read_csv(PRODUCT_QUANTITY, dtype={'Product': str}).set_index('Product')
-    campaigns = set([df_properties.at[product, 'Campaign'] for product in products])
-    df_order = pd.read_csv(CAMPAIGNS_ORDER, index_col='Campaign')
-
     campaigns_order = {}
     if consider_constraints is None or consider_constraints >= 1:
         counter = 0
-        for step in sorted(df_order['Order'].drop_duplicates().to_list()):
-            step_campaigns = campaigns.intersection(df_order[df_order['Order'] == step].index.to_list())
+        for step in sorted(set(catalog.campaigns_order.values())):
+            step_campaigns = campaigns.intersection([campaign for campaign, order \
+                in catalog.campaigns_order.items() if order == step])
             if len(step_campaigns) != 0:
                 for campaign in step_campaigns:
                     campaigns_order[campaign] = counter
@@ -88,90 +124,246 @@ def get_changeover_matrix(products : Set[str], consider_constraints : Union[None
     else:
         for campaign in campaigns:
             campaigns_order[campaign] = -1
+    return campaigns_order
+
+def build_changeover_matrices(products : Sequence[str],
+                              levels : Iterable[Union[None, int]] = (0, 1, 2, 3, 4),
+                              catalog : Union[ProductCatalog, None] = None) \
+    -> Dict[Union[None, int], Tuple[np.ndarray, Dict[str, int]]]:
+    """Building the changeover matrices with the modifications regarding the constraints for
+    several options of considered constraints in one pass. The masks of the constraints are
+    computed once with broadcast operations over the catalog arrays and then applied per option
+
+    Args:
+        products (Sequence[str]): products in the order of rows and columns of the matrices
+        levels (Iterable[Union[None, int]], optional): options of considered constraints. For 0 \
+            no additional constraints are considered, for None all are considered. Defaults to \
+            (0, 1, 2, 3, 4).
+        catalog (Union[ProductCatalog, None], optional): product catalog. If None, the catalog \
+            of this process is used. Defaults to None.
+
+    Returns:
+        Dict[Union[None, int], Tuple[np.ndarray, Dict[str, int]]]: modified changeover matrix \
+            and campaigns order per option of considered constraints
+    """
+    if catalog is None:
+        catalog = get_catalog()
+    indices = catalog.indices(products)
+    matrix = catalog.matrix[np.ix_(indices, indices)].astype(np.int64)
+    campaign = catalog.campaign[indices]
+    volume = catalog.volume[indices]
+    quantity = catalog.quantity[indices]
+    normal = catalog.packaging[indices] == 'Normal'
+    campaigns = set([str(name) for name in campaign])
+
+    feasible = matrix < INF
+    same_campaign = campaign[:, np.newaxis] == campaign[np.newaxis, :]
+
+    # Constraint 2: no changeover within the campaign after the normal product of max. quantity
+    codes = np.unique(campaign, return_inverse=True)[1].reshape(-1)
+    max_quantity = np.full(len(campaigns), np.iinfo(np.int64).min, dtype=np.int64)
+    np.maximum.at(max_quantity, codes[normal], quantity[normal])
+    max_quantity_mask = feasible & same_campaign \
+        & (normal & (quantity == max_quantity[codes]))[:, np.newaxis]
+
+    # Constraint 3: cheap changeover within the campaign between special packagings of same volume
+    same_volume_mask = feasible & same_campaign & (~normal)[:, np.newaxis] \
+        & (volume[:, np.newaxis] == volume[np.newaxis, :])
+
+    # Constraint 1: campaign switches are expensive and must follow the campaigns order
+    step_of = _get_campaigns_order(campaigns, 1, catalog)
+    step = np.array([step_of[name] for name in campaign], dtype=np.int64)
+    step_difference = step[np.newaxis, :] - step[:, np.newaxis]
+    campaign_switch_mask = feasible & ~same_campaign
+    campaign_order_mask = feasible & (step_difference != 0) & (step_difference != 1)
+
+    result : Dict[Union[None, int], Tuple[np.ndarray, Dict[str, int]]] = {}
+    for consider_constraints in levels:
+        weights = np.where(feasible, matrix * 1000, matrix)
+        if consider_constraints is None or consider_constraints >= 2:
+            weights[max_quantity_mask] = INF
+        if consider_constraints is None or consider_constraints >= 3:
+            weights[same_volume_mask] = matrix[same_volume_mask]
+        if consider_constraints is None or consider_constraints >= 1:
+            weights[campaign_switch_mask] += 10000000
+            weights[campaign_order_mask] = INF
+
+        gcd = np.gcd.reduce(weights.flatten())
+        finite = weights != INF
+        weights[finite] = weights[finite] // gcd
+        minimum = weights.min()
+        weights[finite] = weights[finite] - minimum + 1
+
+        result[consider_constraints] = (weights, \
+            _get_campaigns_order(campaigns, consider_constraints, catalog))
+    return result
+
+def get_position_bounds(products : Set[str], consider_constraints : Union[None, int],
+                        catalog : ProductCatalog) -> Dict[str, Tuple[int, int]]:
+    """Computing the range of positions 1, ..., n of each product in the order; if the campaigns
+    order is considered, a product is preceded by all products of earlier campaign steps and
+    followed by all products of later campaign steps
+
+    Args:
+        products (Set[str]): set of products
+        consider_constraints (Union[None, int]): Indicating which constraints are taken into \
+            account. For 0 no additional constraints are considered, for None all are considered.
+        catalog (ProductCatalog): product catalog
+
+    Returns:
+        Dict[str, Tuple[int, int]]: smallest and largest position per product
+    """
+    if consider_constraints is not None and consider_constraints < 1:
+        return {product: (1, len(products)) for product in products}
+    step_of = {product: catalog.campaigns_order[str(catalog.campaign[catalog.index[product]])] \
+        for product in products}
+    steps = list(step_of.values())
+    return {product: (1 + sum(1 for other in steps if other < step),
+                      sum(1 for other in steps if other <= step)) \
+        for product, step in step_of.items()}
+
+def get_changeover_matrix(products : Set[str], consider_constraints : Union[None, int] = None,
+                          catalog : Union[ProductCatalog, None] = None) \
+    -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """Fetching the changeover matrix from the product catalog and apply modification regarding
+    the constraints on it
+
+    Args:
+        products (Set[str]): set of products
+        consider_constraints (Union[None, int], optional): Indicating which constraints are taken \
+            into account. For 0 no additional constraints are considered, for None all are \
+            considered. Defaults to None.
+        catalog (Union[ProductCatalog, None], optional): product catalog. If None, the catalog \
+            of this process is used. Defaults to None.
+
+    Returns:
+        Tuple[pd.DataFrame, Dict[str, int]]: modified changeover matrix as DataFrame, campaigns \
+            order
+    """
+    return get_changeover_matrices(products, [consider_constraints], catalog)[consider_constraints]
+
+def get_changeover_matrices(products : Set[str],
+                            levels : Iterable[Union[None, int]] = (0, 1, 2, 3, 4),
+                            catalog : Union[ProductCatalog, None] = None) \
+    -> Dict[Union[None, int], Tuple[pd.DataFrame, Dict[str, int]]]:
+    """Fetching the changeover matrices for several options of considered constraints at once,
+    see get_changeover_matrix
+
+    Args:
+        products (Set[str]): set of products
+        levels (Iterable[Union[None, int]], optional): options of considered constraints. For 0 \
+            no additional constraints are considered, for None all are considered. Defaults to \
+            (0, 1, 2, 3, 4).
+        catalog (Union[ProductCatalog, None], optional): product catalog. If None, the catalog \
+            of this process is used. Defaults to None.
 
-    for product1, row in df_matrix.iterrows():
-        campaign1 = df_properties.at[product1, 'Campaign']
-        campaign_order1 = campaigns_order[campaign1]
-        volume1 = df_properties.at[product1, 'Volume']
-        packaging1 = df_properties.at[product1, 'Packaging']
-        quantity1 = df_quantity.at[product1, 'Quantity']
-
-        for product2, distance in row.iteritems():
-            campaign2 = df_properties.at[product2, 'Campaign']
-            campaign_order2 = campaigns_order[campaign2]
-            volume2 = df_properties.at[product2, 'Volume']
-
-            if distance < INF:
-                df_matrix.at[product1, product2] *= 1000
-
-                temp_products = [product for product in products \
-                    if campaign1 == df_properties.at[product, 'Campaign']
-                        and df_properties.at[product, 'Packaging'] == 'Normal']
-
-                if consider_constraints is None or consider_constraints >= 2:
-                    if len(temp_products) > 0:
-                        max_quantity = max([df_quantity.at[product, 'Quantity'] \
-                            for product in temp_products])
-
-                        if campaign1 == campaign2 \
-                            and quantity1 == max_quantity \
-                            and packaging1 == 'Normal':
-                            df_matrix.at[product1, product2] = INF
-
-                if consider_constraints is None or consider_constraints >= 3:
-                    if campaign1 == campaign2 \
-                        and volume1 == volume2 \
-                        and packaging1 != 'Normal':
-                        df_matrix.at[product1, product2] /= 1000
-
-                if consider_constraints is None or consider_constraints >= 1:
-                    if campaign1 != campaign2:
-                        df_matrix.at[product1, product2] += 10000000
-
-                    if campaign_order2 - campaign_order1 not in [0, 1]:
-                        df_matrix.at[product1, product2] = INF
-
-    gcd = np.gcd.reduce(df_matrix.values.flatten())
-    df_matrix[df_matrix != INF] = df_matrix[df_matrix != INF] / gcd
-    minimum = min(df_matrix.values.flatten())
-    df_matrix[df_matrix != INF] = df_matrix[df_matrix != INF] - minimum + 1
-    return df_matrix, campaigns_order
-
-def create_lp_instance(products : Set[str]) -> str:
+    Returns:
+        Dict[Union[None, int], Tuple[pd.DataFrame, Dict[str, int]]]: modified changeover matrix \
+            as DataFrame and campaigns order per option of considered constraints
+    """
+    sorted_products = sorted(list(products))
+    matrices = build_changeover_matrices(sorted_products, levels, catalog)
+    return {level: (pd.DataFrame(matrix, index=pd.Index(sorted_products, name='Product'),
+                                 columns=sorted_products), campaigns_order) \
+            for level, (matrix, campaigns_order) in matrices.items()}
+
+def create_lp_instance(products : Set[str], catalog : Union[ProductCatalog, None] = None,
+                       arcs : Union[ArcList, None] = None) -> str:
     """Modelling a Product Ordering problem instance as a logic program in Answer Set Programming
 
     Args:
         products (Set[str]): set of products
+        catalog (Union[ProductCatalog, None], optional): product catalog. If None, the catalog \
+            of this process is used. Defaults to None.
+        arcs (Union[ArcList, None], optional): feasible changeovers of the instance. If None, \
+            they are built from the catalog. Defaults to None.
 
     Returns:
         str: resulting LP source code
     """
-    df_matrix = pd.read_csv(CHANGEOVER_MATRIX, dtype={'Product': str}).set_index('Product')
-    df_order = pd.read_csv(CAMPAIGNS_ORDER, index_col='Campaign')
-    df_properties = pd.read_csv(PRODUCT_PROPERTIES, dtype={'Product': str}).set_index('Product')
-    df_quantity = pd.read_csv(PRODUCT_QUANTITY, dtype={'Product': str}).set_index('Product')
+    if catalog is None:
+        catalog = get_catalog()
+    if arcs is None:
+        arcs = ArcList.from_catalog(list(products), catalog)
 
     result : str = ''
     for product in products:
         result += f'product({product}).\n'
-    for product1 in products:
-        for product2 in products:
-            distance = df_matrix.at[product1, product2]
-            if distance < INF:
-                result += f'changeover({product1}, {product2}).\n'
-                result += f'changeover_time({product1}, {product2}, {distance}).\n'
+    for product1, product2, distance in arcs.items():
+        result += f'changeover({product1}, {product2}).\n'
+        result += f'changeover_time({product1}, {product2}, {distance}).\n'
     for product in products:
-        result += f'campaign({product}, "{df_properties.at[product, "Campaign"]}").\n'
-        result += f'volume({product}, {df_properties.at[product, "Volume"]}).\n'
-        result += f'bottleCrate({product}, "{df_properties.at[product, "BottleCrate"]}").\n'
-        result += f'packaging({product}, "{df_properties.at[product, "Packaging"]}").\n'
-        result += f'plannedPerformance({product}, {df_properties.at[product, "PlannedPerformance"]}).\n'
-        result += f'quantity({product}, {df_quantity.at[product, "Quantity"]}).\n'
-    for campaign, order in df_order['Order'].items():
+        index = catalog.index[product]
+        result += f'campaign({product}, "{catalog.campaign[index]}").\n'
+        result += f'volume({product}, {catalog.volume[index]}).\n'
+        result += f'bottleCrate({product}, "{catalog.bottle_crate[index]}").\n'
+        result += f'packaging({product}, "{catalog.packaging[index]}").\n'
+        result += f'plannedPerformance({product}, {catalog.planned_performance[index]}).\n'
+        result += f'quantity({product}, {catalog.quantity[index]}).\n'
+    for campaign, order in catalog.campaigns_order.items():
         result += f'campaign_order("{campaign}", {order}).\n'
 
     return result
 
+def _product_symbol(product : str) -> clingo.Symbol:
+    """Auxiliary function for representing a product as clingo symbol in the same way as the
+    parser of clingo reads the product in the LP source code
+
+    Args:
+        product (str): product
+
+    Returns:
+        clingo.Symbol: number or constant symbol
+    """
+    if product.isdigit():
+        return clingo.Number(int(product))
+    return clingo.Function(product)
+
+def add_lp_instance(ctl : clingo.Control, products : Set[str],
+                    catalog : Union[ProductCatalog, None] = None,
+                    arcs : Union[ArcList, None] = None) -> None:
+    """Adding a Product Ordering problem instance as ground facts directly to the backend of the
+    given clingo control object; the facts are the same as in the LP source code of
+    create_lp_instance, but they are neither built as text nor parsed by clingo
+
+    Args:
+        ctl (clingo.Control): clingo control object, which is grounded afterwards
+        products (Set[str]): set of products
+        catalog (Union[ProductCatalog, None], optional): product catalog. If None, the catalog \
+            of this process is used. Defaults to None.
+        arcs (Union[ArcList, None], optional): feasible changeovers of the instance. If None, \
+            they are built from the catalog. Defaults to None.
+    """
+    if catalog is None:
+        catalog = get_catalog()
+    products_list = list(products)
+    if arcs is None:
+        arcs = ArcList.from_catalog(products_list, catalog)
+    symbols = [_product_symbol(product) for product in arcs.nodes]
+
+    with ctl.backend() as backend:
+        def add_fact(name : str, arguments : List[clingo.Symbol]) -> None:
+            backend.add_rule([backend.add_atom(clingo.Function(name, arguments))])
+
+        for product in products_list:
+            add_fact('product', [_product_symbol(product)])
+        for source, target, distance in zip(arcs.sources().tolist(), arcs.targets.tolist(),
+                                            arcs.costs.tolist()):
+            add_fact('changeover', [symbols[source], symbols[target]])
+            add_fact('changeover_time', [symbols[source], symbols[target], clingo.Number(distance)])
+        for product in products_list:
+            index = catalog.index[product]
+            symbol = _product_symbol(product)
+            add_fact('campaign', [symbol, clingo.String(str(catalog.campaign[index]))])
+            add_fact('volume', [symbol, clingo.Number(int(catalog.volume[index]))])
+            add_fact('bottleCrate', [symbol, clingo.String(str(catalog.bottle_crate[index]))])
+            add_fact('packaging', [symbol, clingo.String(str(catalog.packaging[index]))])
+            add_fact('plannedPerformance', \
+                [symbol, clingo.Number(int(catalog.planned_performance[index]))])
+            add_fact('quantity', [symbol, clingo.Number(int(catalog.quantity[index]))])
+        for campaign, order in catalog.campaigns_order.items():
+            add_fact('campaign_order', [clingo.String(campaign), clingo.Number(order)])
+
 def create_tsp_instance(edge_weights : Dict[str, Dict[str, int]]) -> \
     Tuple[tsplib95.models.StandardProblem, List[str]]:
     """Creating a Product Ordering problem instance in the tsplib95 format
@@ -268,6 +460,27 @@ def transform_symmetric(edge_weights : Dict[str, Dict[str, int]]) -> Dict[str, D
     for product in edge_weights:
         sym_edge_weights[product + '_v'] = {}
 
+    summand = symmetric_summand(edge_weights)
+    for product1 in edge_weights:
+        for product2 in edge_weights[product1]:
+            sym_edge_weights[product2][product1 + '_v'] = edge_weights[product1][product2] + summand
+            sym_edge_weights[product1 + '_v'][product2] = edge_weights[product1][product2] + summand
+        sym_edge_weights[product1][product1 + '_v'] = 0
+        sym_edge_weights[product1 + '_v'][product1] = 0
+
+    return sym_edge_weights
+
+def symmetric_summand(edge_weights : Dict[str, Dict[str, int]]) -> int:
+    """Calculating the summand, which is added to every changeover by the transformation into a
+    symmetric graph instance; a tour of the symmetric graph thus costs the summand times the
+    number of nodes more than the corresponding tour of the asymmetric graph
+
+    Args:
+        edge_weights (Dict[str, Dict[str, int]]): model of asymmetric graph
+
+    Returns:
+        int: summand of the changeovers, 0 if the changeovers are kept
+    """
     edge_weights_list = []
     for product1 in edge_weights:
         for product2 in edge_weights[product1]:
@@ -278,34 +491,202 @@ def transform_symmetric(edge_weights : Dict[str, Dict[str, int]]) -> Dict[str, D
     d_min = min(edge_weights_list)
     d_max = max(edge_weights_list)
     if 4 * d_min - 3 * d_max > 0:
-        for product1 in edge_weights:
-            for product2 in edge_weights[product1]:
-                sym_edge_weights[product2][product1 + '_v'] = edge_weights[product1][product2]
-                sym_edge_weights[product1 + '_v'][product2] = edge_weights[product1][product2]
-            sym_edge_weights[product1][product1 + '_v'] = 0
-            sym_edge_weights[product1 + '_v'][product1] = 0
-    else:
-        summand = 3 * d_max - 4 * d_min + 1
-        for product1 in edge_weights:
-            for product2 in edge_weights[product1]:
-                sym_edge_weights[product2][product1 + '_v'] = edge_weights[product1][product2] + summand
-                sym_edge_weights[product1 + '_v'][product2] = edge_weights[product1][product2] + summand
-            sym_edge_weights[product1][product1 + '_v'] = 0
-            sym_edge_weights[product1 + '_v'][product1] = 0
+        return 0
+    return 3 * d_max - 4 * d_min + 1
 
-    return sym_edge_weights
+def run_process(args : List[str], timeout : float, cwd : Union[str, None] = None) \
+    -> Tuple[List[Tuple[float, str]], bool]:
+    """Running an external solver and collecting the lines of its output together with the
+    elapsed time, at which they are printed; thereby the intermediate results are kept, even if
+    the solver is killed at the time limit. The solver is started in its own process group, such
+    that the processes started by the solver are killed as well
+
+    Args:
+        args (List[str]): command line arguments
+        timeout (float): time limit in seconds
+        cwd (Union[str, None], optional): working directory. Defaults to None.
+
+    Returns:
+        Tuple[List[Tuple[float, str]], bool]: lines of the standard output with the elapsed \
+            time in seconds, flag for timeout occurred
+    """
+    start_time = time.time()
+    lines : List[Tuple[float, str]] = []
+    process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                               text=True, cwd=cwd, start_new_session=True)
+
+    def read() -> None:
+        assert process.stdout is not None
+        for line in process.stdout:
+            lines.append((time.time() - start_time, line.rstrip('\n')))
+
+    reader = threading.Thread(target=read, daemon=True)
+    reader.start()
+    try:
+        process.wait(timeout=max(timeout, 0.0))
+        timeout_occurred = False
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+        timeout_occurred = True
+    reader.join()
+    return lines, timeout_occurred
+
+# Modes of the parallel solving and optimization strategies of clingo
+PARALLEL_MODES = ['compete', 'split']
+OPT_STRATEGIES = ['bb', 'usc']
+
+def clingo_arguments(threads : int = 1, parallel_mode : str = 'compete',
+                     configuration : str = 'auto', opt_strategy : str = 'bb',
+                     options : Union[Dict[str, str], None] = None) -> List[str]:
+    """Building the command line arguments of clingo for the solver threads, the configuration and
+    the optimization strategy as well as further options of clasp
+
+    Args:
+        threads (int, optional): number of solver threads. Defaults to 1.
+        parallel_mode (str, optional): 'compete' for threads solving the whole problem with \
+            different configurations, 'split' for threads solving disjoint parts of the search \
+            space. Defaults to 'compete'.
+        configuration (str, optional): preset configuration of clasp like 'auto', 'frumpy', \
+            'jumpy', 'tweety', 'trendy', 'crafty', 'handy' or 'many', or a file with a portfolio \
+            of configurations, which are distributed over the threads. Defaults to 'auto'.
+        opt_strategy (str, optional): optimization strategy with optional arguments like 'bb', \
+            'bb,lin', 'usc' or 'usc,oll'. Defaults to 'bb'.
+        options (Union[Dict[str, str], None], optional): further options of clasp like \
+            {'opt_heuristic': 'sign', 'restarts': 'L,128'}; the options 'configuration' and \
+            'opt_strategy' replace the respective arguments. Defaults to None.
+
+    Returns:
+        List[str]: command line arguments
+    """
+    options = dict(options) if options is not None else {}
+    configuration = options.pop('configuration', configuration)
+    opt_strategy = options.pop('opt_strategy', opt_strategy)
+    assert threads >= 1
+    assert parallel_mode in PARALLEL_MODES
+    assert opt_strategy.split(',')[0] in OPT_STRATEGIES
+    return [f'--parallel-mode={threads},{parallel_mode}', f'--configuration={configuration}',
+            f'--opt-strategy={opt_strategy}'] + \
+        [f'--{option.replace("_", "-")}={value}' for option, value in sorted(options.items())]
+
+def load_tuned_configurations(filename : str = TUNED_CONFIGURATIONS_FILE) \
+    -> Dict[str, Dict[str, Dict[str, Dict[str, str]]]]:
+    """Loading the table of the tuned clingo configurations, which maps the approach, the
+    considered constraints option and the sample size onto the options of clasp
+
+    Args:
+        filename (str, optional): file of the table. Defaults to TUNED_CONFIGURATIONS_FILE.
+
+    Returns:
+        Dict[str, Dict[str, Dict[str, Dict[str, str]]]]: table of the tuned configurations; empty, \
+            if the file does not exist
+    """
+    if not os.path.exists(filename):
+        return {}
+    with open(filename, 'r', encoding='utf-8') as filehandle:
+        return json.load(filehandle)
+
+def get_tuned_options(approach : str, consider_constraints : Union[None, int], sample_size : int,
+                      filename : str = TUNED_CONFIGURATIONS_FILE) -> Union[Dict[str, str], None]:
+    """Getting the tuned options of clasp for an instance; if the sample size itself hasn't been
+    tuned, the configuration of the nearest tuned sample size is taken, preferring the larger one
+
+    Args:
+        approach (str): solving approach, i.e. 'lp_normal', 'lp_advanced' or 'asp'
+        consider_constraints (Union[None, int]): considered constraints option
+        sample_size (int): number of products
+        filename (str, optional): file of the table. Defaults to TUNED_CONFIGURATIONS_FILE.
+
+    Returns:
+        Union[Dict[str, str], None]: tuned options of clasp, None if there aren't any
+    """
+    configurations = load_tuned_configurations(filename).get(approach, {}) \
+        .get(str(consider_constraints), {})
+    if len(configurations) == 0:
+        return None
+    nearest = min(configurations, key=lambda size: (abs(int(size) - sample_size), -int(size)))
+    return configurations[nearest]
+
+class Deadline():
+    """Point in time, at which the computation of an experiment instance is stopped; it is shared
+    by all steps like preprocessing, grounding, building and solving the model, such that the time
+    spent before the solver starts counts against the time limit as well
+    """
+    def __init__(self, timeout : float = TIMEOUT):
+        self.start_time = time.time()
+        self.end_time = self.start_time + timeout
+
+    def remaining(self) -> float:
+        """Getting the time left until the deadline
+
+        Returns:
+            float: remaining time in seconds, 0 if the deadline has passed
+        """
+        return max(self.end_time - time.time(), 0.0)
+
+    def expired(self) -> bool:
+        """Checking whether the deadline has passed
+
+        Returns:
+            bool: flag for deadline passed
+        """
+        return time.time() >= self.end_time
 
 class ModelHelper():
-    """Auxiliary class for the solving with the Python API of clingo
+    """Auxiliary class for the solving with the Python API of clingo; the symbols of the last and
+    thus best model found so far are kept, even if the solving is interrupted, and the costs of
+    every model are recorded together with the elapsed time
     """
-    def __init__(self):
-        self.symbols = None
+    def __init__(self, start_time : Union[float, None] = None):
+        self.symbols : Union[Sequence[clingo.Symbol], None] = None
+        self.costs : Union[List[int], None] = None
+        self.priorities : Union[List[int], None] = None
         self.exhausted = False
         self.optimal = False
+        self.start_time = time.time() if start_time is None else start_time
+        self.trajectory : List[Tuple[float, List[int]]] = []
 
     def on_model(self, model : clingo.Model):
         self.symbols = model.symbols(shown=True)
+        self.costs = model.cost
+        self.priorities = model.priority
+        self.trajectory.append((time.time() - self.start_time, list(model.cost)))
+
+    def get_trajectory(self, priority : Union[int, None] = None) -> List[Tuple[float, int]]:
+        """Getting the trajectory of the elapsed time and costs of the models found
+
+        Args:
+            priority (Union[int, None], optional): priority level of the costs. If None, the \
+                costs of the highest priority are taken. Defaults to None.
+
+        Returns:
+            List[Tuple[float, int]]: trajectory of the elapsed time and costs
+        """
+        if len(self.trajectory) == 0:
+            return []
+        index = 0
+        if priority is not None:
+            assert self.priorities is not None
+            index = self.priorities.index(priority)
+        return [(elapsed, costs[index]) for elapsed, costs in self.trajectory]
 
     def on_finish(self, solve_result : clingo.SolveResult):
         self.exhausted = solve_result.exhausted
-        self.optimal = solve_result.satisfiable and solve_result.exhausted
+        self.optimal = bool(solve_result.satisfiable and solve_result.exhausted)
+
+def solve_with_deadline(ctl : clingo.Control, modelHelper : ModelHelper, deadline : Deadline) \
+    -> None:
+    """Solving the grounded logic program asynchronously, until the search is finished or the
+    deadline is reached; then the search is cancelled, whereas the model helper keeps the best
+    model found so far
+
+    Args:
+        ctl (clingo.Control): grounded control object
+        modelHelper (ModelHelper): model helper receiving the models and the result
+        deadline (Deadline): deadline of the computation
+    """
+    solve_handle : clingo.SolveHandle
+    with ctl.solve(on_model=modelHelper.on_model, on_finish=modelHelper.on_finish,
+        async_=True) as solve_handle: # type: ignore
+        if not solve_handle.wait(deadline.remaining()):
+            solve_handle.cancel()
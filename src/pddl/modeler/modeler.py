@@ -1,47 +1,119 @@
-from typing import Set
+from typing import Iterator, List, Set, TextIO, Union
 import time
 import logging
 import argparse
 import os
 import sys
-import pandas as pd
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
-from constants.constants import CHANGEOVER_MATRIX, CAMPAIGNS_ORDER, PRODUCT_PROPERTIES, INF
+from catalog.catalog import ProductCatalog, get_catalog
+from catalog.arcs import ArcList
+
+class _ChunkedSink:
+    """Auxiliary class, which collects text pieces and passes them to the underlying text sink in
+    chunks of roughly the given size
+    """
+
+    def __init__(self, sink : TextIO, chunk_size : int) -> None:
+        self.sink = sink
+        self.chunk_size = chunk_size
+        self.pieces : List[str] = []
+        self.size = 0
+
+    def write(self, text : str) -> None:
+        self.pieces.append(text)
+        self.size += len(text)
+        if self.size >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.pieces:
+            self.sink.write(''.join(self.pieces))
+            self.pieces = []
+            self.size = 0
 
 class Modeler:
     """This class implements a modeler, which takes an instance of the Product Ordering problem
        and describes it in PDDL (Planning Domain Definition Language)
     """
 
-    def create_instance(self, products : Set[str], filename : str) -> None:
+    CHUNK_SIZE = 1 << 16
+
+    def create_instance(self, products : Set[str], filename : str,
+                        catalog : Union[ProductCatalog, None] = None,
+                        arcs : Union[ArcList, None] = None) -> None:
         """Modelling an Product Ordering problem instance as a classical planning problem with
         preferences with the help of PDDL
 
         Args:
             products (Set[str]): set of products
             filename (str): name of resulting PDDL instance file
+            catalog (Union[ProductCatalog, None], optional): product catalog. If None, the \
+                catalog of this process is used. Defaults to None.
+            arcs (Union[ArcList, None], optional): feasible changeovers of the instance. If None, \
+                they are built from the catalog. Defaults to None.
         """
-        df_matrix = pd.read_csv(CHANGEOVER_MATRIX, dtype={'Product': str}).set_index('Product')
-        df_properties = pd.read_csv(PRODUCT_PROPERTIES, dtype={'Product': str}).set_index('Product')
-        campaigns = sorted([df_properties.at[product, 'Campaign'] for product in products])
-        df_order = pd.read_csv(CAMPAIGNS_ORDER, index_col='Campaign')
-
         problemname = os.path.split(filename)[-1].split('.')[0]
 
-        result = \
+        with open(filename, 'w', encoding='utf-8') as filehandle:
+            self.write_instance(products, filehandle, problemname, catalog, arcs)
+
+    def write_instance(self, products : Set[str], sink : TextIO, problemname : str,
+                       catalog : Union[ProductCatalog, None] = None,
+                       arcs : Union[ArcList, None] = None, chunk_size : int = CHUNK_SIZE) -> None:
+        """Writing a Product Ordering problem instance in PDDL section by section into the given
+        text sink, whereas the text is passed on in chunks and never built as a whole
+
+        Args:
+            products (Set[str]): set of products
+            sink (TextIO): file handle or any other object with a write method for text
+            problemname (str): name of the PDDL problem
+            catalog (Union[ProductCatalog, None], optional): product catalog. If None, the \
+                catalog of this process is used. Defaults to None.
+            arcs (Union[ArcList, None], optional): feasible changeovers of the instance. If None, \
+                they are built from the catalog. Defaults to None.
+            chunk_size (int, optional): number of characters passed to the sink at once. \
+                Defaults to CHUNK_SIZE.
+        """
+        if catalog is None:
+            catalog = get_catalog()
+        if arcs is None:
+            arcs = ArcList.from_catalog(list(products), catalog)
+
+        chunked_sink = _ChunkedSink(sink, chunk_size)
+        for text in self._generate_sections(products, problemname, catalog, arcs):
+            chunked_sink.write(text)
+        chunked_sink.flush()
+
+    @staticmethod
+    def _generate_sections(products : Set[str], problemname : str, catalog : ProductCatalog,
+                           arcs : ArcList) -> Iterator[str]:
+        """Static and protected method for generating the text of the PDDL problem piece by piece
+
+        Args:
+            products (Set[str]): set of products
+            problemname (str): name of the PDDL problem
+            catalog (ProductCatalog): product catalog
+            arcs (ArcList): feasible changeovers of the instance
+
+        Yields:
+            Iterator[str]: text pieces of the PDDL problem
+        """
+        campaigns = sorted([catalog.campaign[catalog.index[product]] for product in products])
+
+        yield \
 f'''(define (problem ProductOrdering-{problemname})
     (:domain ProductOrdering)
 
 (:objects'''
         for product in products:
-            result += f'\n    p{product}'
-        result += \
+            yield f'\n    p{product}'
+        yield \
 '''
     pstart
     pend - product'''
         for campaign in campaigns:
-            result += f'\n    "{campaign}"'
-        result += \
+            yield f'\n    "{campaign}"'
+        yield \
 '''
     Start
     End - campaign
@@ -50,44 +122,47 @@ f'''(define (problem ProductOrdering-{problemname})
 (:init
     (not-initialized)
 '''
-        for product1 in products:
-            result += f'    (changeover pstart p{product1})\n'
-            result += f'    (= (changeover-time pstart p{product1}) 0)\n'
-            result += f'    (changeover p{product1} pend)\n'
-            result += f'    (= (changeover-time p{product1} pend) 0)\n'
-            for product2 in products:
-                distance = df_matrix.at[product1, product2]
-                if distance < INF:
-                    result += f'    (changeover p{product1} p{product2})\n'
-                    result += f'    (= (changeover-time p{product1} p{product2}) {distance})\n'
+        nodes = arcs.nodes
+        targets = arcs.targets.tolist()
+        costs = arcs.costs.tolist()
+        offsets = arcs.offsets.tolist()
+        for index1, product1 in enumerate(nodes):
+            yield f'    (changeover pstart p{product1})\n' \
+                  f'    (= (changeover-time pstart p{product1}) 0)\n' \
+                  f'    (changeover p{product1} pend)\n' \
+                  f'    (= (changeover-time p{product1} pend) 0)\n'
+            yield ''.join([f'    (changeover p{product1} p{nodes[index2]})\n'
+                           f'    (= (changeover-time p{product1} p{nodes[index2]}) {distance})\n'
+                           for index2, distance in zip(targets[offsets[index1]:offsets[index1 + 1]],
+                                                       costs[offsets[index1]:offsets[index1 + 1]])])
         for product in products:
-            result += f'    (product-campaign p{product} "{df_properties.at[product, "Campaign"]}")\n'
-        result += f'    (product-campaign pstart Start)\n'
-        result += f'    (product-campaign pend End)\n'
+            yield f'    (product-campaign p{product} "{catalog.campaign[catalog.index[product]]}")\n'
+        yield '    (product-campaign pstart Start)\n'
+        yield '    (product-campaign pend End)\n'
         for campaign in campaigns:
-            result += f'    (campaign-switch-possible Start "{campaign}")\n'
+            yield f'    (campaign-switch-possible Start "{campaign}")\n'
         for campaign in campaigns:
-            result += f'    (campaign-switch-possible "{campaign}" End)\n'
+            yield f'    (campaign-switch-possible "{campaign}" End)\n'
         for campaign1 in campaigns:
             for campaign2 in campaigns:
-                order1 = df_order.at[campaign1, 'Order']
-                order2 = df_order.at[campaign2, 'Order']
+                order1 = catalog.campaigns_order[campaign1]
+                order2 = catalog.campaigns_order[campaign2]
                 if 0 <= order2 - order1 and campaign1 != campaign2:
-                    result += f'    (campaign-switch-possible "{campaign1}" "{campaign2}")\n'
-        result += \
+                    yield f'    (campaign-switch-possible "{campaign1}" "{campaign2}")\n'
+        yield \
 ''')
 
 (:goal
     (and
         (finalized)
 '''
-        result += f'        (product-processed pstart)\n'
-        result += f'        (product-processed pend)\n'
+        yield '        (product-processed pstart)\n'
+        yield '        (product-processed pend)\n'
         for product in products:
-            result += f'        (product-processed p{product})\n'
+            yield f'        (product-processed p{product})\n'
         for campaign in campaigns:
-            result += f'        (campaign-processed "{campaign}")\n'
-        result += \
+            yield f'        (campaign-processed "{campaign}")\n'
+        yield \
 '''    )
 )
 
@@ -96,9 +171,6 @@ f'''(define (problem ProductOrdering-{problemname})
 )
 '''
 
-        with open(filename, 'w', encoding='utf-8') as filehandle:
-            filehandle.write(result)
-
 #-----------------------------------------------
 # Main
 #-----------------------------------------------
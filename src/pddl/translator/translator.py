@@ -1,8 +1,11 @@
 import time
-from typing import List
+from typing import List, Union
 import logging
+import re
 import os
 import sys
+import clingo
+from clingo.ast import ProgramBuilder, parse_string
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 from pddl.parser.parser import Parser
 
@@ -26,7 +29,7 @@ class Translator:
             str: constructed ASP predicate
         """
         assert sep in [',', ';']
-        reserved = ['T', 'T - 1', 'V', 'V1', 'V2', 'Value']
+        reserved = ['T', 'T - 1', 't', 't - 1', 'V', 'V1', 'V2', 'Value']
         term = ''
         if strong_negation:
             term += '-'
@@ -44,8 +47,31 @@ class Translator:
             term = term[:-2] + ')'
         return term
 
+    @staticmethod
+    def _construct_symbol(name : str, params : list) -> clingo.Symbol:
+        """Static and protected method for constructing ground ASP atoms as clingo symbols in the
+        same way as _construct_term represents them as text
+
+        Args:
+            name (str): name of the predicate
+            params (list): list of ground parameters of the predicate
+
+        Returns:
+            clingo.Symbol: constructed ASP atom
+        """
+        arguments = []
+        for param in params:
+            param = str(param)
+            if re.fullmatch(r'-?\d+', param):
+                arguments.append(clingo.Number(int(param)))
+            elif param[0] == '"':
+                arguments.append(clingo.String(param[1:-1].replace('-', '_').lower()))
+            else:
+                arguments.append(clingo.Function(param.replace('-', '_').lower()))
+        return clingo.Function(str(name).replace('-', '_').lower(), arguments)
 
-    def translate(self, domain : str, problem : str, timesteps : int) -> str:
+    def translate(self, domain : str, problem : str, timesteps : Union[int, None] = None,
+                  incremental : bool = False) -> str:
         """Public method for translating a given planning problem, given as its domain
            (together with its initial state) and a limit of timesteps, into an ASP logic
            program
@@ -53,7 +79,58 @@ class Translator:
         Args:
             domain (str): path to domain encoding file
             problem (str): path to problem instance file
-            timesteps (int): limit of timesteps of the planning problem
+            timesteps (Union[int, None], optional): limit of timesteps of the planning problem; \
+                not needed in the incremental mode. Defaults to None.
+            incremental (bool, optional): translate into the program parts base, step(t) and \
+                check(t) for multi-shot solving with an increasing horizon instead of a fixed \
+                limit of timesteps; the goal of check(t) is only required, if the external atom \
+                query(t) is true. Defaults to False.
+
+        Returns:
+            str: ASP logic program
+        """
+        return self._translate(domain, problem, timesteps, incremental=incremental)
+
+    def translate_into(self, ctl : clingo.Control, domain : str, problem : str,
+                       timesteps : Union[int, None] = None, incremental : bool = False) -> None:
+        """Public method for translating a given planning problem directly into the given clingo
+           control object; the rules are added as abstract syntax trees of the program part
+           base (or of the program parts base, step(t) and check(t) in the incremental mode),
+           whereas the facts of the objects and the initial state are added as ground
+           atoms to the backend, such that the instance is never built and parsed as text
+
+        Args:
+            ctl (clingo.Control): clingo control object, which is grounded afterwards
+            domain (str): path to domain encoding file
+            problem (str): path to problem instance file
+            timesteps (Union[int, None], optional): limit of timesteps of the planning problem; \
+                not needed in the incremental mode. Defaults to None.
+            incremental (bool, optional): translate into the program parts base, step(t) and \
+                check(t), see translate. Defaults to False.
+        """
+        facts : List[clingo.Symbol] = []
+        rules = self._translate(domain, problem, timesteps, facts, incremental)
+        with ProgramBuilder(ctl) as builder:
+            parse_string(rules, builder.add)
+        with ctl.backend() as backend:
+            for fact in facts:
+                backend.add_rule([backend.add_atom(fact)])
+
+    def _translate(self, domain : str, problem : str, timesteps : Union[int, None],
+                   facts : Union[List[clingo.Symbol], None] = None,
+                   incremental : bool = False) -> str:
+        """Protected method for translating a given planning problem into an ASP logic program
+
+        Args:
+            domain (str): path to domain encoding file
+            problem (str): path to problem instance file
+            timesteps (Union[int, None]): limit of timesteps of the planning problem; None in \
+                the incremental mode
+            facts (Union[List[clingo.Symbol], None], optional): If given, the facts of the \
+                objects and the initial state are appended to this list instead of the logic \
+                program. Defaults to None.
+            incremental (bool, optional): translate into the program parts base, step(t) and \
+                check(t), see translate. Defaults to False.
 
         Returns:
             str: ASP logic program
@@ -69,21 +146,41 @@ class Translator:
 
         pi = []
 
+        # In the incremental mode, the rules of a timestep belong to the program part step(t),
+        # whose parameter t replaces the variable T, and the goal belongs to the program part
+        # check(t); the parts are switched back and forth along the translation
+        now, before, horizon = 'T', 'T - 1', 'timesteps'
+        base, step, check = '', '', ''
+        if incremental:
+            now, before, horizon = 't', 't - 1', 't'
+            base, step, check = '#program base.\n', '#program step(t).\n', '#program check(t).\n'
+        elif timesteps is None:
+            raise Exception('The limit of timesteps is missing!')
+
         pi.append('% Definitions\n')
-        pi.append(f'#const timesteps={timesteps}.\n')
-        pi.append('time(1..timesteps).\n\n')
+        if incremental:
+            pi.append(base)
+        else:
+            pi.append(f'#const timesteps={timesteps}.\n')
+            pi.append('time(1..timesteps).\n\n')
 
         pi.append('%% Constants\n')
         for typ, values in parser.constants.items():
             if len(values) > 0:
-                pi.append(f'{self._construct_term(typ, values, sep=";")}.\n')
+                if facts is None:
+                    pi.append(f'{self._construct_term(typ, values, sep=";")}.\n')
+                else:
+                    facts.extend([self._construct_symbol(typ, [value]) for value in values])
         if len(parser.constants.items()) == 0:
             pi.append('% empty\n')
 
         pi.append('%% Objects\n')
         for typ, values in parser.objects.items():
             if len(values) > 0:
-                pi.append(f'{self._construct_term(typ, values, sep=";")}.\n')
+                if facts is None:
+                    pi.append(f'{self._construct_term(typ, values, sep=";")}.\n')
+                else:
+                    facts.extend([self._construct_symbol(typ, [value]) for value in values])
         if len(parser.objects.items()) == 0:
             pi.append('% empty\n')
 
@@ -131,34 +228,36 @@ class Translator:
             logging.debug('action.effects: %s', str(action.effects))
             logging.debug('action.preconditions: %s', str(action.preconditions))
 
+            pi.append(base)
             pi.append(f'action({action.repr_asp_term()})')
             if action.parameters:
                 pi.append(f'\t:- {action.repr_parameters(leading_sep=False)}')
             pi.append('.\n\n')
 
+            pi.append(step)
             for effect in action.effects[1]:
                 strong_negation = False
                 if effect[0] == 'not':
                     effect = effect[1]
                     strong_negation = True
                 if effect[0] in parser.predicates:
-                    pi.append(f'{repr_fluent(effect, time_term="T", strong_negation=strong_negation)}\t:- time(T), occ({action.repr_asp_term()}, T){action.repr_parameters()}.\n')
+                    pi.append(f'{repr_fluent(effect, time_term=now, strong_negation=strong_negation)}\t:- time({now}), occ({action.repr_asp_term()}, {now}){action.repr_parameters()}.\n')
 
                 elif effect[0] in ['+', 'increase']:
-                    pi.append(f'{repr_fluent(effect[1], time_term="T", add_list= ["V"])}\t:- time(T), occ({action.repr_asp_term()}, T){action.repr_parameters()}, {repr_fluent(effect[1], time_term="T - 1", add_list=["V1"])}')
+                    pi.append(f'{repr_fluent(effect[1], time_term=now, add_list= ["V"])}\t:- time({now}), occ({action.repr_asp_term()}, {now}){action.repr_parameters()}, {repr_fluent(effect[1], time_term=before, add_list=["V1"])}')
                     if effect[2][0] in fluents_in_effects:
-                        pi.append(f', {repr_fluent(effect[2], time_term="T", add_list=["V2"])}, V = V1 + V2.\n')
+                        pi.append(f', {repr_fluent(effect[2], time_term=now, add_list=["V2"])}, V = V1 + V2.\n')
                     else:
                         pi.append(f', {repr_fluent(effect[2], add_list=["V2"])}, V = V1 + V2.\n')
-                    pi.append(f'{repr_fluent(effect[1], time_term="T", add_list=["V1"], strong_negation=True)}\t:- time(T), occ({action.repr_asp_term()}, T){action.repr_parameters()}, {repr_fluent(effect[1], time_term="T - 1", add_list=["V1"])}')
+                    pi.append(f'{repr_fluent(effect[1], time_term=now, add_list=["V1"], strong_negation=True)}\t:- time({now}), occ({action.repr_asp_term()}, {now}){action.repr_parameters()}, {repr_fluent(effect[1], time_term=before, add_list=["V1"])}')
                     if effect[2][0] in fluents_in_effects:
-                        pi.append(f', {repr_fluent(effect[2], time_term="T", add_list=["V2"])}, V2 != 0.\n')
+                        pi.append(f', {repr_fluent(effect[2], time_term=now, add_list=["V2"])}, V2 != 0.\n')
                     else:
                         pi.append(f', {repr_fluent(effect[2], add_list=["V2"])}, V2 != 0.\n')
 
                 elif effect[0] in ['=', 'assign']:
-                    pi.append(f'{repr_fluent(effect[1], time_term = "T", add_list=["V"])}\t:- time(T), occ({action.repr_asp_term()}, T){action.repr_parameters()}, V = {effect[2]}.\n')
-                    pi.append(f'{repr_fluent(effect[1], time_term = "T", add_list=["V"], strong_negation=True)}\t:- time(T), occ({action.repr_asp_term()}, T){action.repr_parameters()}, {repr_fluent(effect[1], time_term = "T - 1", add_list=["V"])}.\n')
+                    pi.append(f'{repr_fluent(effect[1], time_term=now, add_list=["V"])}\t:- time({now}), occ({action.repr_asp_term()}, {now}){action.repr_parameters()}, V = {effect[2]}.\n')
+                    pi.append(f'{repr_fluent(effect[1], time_term=now, add_list=["V"], strong_negation=True)}\t:- time({now}), occ({action.repr_asp_term()}, {now}){action.repr_parameters()}, {repr_fluent(effect[1], time_term=before, add_list=["V"])}.\n')
 
             if len(action.effects[1]) > 0:
                 pi.append('\n')
@@ -166,7 +265,7 @@ class Translator:
             if len(action.preconditions) == 1:
                 action.preconditions = ('and', [action.preconditions])
 
-            pi.append(f'possible({action.repr_asp_term()}, T)\t:- time(T)')
+            pi.append(f'possible({action.repr_asp_term()}, {now})\t:- time({now})')
             for precondition in action.preconditions[1]:
                 pi.append(', ')
                 default_negation = False
@@ -174,25 +273,28 @@ class Translator:
                     precondition = precondition[1]
                     default_negation = True
                 if precondition[0] in parser.predicates:
-                    pi.append(repr_fluent(precondition, time_term="T - 1", default_negation=default_negation))
+                    pi.append(repr_fluent(precondition, time_term=before, default_negation=default_negation))
                 elif precondition[0] == '<':
-                    pi.append(f'{repr_fluent(precondition[1], time_term="T - 1", add_list=["Value"])}, Value < {precondition[2]}')
+                    pi.append(f'{repr_fluent(precondition[1], time_term=before, add_list=["Value"])}, Value < {precondition[2]}')
                 else:
                     raise Exception('Using unimplemented feature')
             pi.append(f'{action.repr_parameters()}.\n')
 
         pi.append('\n% Action generation rule with Executability constraint\n')
-        pi.append('1 { occ(A, T) : possible(A, T), action(A) } 1 :- time(T).\n\n')
+        pi.append(step)
+        if incremental:
+            pi.append('time(t).\n')
+        pi.append(f'1 {{ occ(A, {now}) : possible(A, {now}), action(A) }} 1 :- time({now}).\n\n')
 
         pi.append('% Inertia rules\n')
         pi.append('%% Fluents (Predicates)\n')
         for predicate_name, predicate_params in parser.predicates.items():
             if predicate_name in fluents_in_effects:
-                pi.append(self._construct_term(predicate_name, list(predicate_params.keys()) + ['T']))
-                pi.append('\t:- time(T), ')
-                pi.append(self._construct_term(predicate_name, list(predicate_params.keys()) + ['T - 1']))
+                pi.append(self._construct_term(predicate_name, list(predicate_params.keys()) + [now]))
+                pi.append(f'\t:- time({now}), ')
+                pi.append(self._construct_term(predicate_name, list(predicate_params.keys()) + [before]))
                 if predicate_name in fluents_with_negated_effects:
-                    pi.append(f', not {self._construct_term(predicate_name, list(predicate_params.keys()) + ["T"], strong_negation=True)}')
+                    pi.append(f', not {self._construct_term(predicate_name, list(predicate_params.keys()) + [now], strong_negation=True)}')
                 pi.append('.\n')
         if sum([predicateName in fluents_in_effects for predicateName in parser.predicates.keys()]) == 0:
             pi.append('% empty\n')
@@ -200,11 +302,11 @@ class Translator:
         pi.append('%% Numeric Fluents (Functions)\n')
         for function_name, function_params in parser.functions.items():
             if function_name in fluents_in_effects:
-                pi.append(self._construct_term(function_name, list(function_params.keys()) + ['V', 'T']))
-                pi.append('\t:- time(T), ')
-                pi.append(self._construct_term(function_name, list(function_params.keys()) + ['V', 'T - 1']))
+                pi.append(self._construct_term(function_name, list(function_params.keys()) + ['V', now]))
+                pi.append(f'\t:- time({now}), ')
+                pi.append(self._construct_term(function_name, list(function_params.keys()) + ['V', before]))
                 if function_name in fluents_with_negated_effects:
-                    pi.append(f', not {self._construct_term(function_name, list(function_params.keys()) + ["V", "T"], strong_negation=True)}')
+                    pi.append(f', not {self._construct_term(function_name, list(function_params.keys()) + ["V", now], strong_negation=True)}')
                 pi.append('.\n')
         if sum([functionName in fluents_in_effects for functionName in parser.functions.keys()]) == 0:
             pi.append('% empty\n')
@@ -214,7 +316,7 @@ class Translator:
         def build_goal(goal : tuple) -> str:
             result = ''
             if goal[0] in parser.predicates:
-                return repr_fluent(goal, time_term='timesteps')
+                return repr_fluent(goal, time_term=horizon)
 
             if goal[0] == 'and':
                 for token in goal[1]:
@@ -227,24 +329,37 @@ class Translator:
                     if isinstance(token, tuple):
                         result += build_goal(token) + '; '
                     elif isinstance(token, list):
-                        result += repr_fluent(tuple(token), time_term='timesteps')
+                        result += repr_fluent(tuple(token), time_term=horizon)
                 result = result[:-2] + ' }'
 
             elif goal[0] == 'not':
-                result += repr_fluent(goal[1], time_term='timesteps', default_negation=True)
+                result += repr_fluent(goal[1], time_term=horizon, default_negation=True)
 
             else:
                 raise Exception('Error with build goal ' + str(goal))
 
             return result
 
+        # The goal and the soft goals only hold at the current horizon, which is queried
+        goal, query = 'goal', ''
+        if incremental:
+            goal, query = 'goal(t)', ', query(t)'
+
         pi.append('% Goal representation\n')
+        pi.append(check)
+        if incremental:
+            pi.append('#external query(t).\n')
         pi.append('%% Hard goals\n')
         if len(parser.goal[1]) > 0:
-            pi.append(f'goal :- {build_goal(parser.goal)}.\n:- not goal.\n')
+            pi.append(f'{goal} :- {build_goal(parser.goal)}.\n:- not {goal}{query}.\n')
         else:
             pi.append('% empty\n')
 
+        def repr_preference(name : str) -> str:
+            if incremental:
+                return self._construct_term(name, [horizon])
+            return name
+
         pi.append('%% Soft goals\n')
         if len(parser.metric) > 0:
             opt_goal, numeric_expression = parser.metric
@@ -256,37 +371,38 @@ class Translator:
                     pi.append(f'#{opt_goal}{{ V')
                     for token in list(term)[1:]:
                         pi.append(f', {token[1:].capitalize()}')
-                    pi.append(f' : {repr_fluent(term, time_term="timesteps", add_list=["V"])} }}.\n')
+                    pi.append(f' : {repr_fluent(term, time_term=horizon, add_list=["V"])}{query} }}.\n')
             elif numeric_expression[0] == '+':
                 for term in numeric_expression[1]:
                     if term[0] in parser.numeric_fluents:
                         pi.append(f'#{opt_goal}{{ V')
                         for token in list(term)[1:]:
                             pi.append(f', {token[1:].capitalize()}')
-                        pi.append(f' : {repr_fluent(term, time_term="timesteps", add_list=["V"])} }}.\n')
+                        pi.append(f' : {repr_fluent(term, time_term=horizon, add_list=["V"])}{query} }}.\n')
                     elif term[0] == '*':
                         factors = term[1]
                         pi.append(f'#{opt_goal}{{ {int(float(factors[0][0]))} : ')
                         if len(factors[1]) == 1:
                             preferences.append(factors[1][0])
-                            pi.append(factors[1][0])
+                            pi.append(repr_preference(factors[1][0]))
                         elif len(factors[1]) == 2:
                             assert factors[1][0] == 'is-violated'
                             preferences.append(factors[1][1][0])
                             negative_preferences.append(factors[1][1][0])
-                            pi.append(f'violated_{factors[1][1][0]}')
-                        pi.append(' }.\n')
+                            pi.append(repr_preference(f'violated_{factors[1][1][0]}'))
+                        pi.append(f'{query} }}.\n')
 
             if len(preferences) > 0:
                 pi.append('%% Preferences\n')
                 for pref_name, pref_expression in [(p, parser.preferences[p]) for p in preferences]:
-                    pi.append(f'{pref_name}\t:- {build_goal(pref_expression)}.\n')
+                    pi.append(f'{repr_preference(pref_name)}\t:- {build_goal(pref_expression)}.\n')
                     if pref_name in negative_preferences:
-                        pi.append(f'violated_{pref_name}\t:- not {pref_name}.\n')
+                        pi.append(f'{repr_preference(f"violated_{pref_name}")}\t:- not {repr_preference(pref_name)}.\n')
         else:
             pi.append('% empty\n')
 
         pi.append('\n% Display\n')
+        pi.append(base)
         pi.append('#show occ/2.\n')
 
         pi.append('\n% Initial state\n')
@@ -298,17 +414,25 @@ class Translator:
         if sum([functionName in fluents_in_effects for functionName in parser.functions.keys()]) == 0:
             pi.append('% empty\n')
 
+        def add_initial_fluent(fluent : tuple) -> None:
+            if facts is None:
+                pi.append(f'{repr_fluent(fluent, time_term="0")}.\n')
+            else:
+                params = list(fluent)[1:]
+                if fluent[0] in fluents_in_effects:
+                    params.append('0')
+                facts.append(self._construct_symbol(fluent[0], params))
+
         pi.append('%% Fluents\n')
         for state in parser.state:
-            pi.append(f'{repr_fluent(state, time_term="0")}.\n')
+            add_initial_fluent(state)
         if len(parser.state) == 0:
             pi.append('% empty\n')
 
         pi.append('%% Numeric Fluents\n')
         for name, data in parser.numeric_fluents.items():
             for params, value in data.items():
-                fluent = tuple([name] + list(params) + [value])
-                pi.append(f'{repr_fluent(fluent, time_term="0")}.\n')
+                add_initial_fluent(tuple([name] + list(params) + [value]))
         if len(parser.numeric_fluents) == 0:
             pi.append('% empty\n')
 
@@ -322,17 +446,18 @@ class Translator:
 if __name__ == '__main__':
     if len(sys.argv) != 4:
         print('Please give the following command line arguments: ' + \
-            'python [./]translator.py <domain_file> <problem_file> <timesteps>')
+            'python [./]translator.py <domain_file> <problem_file> <timesteps|incremental>')
         sys.exit(1)
     domain = sys.argv[1]
     problem = sys.argv[2]
-    timesteps = int(sys.argv[3])
-    assert timesteps > 0
+    incremental = sys.argv[3] == 'incremental'
+    timesteps = None if incremental else int(sys.argv[3])
+    assert incremental or (timesteps is not None and timesteps > 0)
     logging.basicConfig(level=logging.INFO)
     logging.info('Translator started')
     start_time = time.time()
     translator = Translator()
-    logic_program = translator.translate(domain, problem, timesteps)
+    logic_program = translator.translate(domain, problem, timesteps, incremental)
     if logic_program is not None:
         filename = f'{problem}.lp'
         with open(filename, 'w') as f:
@@ -0,0 +1,32 @@
+import unittest
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')))
+from src.constants.constants import INF
+from src.catalog.arcs import ArcList
+
+class TestArcList(unittest.TestCase):
+
+    def test_from_matrix(self):
+        matrix = np.array([[INF, 5, INF],
+                           [3, INF, 7],
+                           [INF, INF, INF]])
+        arcs = ArcList.from_matrix(['a', 'b', 'c'], matrix)
+        self.assertEqual(len(arcs), 3)
+        self.assertListEqual(arcs.offsets.tolist(), [0, 1, 3, 3])
+        targets, costs = arcs.successors(1)
+        self.assertListEqual(targets.tolist(), [0, 2])
+        self.assertListEqual(costs.tolist(), [3, 7])
+        self.assertEqual(len(arcs.successors(2)[0]), 0)
+        self.assertListEqual(arcs.sources().tolist(), [0, 1, 1])
+        self.assertListEqual(list(arcs.items()), [('a', 'b', 5), ('b', 'a', 3), ('b', 'c', 7)])
+
+    def test_from_catalog(self):
+        products = ['23545', '12020', '12021']
+        arcs = ArcList.from_catalog(products)
+        self.assertEqual(len(arcs), 6)
+        self.assertTrue(all(product1 != product2 for product1, product2, _ in arcs.items()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')))
+from src.constants.constants import CHANGEOVER_MATRIX, PRODUCT_PROPERTIES, PRODUCT_QUANTITY, \
+    CAMPAIGNS_ORDER
+from src.catalog.catalog import ProductCatalog, get_catalog, compile_snapshot, COLUMNS
+
+class TestCatalog(unittest.TestCase):
+
+    def test_from_csv(self):
+        catalog = ProductCatalog.from_csv()
+        df_matrix = pd.read_csv(CHANGEOVER_MATRIX, dtype={'Product': str}).set_index('Product')
+        df_properties = pd.read_csv(PRODUCT_PROPERTIES, dtype={'Product': str}).set_index('Product')
+        df_quantity = pd.read_csv(PRODUCT_QUANTITY, dtype={'Product': str}).set_index('Product')
+
+        self.assertEqual(catalog.products, list(df_matrix.index))
+        self.assertEqual(catalog.matrix.dtype, np.int64)
+        self.assertTrue(np.array_equal(catalog.matrix, df_matrix.values))
+        for product in ['12020', '23545', '21845']:
+            index = catalog.index[product]
+            self.assertEqual(catalog.campaign[index], df_properties.at[product, 'Campaign'])
+            self.assertEqual(catalog.volume[index], df_properties.at[product, 'Volume'])
+            self.assertEqual(catalog.packaging[index], df_properties.at[product, 'Packaging'])
+            self.assertEqual(catalog.quantity[index], df_quantity.at[product, 'Quantity'])
+        self.assertEqual(catalog.campaigns_order['Rot'], 2)
+
+    def test_indices(self):
+        catalog = get_catalog()
+        indices = catalog.indices(['23545', '12020'])
+        self.assertEqual([catalog.products[index] for index in indices], ['23545', '12020'])
+
+    def test_snapshot(self):
+        folder = tempfile.mkdtemp()
+        try:
+            sources = [os.path.join(folder, os.path.basename(source)) for source in \
+                [CHANGEOVER_MATRIX, PRODUCT_PROPERTIES, PRODUCT_QUANTITY, CAMPAIGNS_ORDER]]
+            for source, target in zip([CHANGEOVER_MATRIX, PRODUCT_PROPERTIES, PRODUCT_QUANTITY,
+                                       CAMPAIGNS_ORDER], sources):
+                shutil.copyfile(source, target)
+            snapshots = os.path.join(folder, 'snapshots')
+
+            snapshot = compile_snapshot(snapshots, sources)
+            self.assertEqual(compile_snapshot(snapshots, sources), snapshot)
+            catalog = ProductCatalog.from_snapshot(snapshot)
+            control = ProductCatalog.from_csv(*sources)
+            self.assertIsInstance(catalog.matrix, np.memmap)
+            self.assertEqual(catalog.matrix.dtype, np.int32)
+            self.assertFalse(catalog.matrix.flags.writeable)
+            self.assertTrue(np.array_equal(catalog.matrix, control.matrix))
+            for column in COLUMNS:
+                self.assertTrue(np.array_equal(catalog.columns[column], control.columns[column]))
+            self.assertEqual(catalog.products, control.products)
+            self.assertDictEqual(catalog.campaigns_order, control.campaigns_order)
+
+            with open(sources[-1], 'a', encoding='utf-8') as filehandle:
+                filehandle.write('Neu,7\n')
+            rebuilt = compile_snapshot(snapshots, sources)
+            self.assertNotEqual(rebuilt, snapshot)
+            self.assertFalse(os.path.exists(snapshot))
+            self.assertEqual(ProductCatalog.from_snapshot(rebuilt).campaigns_order['Neu'], 7)
+        finally:
+            shutil.rmtree(folder)
+
+    def test_get_catalog(self):
+        self.assertIs(get_catalog(), get_catalog())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+import random
+import os
+import sys
+from typing import *
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..')))
+from src.experiment.approaches.held_karp import run_held_karp
+from src.catalog.catalog import get_catalog
+
+def assert_held_karp_value(test : unittest.TestCase,
+                           solve : Callable[[Set[str], int], Tuple[int, List[str], bool]],
+                           sample_size : int, levels : List[int], repetitions : int = 3,
+                           seed : int = 0, exact : bool = True) -> None:
+    """Comparing an approach with Held-Karp on random samples of the catalog; exact approaches
+    have to reach the optimal value, the others must not fall below it
+
+    Args:
+        test (unittest.TestCase): test case asserting the results
+        solve (Callable[[Set[str], int], Tuple[int, List[str], bool]]): approach computing the \
+            objective value, product order and timeout flag for the samples and the considered \
+            constraints option; the value is -1, if there is no order
+        sample_size (int): number of products per sample
+        levels (List[int]): considered constraints options
+        repetitions (int, optional): number of samples. Defaults to 3.
+        seed (int, optional): seed of the samples. Defaults to 0.
+        exact (bool, optional): flag whether the approach is exact. Defaults to True.
+    """
+    random.seed(seed)
+    products = get_catalog().products
+    for _ in range(repetitions):
+        samples = set(random.sample(products, sample_size))
+        for consider_constraints in levels:
+            expected = run_held_karp(samples, consider_constraints)[0]
+            opt_value, order, timeout = solve(samples, consider_constraints)
+            test.assertFalse(timeout)
+            if exact:
+                test.assertEqual(opt_value, expected)
+            if opt_value != -1:
+                test.assertGreaterEqual(opt_value, expected)
+                test.assertEqual(sorted(order), sorted(samples))
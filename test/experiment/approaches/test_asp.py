@@ -0,0 +1,32 @@
+import unittest
+from unittest import mock
+import random
+import tempfile
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..')))
+from src.experiment.approaches import asp
+from src.experiment.approaches.asp import run_asp
+from src.catalog.catalog import get_catalog
+
+class TestAsp(unittest.TestCase):
+
+    def test_run_asp(self):
+        random.seed(0)
+        samples = set(random.sample(get_catalog().products, 5))
+        with tempfile.TemporaryDirectory() as folder:
+            os.mkdir(os.path.join(folder, 'pddl'))
+            with mock.patch.object(asp, 'INSTANCES_FOLDER', folder):
+                expected = run_asp(samples, 0)
+                # The incremental mode reaches the same plan horizon by horizon
+                opt_value, order, stats, timeout = run_asp(samples, 0, incremental=True)
+        self.assertFalse(expected[3])
+        self.assertEqual(sorted(expected[1]), sorted(samples))
+        self.assertFalse(timeout)
+        self.assertEqual(opt_value, expected[0])
+        self.assertEqual(sorted(order), sorted(samples))
+        self.assertTrue(stats['ProvenOptimal'])
+        self.assertEqual(stats['Trajectory'][-1][1], opt_value)
+
+if __name__ == '__main__':
+    unittest.main()
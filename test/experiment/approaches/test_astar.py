@@ -0,0 +1,44 @@
+import unittest
+import random
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..')))
+from src.experiment.approaches.astar import HEURISTICS, Heuristic, search, run_astar
+from src.catalog.catalog import get_catalog
+from helpers import assert_held_karp_value
+
+class TestAStar(unittest.TestCase):
+
+    def test_search(self):
+        weights = np.array([
+            [0, 1, 5, 9],
+            [7, 0, 1, 6],
+            [3, 8, 0, 1],
+            [4, 2, 4, 0]
+        ])
+        for name in HEURISTICS:
+            heuristic = Heuristic(weights, ['A', 'A', 'B', 'B'], name)
+            opt_value, path, stats, timeout = search(weights, heuristic, range(4))
+            self.assertFalse(timeout)
+            self.assertEqual(opt_value, 3)
+            self.assertEqual(path, [0, 1, 2, 3])
+            self.assertGreater(stats['Expanded'], 0)
+
+    def test_run_astar(self):
+        for heuristic in HEURISTICS:
+            def solve(samples, consider_constraints):
+                opt_value, order, _, timeout = run_astar(samples, consider_constraints, heuristic)
+                return opt_value, order, timeout
+            assert_held_karp_value(self, solve, 7, [0, 1, 3])
+
+    def test_memory_limit(self):
+        random.seed(1)
+        samples = set(random.sample(get_catalog().products, 12))
+        opt_value, order, stats, timeout = run_astar(samples, 0, 'min_out', max_states=100)
+        self.assertTrue(timeout)
+        self.assertEqual((opt_value, order), (-1, []))
+        self.assertGreater(stats['Frontier'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
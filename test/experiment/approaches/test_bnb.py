@@ -0,0 +1,54 @@
+import unittest
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..')))
+from src.experiment.approaches.bnb import get_subtours, solve_atsp, run_branch_and_bound
+from src.constants.constants import INF
+from helpers import assert_held_karp_value
+
+class TestBranchAndBound(unittest.TestCase):
+
+    def test_get_subtours(self):
+        self.assertEqual(get_subtours(np.array([1, 0, 3, 4, 2])), [[0, 1], [2, 3, 4]])
+        self.assertEqual(get_subtours(np.array([2, 0, 1])), [[0, 2, 1]])
+
+    def test_solve_atsp(self):
+        # The optimal assignment consists of the subtours (0 1) and (2 3)
+        matrix = np.array([
+            [INF, 1, 9, 4],
+            [1, INF, 5, 9],
+            [9, 6, INF, 1],
+            [3, 9, 1, INF]
+        ])
+        opt_value, tour, stats, timeout = solve_atsp(matrix)
+        self.assertFalse(timeout)
+        self.assertEqual(opt_value, 10)
+        self.assertEqual(tour, [0, 1, 2, 3])
+        self.assertGreater(stats['Nodes'], 1)
+
+        matrix[:, 0] = INF
+        self.assertEqual(solve_atsp(matrix)[:2], (-1, []))
+
+    def test_run_branch_and_bound(self):
+        def solve(samples, consider_constraints):
+            opt_value, order, stats, timeout = run_branch_and_bound(samples, consider_constraints)
+            self.assertEqual(stats['ProvenOptimal'], opt_value != -1)
+            return opt_value, order, timeout
+        assert_held_karp_value(self, solve, 8, [0, 1, 3])
+
+    def test_incumbent(self):
+        # Symmetric instances are hard for the assignment relaxation, at the time limit the best
+        # tour found so far is kept
+        points = np.random.default_rng(0).random((30, 2))
+        matrix = np.rint(1000 * np.linalg.norm(points[:, np.newaxis] - points, axis=2))
+        np.fill_diagonal(matrix, INF)
+        opt_value, tour, stats, timeout = solve_atsp(matrix.astype(np.int64), timeout=0.5)
+        self.assertTrue(timeout)
+        self.assertFalse(stats['ProvenOptimal'])
+        self.assertEqual(sorted(tour), list(range(30)))
+        self.assertEqual(opt_value, int(matrix[tour, tour[1:] + tour[:1]].sum()))
+        self.assertEqual(stats['Trajectory'][-1][1], opt_value)
+
+if __name__ == '__main__':
+    unittest.main()
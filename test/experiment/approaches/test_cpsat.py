@@ -0,0 +1,44 @@
+import unittest
+import random
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..')))
+from src.experiment.approaches.cpsat import create_model, add_hint, run_cpsat
+from src.experiment.approaches.heuristics import construct_order
+from src.experiment.utils import Deadline
+from src.catalog.catalog import get_catalog
+from helpers import assert_held_karp_value
+
+class TestCpsat(unittest.TestCase):
+
+    def test_run_cpsat(self):
+        def solve(samples, consider_constraints):
+            opt_value, order, stats, timeout = run_cpsat(samples, consider_constraints,
+                                                         num_workers=2)
+            self.assertGreater(stats['Variables'], 0)
+            self.assertEqual(stats['ProvenOptimal'], opt_value != -1)
+            return opt_value, order, timeout
+        assert_held_karp_value(self, solve, 9, [0, 1, 2, 3])
+
+    def test_incumbent(self):
+        # At the time limit, the best order found so far is kept
+        random.seed(0)
+        samples = set(random.sample(get_catalog().products, 40))
+        opt_value, order, stats, timeout = run_cpsat(samples, 0, num_workers=2,
+                                                     deadline=Deadline(1.0))
+        self.assertTrue(timeout)
+        self.assertFalse(stats['ProvenOptimal'])
+        self.assertEqual(sorted(order), sorted(samples))
+        self.assertEqual(stats['Trajectory'][-1][1], opt_value)
+
+    def test_add_hint(self):
+        # The samples belong to three campaign steps, hence the reversed order is infeasible
+        random.seed(5)
+        samples = set(random.sample(get_catalog().products, 8))
+        model, literals, positions = create_model(samples, 1)
+        _, order = construct_order(samples, 1)
+        self.assertTrue(add_hint(model, literals, positions, order))
+        self.assertFalse(add_hint(model, literals, positions, order[::-1]))
+
+if __name__ == '__main__':
+    unittest.main()
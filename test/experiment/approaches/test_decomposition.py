@@ -0,0 +1,41 @@
+import unittest
+import random
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..')))
+from src.experiment.approaches.decomposition import decompose, reduce_arcs, run_decomposition
+from src.experiment.utils import Deadline
+from src.catalog.catalog import get_catalog
+from helpers import assert_held_karp_value
+
+class TestDecomposition(unittest.TestCase):
+
+    def test_run_decomposition(self):
+        assert_held_karp_value(self, run_decomposition, 9, [0, 1, 2, 3], repetitions=5)
+
+    def test_reduce_arcs(self):
+        catalog = get_catalog()
+        random.seed(1)
+        samples = set(random.sample(catalog.products, 24))
+        arcs = reduce_arcs(samples)
+        self.assertEqual(arcs.nodes, sorted(samples))
+
+        _, order, blocks, timeout = decompose(samples, 1)
+        self.assertFalse(timeout)
+        kept = set((product1, product2) for product1, product2, _ in arcs.items())
+        for product1, product2 in zip(order[:-1], order[1:]):
+            self.assertIn((product1, product2), kept)
+        for product1, product2, distance in arcs.items():
+            self.assertEqual(distance, catalog.matrix[catalog.index[product1], catalog.index[product2]])
+        self.assertEqual(sum(len(block.nodes) for block in blocks), len(samples))
+
+    def test_deadline(self):
+        # No campaign block is solved after the shared deadline has passed
+        random.seed(1)
+        samples = set(random.sample(get_catalog().products, 24))
+        opt_value, order, blocks, timeout = decompose(samples, 1, deadline=Deadline(0.0))
+        self.assertTrue(timeout)
+        self.assertEqual((opt_value, order, blocks), (-1, [], []))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import itertools
+import random
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..')))
+from src.experiment.approaches.held_karp import MAX_NODES, solve_open_path, run_held_karp
+from src.experiment.utils import build_changeover_matrices
+from src.catalog.catalog import get_catalog
+from src.constants.constants import INF
+
+class TestHeldKarp(unittest.TestCase):
+
+    def brute_force(self, products, consider_constraints):
+        products_list = sorted(products)
+        matrix, _ = build_changeover_matrices(products_list, [consider_constraints])[consider_constraints]
+        best = None
+        for path in itertools.permutations(range(len(products_list))):
+            costs = matrix[list(path[:-1]), list(path[1:])]
+            if (costs >= INF).any():
+                continue
+            if best is None or costs.sum() < best:
+                best = int(costs.sum())
+        return best
+
+    def test_solve_open_path(self):
+        weights = np.array([
+            [0, 1, 5, 9],
+            [7, 0, 1, 6],
+            [3, 8, 0, 1],
+            [4, 2, 4, 0]
+        ])
+        opt_value, path, timeout = solve_open_path(weights, range(4), range(4))
+        self.assertFalse(timeout)
+        self.assertEqual(opt_value, 3)
+        self.assertEqual(path, [0, 1, 2, 3])
+
+        steps = np.array([1, 0, 0, 1])
+        opt_value, path, timeout = solve_open_path(weights, [1, 2], [0, 3], steps)
+        self.assertFalse(timeout)
+        self.assertEqual(opt_value, 6)
+        self.assertEqual(path, [1, 2, 3, 0])
+
+        weights[:, 1] = INF
+        opt_value, path, timeout = solve_open_path(weights, [0], range(4))
+        self.assertEqual((opt_value, path, timeout), (-1, [], False))
+
+    def test_run_held_karp(self):
+        random.seed(0)
+        products = get_catalog().products
+        for _ in range(3):
+            samples = set(random.sample(products, 6))
+            for consider_constraints in [0, 1, 2, 3]:
+                opt_value, order, timeout = run_held_karp(samples, consider_constraints)
+                self.assertFalse(timeout)
+                self.assertEqual(sorted(order), sorted(samples))
+                expected = self.brute_force(samples, consider_constraints)
+                self.assertEqual(opt_value, -1 if expected is None else expected)
+
+    def test_max_nodes(self):
+        # The subsets of more products don't fit into the bit masks, which is treated as timeout
+        random.seed(2)
+        samples = set(random.sample(get_catalog().products, MAX_NODES + 1))
+        self.assertEqual(run_held_karp(samples, 1), (-1, [], True))
+        weights = np.zeros((MAX_NODES + 1, MAX_NODES + 1), dtype=np.int64)
+        self.assertEqual(solve_open_path(weights, [0], [1]), (-1, [], True))
+
+    def test_run_held_karp_parallel(self):
+        random.seed(1)
+        samples = set(random.sample(get_catalog().products, 14))
+        self.assertEqual(run_held_karp(samples, 0)[0], run_held_karp(samples, 0, n_jobs=2)[0])
+
+if __name__ == '__main__':
+    unittest.main()
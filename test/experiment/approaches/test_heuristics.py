@@ -0,0 +1,57 @@
+import unittest
+import random
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..')))
+from src.experiment.approaches.heuristics import path_cost, nearest_neighbour, \
+    cheapest_insertion, two_opt, or_opt, construct_order
+from src.experiment.approaches.logic_program import run_clingo
+from src.catalog.catalog import get_catalog
+from helpers import assert_held_karp_value
+
+class TestHeuristics(unittest.TestCase):
+
+    def setUp(self):
+        self.weights = np.array([
+            [0, 1, 5, 9],
+            [7, 0, 1, 6],
+            [3, 8, 0, 1],
+            [4, 2, 4, 0]
+        ])
+
+    def test_construction(self):
+        self.assertEqual(nearest_neighbour(self.weights), [0, 1, 2, 3])
+        self.assertEqual(sorted(cheapest_insertion(self.weights)), [0, 1, 2, 3])
+        steps = np.array([1, 1, 0, 0])
+        self.assertEqual(nearest_neighbour(self.weights, steps), [3, 2, 0, 1])
+        self.assertEqual(sorted(cheapest_insertion(self.weights, steps)[:2]), [2, 3])
+
+    def test_moves(self):
+        path, improved = two_opt(self.weights, [0, 2, 1, 3])
+        self.assertTrue(improved)
+        self.assertLess(path_cost(self.weights, path), path_cost(self.weights, [0, 2, 1, 3]))
+        path, improved = or_opt(self.weights, [1, 2, 3, 0])
+        self.assertTrue(improved)
+        self.assertEqual(path, [0, 1, 2, 3])
+        self.assertEqual(or_opt(self.weights, [0, 1, 2, 3]), ([0, 1, 2, 3], False))
+
+    def test_construct_order(self):
+        def solve(samples, consider_constraints):
+            return construct_order(samples, consider_constraints) + (False,)
+        assert_held_karp_value(self, solve, 8, [0, 1, 3], exact=False)
+
+    def test_warm_start(self):
+        random.seed(1)
+        samples = set(random.sample(get_catalog().products, 8))
+        for consider_constraints in [0, 1]:
+            expected = run_clingo(samples, 0, consider_constraints=consider_constraints)
+            opt_value, order, stats, timeout = run_clingo(samples, 0,
+                consider_constraints=consider_constraints, warm_start=True)
+            self.assertFalse(timeout)
+            self.assertEqual(opt_value, expected[0])
+            self.assertEqual(sorted(order), sorted(samples))
+            self.assertLessEqual(stats['Models'], expected[2]['Models'])
+
+if __name__ == '__main__':
+    unittest.main()
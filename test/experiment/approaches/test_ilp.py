@@ -0,0 +1,85 @@
+import unittest
+import random
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..')))
+from src.experiment.approaches.ilp import FORMULATIONS, get_position_bounds, get_subtours, \
+    create_model, create_sparse_model, run_ilp
+from src.experiment.utils import calculate_oct
+from src.catalog.catalog import get_catalog
+
+class TestIlp(unittest.TestCase):
+
+    def test_get_position_bounds(self):
+        catalog = get_catalog()
+        random.seed(0)
+        samples = set(random.sample(catalog.products, 10))
+        self.assertEqual(set(get_position_bounds(samples, 0, catalog).values()), {(1, 10)})
+
+        bounds = get_position_bounds(samples, 1, catalog)
+        for product, (lower, upper) in bounds.items():
+            step = catalog.campaigns_order[catalog.campaign[catalog.index[product]]]
+            same_step = [other for other in samples \
+                if catalog.campaigns_order[catalog.campaign[catalog.index[other]]] == step]
+            self.assertEqual(upper - lower + 1, len(same_step))
+        self.assertEqual(min(lower for lower, _ in bounds.values()), 1)
+        self.assertEqual(max(upper for _, upper in bounds.values()), 10)
+
+    def test_get_subtours(self):
+        self.assertEqual(get_subtours({'v': 'a', 'a': 'b', 'b': 'v'}), [])
+        successors = {'v': 'a', 'a': 'v', 'b': 'c', 'c': 'b', 'd': 'd'}
+        self.assertEqual(get_subtours(successors), [['b', 'c'], ['d']])
+
+    def test_lazy_cuts(self):
+        random.seed(2)
+        samples = set(random.sample(get_catalog().products, 12))
+        order, stats, timeout = run_ilp(samples, 0, formulation='lazy')
+        self.assertFalse(timeout)
+        self.assertEqual(sorted(order), sorted(samples))
+        self.assertEqual(stats['Iterations'] > 1, stats['Cuts'] > 0)
+        self.assertLess(stats['Constraints'], 2 ** len(samples))
+
+    def test_formulations(self):
+        random.seed(1)
+        products = get_catalog().products
+        for _ in range(2):
+            samples = set(random.sample(products, 6))
+            for consider_constraints in [0, 1, 3]:
+                results = []
+                for formulation in FORMULATIONS:
+                    order, stats, timeout = run_ilp(samples, consider_constraints,
+                                                    formulation=formulation)
+                    self.assertFalse(timeout)
+                    self.assertEqual(sorted(order), sorted(samples))
+                    self.assertGreater(stats['Variables'], 0)
+                    self.assertGreaterEqual(stats['BuildTime'], 0.0)
+                    self.assertGreater(stats['SolveTime'], 0.0)
+                    self.assertTrue(stats['ProvenOptimal'])
+                    self.assertEqual(stats['Trajectory'][-1][1], calculate_oct(order))
+                    results.append(calculate_oct(order))
+                self.assertEqual(len(set(results)), 1)
+
+    def test_highs(self):
+        random.seed(3)
+        products = get_catalog().products
+        samples = set(random.sample(products, 7))
+        for consider_constraints in [0, 1, 2]:
+            for formulation in ['mtz', 'scf', 'time_staged']:
+                model, _ = create_model(samples, consider_constraints, formulation=formulation)
+                sparse_model, nodes, _, _ = create_sparse_model(samples, consider_constraints,
+                                                                formulation=formulation)
+                self.assertEqual(nodes[-1], 'v')
+                self.assertEqual(sparse_model.number_of_variables, model.number_of_variables)
+                self.assertEqual(sparse_model.number_of_constraints, model.number_of_constraints)
+
+            for formulation in FORMULATIONS:
+                expected, _, _ = run_ilp(samples, consider_constraints, formulation=formulation)
+                order, stats, timeout = run_ilp(samples, consider_constraints,
+                                                formulation=formulation, backend='highs')
+                self.assertFalse(timeout)
+                self.assertEqual(sorted(order), sorted(samples))
+                self.assertEqual(calculate_oct(order), calculate_oct(expected))
+                self.assertGreater(stats['Constraints'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
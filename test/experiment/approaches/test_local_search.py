@@ -0,0 +1,52 @@
+import unittest
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..')))
+from src.experiment.approaches.local_search import get_blocks, apply_move, search, \
+    run_local_search
+from src.experiment.approaches.heuristics import path_cost
+from src.experiment.utils import calculate_oct
+from helpers import assert_held_karp_value
+
+class TestLocalSearch(unittest.TestCase):
+
+    def test_get_blocks(self):
+        steps = np.array([1, 0, 1, 2])
+        blocks = get_blocks([1, 0, 2, 3], steps)
+        self.assertEqual([list(positions) for positions in blocks], [[1], [2, 3], [4]])
+        self.assertEqual([list(positions) for positions in get_blocks([0, 1], None)], [[1, 2]])
+
+    def test_apply_move(self):
+        tour = np.array([9, 0, 1, 2, 3, 4, 9])
+        self.assertEqual(list(apply_move(tour, ('reverse', 2, 4, 0))), [9, 0, 3, 2, 1, 4, 9])
+        self.assertEqual(list(apply_move(tour, ('swap', 1, 5, 0))), [9, 4, 1, 2, 3, 0, 9])
+        self.assertEqual(list(apply_move(tour, ('segment', 1, 4, 2))), [9, 2, 3, 0, 1, 4, 9])
+        self.assertEqual(list(apply_move(tour, ('segment', 4, 0, 2))), [9, 3, 4, 0, 1, 2, 9])
+
+    def test_search(self):
+        rng = np.random.default_rng(0)
+        weights = rng.integers(1, 100, (30, 30))
+        steps = np.repeat([0, 1, 2], 10)
+        path = list(rng.permutation(10)) + list(10 + rng.permutation(10)) \
+            + list(20 + rng.permutation(10))
+        best_path, cost, trajectory = search(weights, path, steps, budget=1.0)
+        self.assertEqual(sorted(best_path), list(range(30)))
+        self.assertTrue((np.diff(steps[best_path]) >= 0).all())
+        self.assertEqual(cost, path_cost(weights, best_path))
+        self.assertEqual(trajectory[0], (0.0, path_cost(weights, path)))
+        self.assertEqual(trajectory[-1][1], cost)
+        self.assertTrue(all(later[1] < earlier[1] for earlier, later \
+            in zip(trajectory[:-1], trajectory[1:])))
+
+    def test_run_local_search(self):
+        def solve(samples, consider_constraints):
+            changeover_time, order, trajectory = run_local_search(samples, consider_constraints,
+                                                                  budget=0.5)
+            self.assertEqual(sorted(order), sorted(samples))
+            self.assertEqual(changeover_time, calculate_oct(order))
+            return trajectory[-1][1], order, False
+        assert_held_karp_value(self, solve, 8, [0, 1, 3], exact=False)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import random
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..')))
+from src.experiment.approaches.logic_program import run_clingo, run_clingo_levels, ClingoSession
+from src.experiment.utils import calculate_oct, Deadline
+from src.catalog.catalog import get_catalog
+
+class TestLogicProgram(unittest.TestCase):
+
+    def test_threads(self):
+        random.seed(0)
+        samples = set(random.sample(get_catalog().products, 7))
+        expected = run_clingo(samples, 0, consider_constraints=1)
+        for parallel_mode in ['compete', 'split']:
+            opt_value, order, stats, timeout = run_clingo(samples, 0, consider_constraints=1,
+                threads=2, parallel_mode=parallel_mode, configuration='many',
+                opt_strategy='usc')
+            self.assertFalse(timeout)
+            self.assertEqual(opt_value, expected[0])
+            self.assertEqual(sorted(order), sorted(samples))
+            self.assertEqual(stats['Atoms'], expected[2]['Atoms'])
+
+    def test_anytime(self):
+        random.seed(0)
+        samples = set(random.sample(get_catalog().products, 7))
+        opt_value, order, stats, timeout = run_clingo(samples, 0, consider_constraints=1)
+        self.assertFalse(timeout)
+        self.assertTrue(stats['ProvenOptimal'])
+        self.assertEqual(stats['Trajectory'][-1][1], opt_value)
+        costs = [cost for _, cost in stats['Trajectory']]
+        self.assertEqual(costs, sorted(costs, reverse=True))
+
+        # The best order found so far is kept, if the time limit is exceeded
+        samples = set(random.sample(get_catalog().products, 40))
+        opt_value, order, stats, timeout = run_clingo(samples, 0, consider_constraints=0,
+                                                      deadline=Deadline(2.0))
+        self.assertTrue(timeout)
+        self.assertFalse(stats['ProvenOptimal'])
+        self.assertEqual(sorted(order), sorted(samples))
+        self.assertEqual(opt_value, calculate_oct(order))
+        self.assertEqual(stats['Trajectory'][-1][1], opt_value)
+
+        # A deadline passed before solving stops the search without a model
+        opt_value, order, stats, timeout = run_clingo(samples, 0, consider_constraints=0,
+                                                      deadline=Deadline(0.0))
+        self.assertTrue(timeout)
+        self.assertEqual(order, [])
+
+    def test_session(self):
+        random.seed(1)
+        products = get_catalog().products
+        for _ in range(2):
+            samples = set(random.sample(products, 8))
+            for encoding in ['normal', 'advanced']:
+                # Descending options switch parts off again after they have been grounded
+                results = run_clingo_levels(samples, (3, 0, 2, 1), encoding)
+                for consider_constraints, (opt_value, order, stats, timeout) in results.items():
+                    expected = run_clingo(samples, 0, encoding, consider_constraints)
+                    self.assertFalse(timeout)
+                    self.assertEqual(opt_value, expected[0])
+                    self.assertEqual(sorted(order), sorted(samples))
+                    self.assertGreater(stats['Atoms'], 0)
+
+    def test_session_grounding(self):
+        random.seed(2)
+        session = ClingoSession(set(random.sample(get_catalog().products, 6)))
+        self.assertEqual(list(session.priorities), [0, 1])
+        session.solve(1)
+        self.assertEqual(list(session.priorities), [0, 1])
+        session.solve(3)
+        self.assertEqual(list(session.priorities), [0, 1, 2, 3])
+
+    def test_session_constraint_1(self):
+        # The optimal value of the last sample is increased by the campaigns order
+        random.seed(5)
+        products = get_catalog().products
+        for _ in range(4):
+            samples = set(random.sample(products, 8))
+            session = ClingoSession(samples)
+            results = [session.solve(consider_constraints)[0] for consider_constraints in [0, 1, 0]]
+            expected = [run_clingo(samples, 0, consider_constraints=consider_constraints)[0] \
+                for consider_constraints in [0, 1, 0]]
+            self.assertEqual(results, expected)
+        self.assertLess(expected[0], expected[1])
+
+if __name__ == '__main__':
+    unittest.main()
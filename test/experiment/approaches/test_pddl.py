@@ -2,7 +2,7 @@ import unittest
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..')))
-from src.experiment.approaches.pddl_solver import interpret_sas_plan
+from src.experiment.approaches.pddl_solver import interpret_sas_plan, interpret_sas_plans
 
 class TestUtils(unittest.TestCase):
 
@@ -17,5 +17,19 @@ class TestUtils(unittest.TestCase):
             self.assertEqual(opt_value, 17)
             self.assertEqual(order, ['20001', '10014', '10012', '50013'])
 
+    def test_interpret_sas_plans(self):
+        filename = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sas_plan'))
+
+        with open(filename, 'r') as filehandle:
+            plan = filehandle.read().split('\n')
+
+            lines = [(0.5, line) for line in plan] + [(1.5, 'Solution found!')] + \
+                [(2.5, line.replace('17', '12')) for line in plan]
+            plans = interpret_sas_plans(lines)
+
+            self.assertEqual([(elapsed, opt_value) for elapsed, opt_value, _ in plans],
+                             [(0.5, 17), (2.5, 12)])
+            self.assertEqual(plans[1][2], ['20001', '10014', '10012', '50013'])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from unittest import mock
+import tempfile
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')))
+from src.experiment import tuning
+from src.experiment.utils import get_tuned_options
+
+class TestTuning(unittest.TestCase):
+
+    def test_race(self):
+        candidates = [{'configuration': 'auto'}, {'configuration': 'trendy'},
+                      {'configuration': 'crafty'}]
+        samples = [(run, set()) for run in range(3)]
+        # The second candidate is faster, the third one exceeds the budget on every sample
+        runtimes = {'auto': [(0.5, False), (2.0, False), (0.5, False)],
+                    'trendy': [(0.4, False)] * 3, 'crafty': [(2.0, True)] * 3}
+        def evaluate(approach, products, run, consider_constraints, options, budget):
+            return runtimes[options['configuration']][run]
+        with mock.patch.object(tuning, 'evaluate', side_effect=evaluate) as evaluate_mock:
+            options, scores = tuning.race('lp_advanced', samples, 1, candidates, budget=2.0)
+        self.assertEqual(options, candidates[1])
+        self.assertEqual(scores[2], float('inf'))
+        # The first candidate survives the first sample only
+        self.assertEqual(evaluate_mock.call_count, 3 + 2 + 1)
+
+    def test_tune(self):
+        with tempfile.TemporaryDirectory() as folder:
+            filename = os.path.join(folder, 'tuned_configurations.json')
+            tuned = tuning.tune('lp_advanced', [7, 9], 1, runs=[10, 11],
+                                candidates=tuning.CANDIDATES[:3], budget=5.0, filename=filename)
+            self.assertEqual(sorted(tuned), [7, 9])
+            for sample_size, options in tuned.items():
+                self.assertIn(options, tuning.CANDIDATES[:3])
+                self.assertEqual(get_tuned_options('lp_advanced', 1, sample_size, filename),
+                                 options)
+            # Untuned sample sizes take the nearest tuned one, the larger one on ties
+            self.assertEqual(get_tuned_options('lp_advanced', 1, 20, filename), tuned[9])
+            self.assertEqual(get_tuned_options('lp_advanced', 1, 8, filename), tuned[9])
+            self.assertIsNone(get_tuned_options('lp_advanced', 2, 7, filename))
+            self.assertIsNone(get_tuned_options('lp_normal', 1, 7, filename))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,15 @@
 import unittest
+import time
 import os
 import sys
+import clingo
+import numpy as np
 from pprint import pprint
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')))
-from src.experiment.utils import calculate_oct, get_changeover_matrix, create_lp_instance
+from src.experiment.utils import calculate_oct, calculate_oct_batch, get_changeover_matrix, \
+    get_changeover_matrices, create_lp_instance, add_lp_instance, clingo_arguments, run_process, \
+    Deadline
+from src.catalog.catalog import get_catalog
 from src.experiment.approaches.tsp_solver import build_graph
 
 class TestUtils(unittest.TestCase):
@@ -21,6 +27,21 @@ class TestUtils(unittest.TestCase):
         order = ['23545', '16215', '16215', '23547']
         self.assertRaises(AssertionError, calculate_oct, order)
 
+    def test_calculate_oct_batch(self):
+        catalog = get_catalog()
+        orders = [['23545', '16215', '15951', '12021'],
+                  ['12021', '15951', '16215', '23545'],
+                  ['16215', '23545', '12021', '15951']]
+        indices = np.array([catalog.indices(order) for order in orders])
+        octs = calculate_oct_batch(indices, catalog=catalog)
+        self.assertListEqual(list(octs), [calculate_oct(order) for order in orders])
+
+        octs = calculate_oct_batch(indices, occurences={'12021': 2}, catalog=catalog)
+        self.assertListEqual(list(octs), [calculate_oct(order, {'12021': 2}) for order in orders])
+
+        self.assertEqual(calculate_oct_batch(indices[0])[0], calculate_oct(orders[0]))
+        self.assertRaises(AssertionError, calculate_oct_batch, np.array([[1, 2, 1]]))
+
     def test_get_changeover_matrix(self):
         products = {'23545', '16215', '12020', '15951', '23151', '23547'}
 
@@ -111,6 +132,16 @@ class TestUtils(unittest.TestCase):
         self.assertDictEqual(df_matrix.to_dict(), matrix_dict_None)
         self.assertDictEqual(campaigns_order, campaigns_order_None)
 
+    def test_get_changeover_matrices(self):
+        products = {'23545', '16215', '12020', '15951', '23151', '23547', '21845', '21847'}
+        matrices = get_changeover_matrices(products, levels=[0, 1, 2, 3, 4, None])
+        self.assertEqual(len(matrices), 6)
+        for consider_constraints, (df_matrix, campaigns_order) in matrices.items():
+            control_matrix, control_campaigns_order = \
+                get_changeover_matrix(products, consider_constraints)
+            self.assertDictEqual(df_matrix.to_dict(), control_matrix.to_dict())
+            self.assertDictEqual(campaigns_order, control_campaigns_order)
+
     def test_build_graph(self):
         products = {'23545', '16215', '12020', '15951', '23151', '23547'}
         edge_weights = build_graph(products, consider_constraints=0)
@@ -168,5 +199,53 @@ class TestUtils(unittest.TestCase):
         # print(result)
         self.assertEqual(type(result), str)
 
+    def test_add_lp_instance(self):
+        products = {'23545', '16215', '12020', '15951', '23151', '23547'}
+
+        def ground_atoms(ctl):
+            ctl.ground([('base', [])])
+            return set(str(atom.symbol) for atom in ctl.symbolic_atoms)
+
+        ctl_text = clingo.Control()
+        ctl_text.add('base', [], create_lp_instance(products))
+        ctl_backend = clingo.Control()
+        add_lp_instance(ctl_backend, products)
+        self.assertSetEqual(ground_atoms(ctl_backend), ground_atoms(ctl_text))
+
+    def test_clingo_arguments(self):
+        ctl = clingo.Control(clingo_arguments(2, 'split', 'trendy', 'usc,oll'))
+        self.assertEqual(ctl.configuration.solve.parallel_mode, '2,split')
+        self.assertEqual(ctl.configuration.configuration, 'trendy')
+        self.assertEqual(ctl.configuration.solver.opt_strategy, 'usc,oll')
+        ctl = clingo.Control(clingo_arguments(options={'opt_strategy': 'usc,one',
+                                                       'opt_heuristic': 'sign',
+                                                       'restarts': 'L,128'}))
+        self.assertEqual(ctl.configuration.solver.opt_strategy, 'usc,one')
+        self.assertEqual(ctl.configuration.solver.opt_heuristic, 'sign')
+        self.assertEqual(ctl.configuration.solver.restarts, 'l,128')
+        self.assertRaises(AssertionError, clingo_arguments, 1, 'share')
+
+    def test_run_process(self):
+        lines, timeout = run_process([sys.executable, '-c', 'print(1)'], 10.0)
+        self.assertFalse(timeout)
+        self.assertEqual([line for _, line in lines], ['1'])
+
+        # The output before the time limit is kept, the child process is killed as well
+        start_time = time.time()
+        script = 'import subprocess; print(2, flush=True); subprocess.run(["sleep", "10"])'
+        lines, timeout = run_process([sys.executable, '-c', script], 1.0)
+        self.assertTrue(timeout)
+        self.assertEqual([line for _, line in lines], ['2'])
+        self.assertLess(time.time() - start_time, 5.0)
+
+    def test_deadline(self):
+        deadline = Deadline(1.0)
+        self.assertFalse(deadline.expired())
+        self.assertGreater(deadline.remaining(), 0.0)
+        self.assertLessEqual(deadline.remaining(), 1.0)
+        deadline = Deadline(0.0)
+        self.assertTrue(deadline.expired())
+        self.assertEqual(deadline.remaining(), 0.0)
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,8 +1,10 @@
 import unittest
 import subprocess
+import io
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from src.pddl.modeler.modeler import Modeler
 
 class TestModeler(unittest.TestCase):
 
@@ -33,5 +35,15 @@ class TestModeler(unittest.TestCase):
                 for i in range(len(content)):
                     self.assertEqual(content[i], comparison_content[i])
 
+    def test_write_instance(self):
+        comparison_filename = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'comparison.pddl')
+        products = ['23545', '12020', '12021', '23547']
+
+        sink = io.StringIO()
+        Modeler().write_instance(products, sink, 'test', chunk_size=64)
+
+        with open(comparison_filename, 'r') as c:
+            self.assertEqual(sink.getvalue(), c.read())
+
 if __name__ == '__main__':
     unittest.main()
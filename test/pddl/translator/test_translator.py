@@ -0,0 +1,62 @@
+import unittest
+from typing import List, Tuple
+import os
+import sys
+import clingo
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..')))
+from src.pddl.translator.translator import Translator
+
+class TestTranslator(unittest.TestCase):
+
+    def test_translate_into(self):
+        instances = [
+            (os.path.join('examples', 'productordering', 'domain.pddl'),
+             os.path.join('test', 'pddl', 'modeler', 'comparison.pddl'), 7),
+            (os.path.join('examples', 'dwr', 'dwr.pddl'), os.path.join('examples', 'dwr', 'pb1.pddl'), 5)
+        ]
+        for domain, problem, timesteps in instances:
+            ctl_text = clingo.Control()
+            ctl_text.add('base', [], Translator().translate(domain, problem, timesteps))
+            ctl_text.ground([('base', [])])
+
+            ctl_direct = clingo.Control(['--warn=no-atom-undefined'])
+            Translator().translate_into(ctl_direct, domain, problem, timesteps)
+            ctl_direct.ground([('base', [])])
+
+            self.assertSetEqual(set(str(atom.symbol) for atom in ctl_direct.symbolic_atoms),
+                                set(str(atom.symbol) for atom in ctl_text.symbolic_atoms))
+
+    def solve(self, ctl : clingo.Control) -> Tuple[bool, List[int]]:
+        costs = []
+        result = ctl.solve(on_model=lambda model: costs.append(model.cost))
+        return result.satisfiable, costs[-1] if len(costs) > 0 else []
+
+    def test_incremental(self):
+        instances = [
+            (os.path.join('examples', 'productordering', 'domain.pddl'),
+             os.path.join('test', 'pddl', 'modeler', 'comparison.pddl'), 7),
+            (os.path.join('examples', 'dinner', 'dinner.pddl'), os.path.join('examples', 'dinner', 'pb1.pddl'), 3),
+            (os.path.join('examples', 'tsp', 'tsp.pddl'), os.path.join('examples', 'tsp', 'pb1.pddl'), 5)
+        ]
+        for domain, problem, timesteps in instances:
+            ctl_fixed = clingo.Control(['--warn=no-atom-undefined'])
+            Translator().translate_into(ctl_fixed, domain, problem, timesteps)
+            ctl_fixed.ground([('base', [])])
+            expected = self.solve(ctl_fixed)
+            self.assertTrue(expected[0])
+
+            ctl = clingo.Control(['--warn=no-atom-undefined'])
+            Translator().translate_into(ctl, domain, problem, incremental=True)
+            ctl.ground([('base', [])])
+            for horizon in range(1, timesteps + 1):
+                if horizon > 1:
+                    ctl.release_external(clingo.Function('query', [clingo.Number(horizon - 1)]))
+                ctl.ground([('step', [clingo.Number(horizon)]), ('check', [clingo.Number(horizon)])])
+                ctl.assign_external(clingo.Function('query', [clingo.Number(horizon)]), True)
+                satisfiable, costs = self.solve(ctl)
+                # The first horizon with a plan is the one of the fixed timesteps
+                self.assertEqual(satisfiable, horizon == timesteps)
+            self.assertEqual(costs, expected[1])
+
+if __name__ == '__main__':
+    unittest.main()